@@ -11,6 +11,8 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
 
+from turkish_text import register_sqlite
+
 
 class BookAnalysisTab(QWidget):
     def __init__(self, db_manager):
@@ -139,8 +141,9 @@ class BookAnalysisTab(QWidget):
         """Kategori dropdown'ını doldur"""
         try:
             conn = sqlite3.connect(self.db_manager.db_path)
+            register_sqlite(conn)  # ORDER BY ... COLLATE TURKCE
             cursor = conn.cursor()
-            cursor.execute('SELECT DISTINCT kategori FROM kitaplar WHERE kategori != "" AND kategori IS NOT NULL ORDER BY kategori')
+            cursor.execute('SELECT DISTINCT kategori FROM kitaplar WHERE kategori != "" AND kategori IS NOT NULL ORDER BY kategori COLLATE TURKCE')
             categories = cursor.fetchall()
             
             for category in categories:
@@ -154,8 +157,9 @@ class BookAnalysisTab(QWidget):
         """Alt kategori dropdown'ını doldur"""
         try:
             conn = sqlite3.connect(self.db_manager.db_path)
+            register_sqlite(conn)  # ORDER BY ... COLLATE TURKCE
             cursor = conn.cursor()
-            cursor.execute('SELECT DISTINCT alt_kategori FROM kitaplar WHERE alt_kategori != "" AND alt_kategori IS NOT NULL ORDER BY alt_kategori')
+            cursor.execute('SELECT DISTINCT alt_kategori FROM kitaplar WHERE alt_kategori != "" AND alt_kategori IS NOT NULL ORDER BY alt_kategori COLLATE TURKCE')
             alt_categories = cursor.fetchall()
             
             for alt_category in alt_categories:
@@ -169,8 +173,9 @@ class BookAnalysisTab(QWidget):
         """Şehir dropdown'ını doldur"""
         try:
             conn = sqlite3.connect(self.db_manager.db_path)
+            register_sqlite(conn)  # ORDER BY ... COLLATE TURKCE
             cursor = conn.cursor()
-            cursor.execute('SELECT DISTINCT sehir FROM kitaplar WHERE sehir != "" AND sehir IS NOT NULL ORDER BY sehir')
+            cursor.execute('SELECT DISTINCT sehir FROM kitaplar WHERE sehir != "" AND sehir IS NOT NULL ORDER BY sehir COLLATE TURKCE')
             cities = cursor.fetchall()
             
             for city in cities:
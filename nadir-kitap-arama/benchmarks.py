@@ -0,0 +1,702 @@
+# -*- coding: utf-8 -*-
+"""
+Performans ölçümleri
+
+Tüm ölçümler yerel nadirkitap taklidi (mock_server) üzerinde çevrimdışı çalışır:
+
+    python benchmarks.py crawl
+    python benchmarks.py parsers [kayıtlı_sayfa.html ...]
+    python benchmarks.py rate
+    python benchmarks.py frontier
+    python benchmarks.py coalesce
+    python benchmarks.py database
+    python benchmarks.py indexes
+    python benchmarks.py fts
+    python benchmarks.py fuzzy
+    python benchmarks.py turkish
+"""
+
+import concurrent.futures
+import glob
+import locale
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+
+from crawler import CrawlEngine
+from database import DatabaseManager, HOT_QUERIES, MIGRATIONS, FUZZY_MIN_SCORE, fuzzy_score
+from frontier import CrawlFrontier, run_frontier_worker
+from mock_server import AUTHORS, PUBLISHERS, NadirKitapStandIn, generate_sahaf_books, render_page
+from parsers import PARSERS, get_parser
+from parse_pool import ParsePool
+from rate_limiter import AdaptiveRateLimiter
+from request_coalescer import RequestCoalescer
+from turkish_text import fold, register_sqlite, search_key, sort_key, to_ascii, turkish_upper
+
+
+# Kaydedilmiş gerçek nadirkitap sonuç sayfaları (kitapara.php çıktıları)
+SAVED_PAGES_GLOB = "sayfa_ornekleri/*.html"
+
+EDGE_CASE_ITEMS = """
+<li><div><h4 class="break-work"><a href="/a.html">Span'sız Başlık</a></h4></div>
+    <div class="product-list-price">1.250,00 TL</div></li>
+<li><div><p>Yazar Önce</p><h4 class="break-work title"><a href="/b.html"><span> Boşluklu </span></a></h4></div>
+    <ul class="product-list-bottom"><li>Baskı</li></ul>
+    <ul class="product-list-bottom"><li><span class="col-md-3">Yayınevi</span></li></ul>
+    <a class="seller-link extra" href="https://www.nadirkitap.com/x-sahaf5.html"> Mutlak Sahaf </a></li>
+<li><div><h4 class="break-work"></h4></div></li>
+<li><h4 class="break-work"><a href="/c.html"><span>Doğrudan li altında</span></a></h4><p>Kök p</p>
+    <ul class="product-list-bottom"><li>Yayınevi<span class="col-md-9">:: İş Bankası</span></li></ul></li>
+"""
+
+
+def load_sample_pages(paths=None):
+    """Eşdeğerlik ve ölçüm için sayfa listesi: kayıtlı sayfalar + taklit sayfalar"""
+    pages = {}
+    for path in paths or glob.glob(SAVED_PAGES_GLOB):
+        with open(path, 'r', encoding='utf-8') as f:
+            pages[path] = f.read()
+
+    for sahaf_id in (7, 42, 1234):
+        books = generate_sahaf_books(sahaf_id, 25)
+        pages[f"taklit-sahaf{sahaf_id}"] = render_page(books, 1, 25, {})
+
+    edge_page = render_page(generate_sahaf_books(9, 3), 1, 3, {})
+    pages["taklit-uç-durumlar"] = edge_page.replace('<ul class="product-list">', '<ul class="product-list">' + EDGE_CASE_ITEMS, 1)
+    pages["boş-sayfa"] = "<html><body><div class='list-cell'></div></body></html>"
+    return pages
+
+
+def check_parser_equivalence(paths=None):
+    """Tüm arka uçların referans (bs4) ile birebir aynı sözlükleri ürettiğini doğrula"""
+    reference = get_parser('bs4')
+    failures = []
+    for name, html in load_sample_pages(paths).items():
+        expected = reference.parse_page(html)
+        for backend in PARSERS:
+            actual = get_parser(backend).parse_page(html)
+            if actual != expected:
+                failures.append((name, backend, len(expected), len(actual)))
+    for name, backend, expected_count, actual_count in failures:
+        print(f"FARKLI: {name} [{backend}] beklenen {expected_count} kitap, gelen {actual_count}")
+    if failures:
+        raise AssertionError(f"{len(failures)} sayfada ayrıştırıcılar farklı sonuç verdi")
+    print("Tüm ayrıştırıcılar referansla aynı sonucu üretti.")
+
+
+def bench_parsers(paths=None, repeat=30):
+    """Ayrıştırıcıların sayfa başına süresini karşılaştır"""
+    check_parser_equivalence(paths)
+    pages = list(load_sample_pages(paths).values())
+    results = {}
+    for backend in PARSERS:
+        parser = get_parser(backend)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for html in pages:
+                parser.parse_page(html)
+        per_page = (time.perf_counter() - start) / (repeat * len(pages))
+        results[backend] = per_page
+        print(f"{backend:<5} {per_page * 1000:7.2f} ms/sayfa")
+    if 'bs4' in results and 'lxml' in results:
+        print(f"lxml hızlanma: {results['bs4'] / results['lxml']:.1f}x")
+    return results
+
+
+def make_city_inventory(sahaf_count=40, books_per_sahaf=120):
+    """Ölçüm için sahte şehir envanteri ve sahaflar.json benzeri liste üret"""
+    inventory = {}
+    sahaflar = []
+    for i in range(sahaf_count):
+        sahaf_id = 1000 + i
+        # Gerçek dağılıma benzemesi için birkaç büyük sahaf
+        count = books_per_sahaf * (5 if i % 10 == 0 else 1)
+        inventory[sahaf_id] = count
+        sahaflar.append({
+            'name': f"Sahaf {sahaf_id}",
+            'city': "Test",
+            'seller_url': f"https://www.nadirkitap.com/sahaf-{sahaf_id}-sahaf{sahaf_id}.html",
+            'kitap_sayisi': str(count),
+        })
+    return inventory, sahaflar
+
+
+def bench_crawl(concurrency_values=(4, 8, 16, 32), latency=0.2, parse_modes=("thread", "process")):
+    """Şehir taramasının eşzamanlılığa ve ayrıştırma yerine göre sayfa/saniye hızını ölç"""
+    inventory, sahaflar = make_city_inventory()
+    search_params = {'kitap_adi': '', 'yazar': '', 'secili_sehir': 'Test'}
+    expected = sum(inventory.values())
+    results = []
+
+    with NadirKitapStandIn(inventory, latency=latency) as stand_in:
+        for parse_mode in parse_modes:
+            parse_pool = ParsePool() if parse_mode == "process" else None
+            if parse_pool:
+                parse_pool.warm()
+            try:
+                for concurrency in concurrency_values:
+                    engine = CrawlEngine(search_params, concurrency=concurrency,
+                                         base_url=stand_in.base_url, parse_pool=parse_pool)
+                    start = time.perf_counter()
+                    books = engine.run(engine.crawl_city(sahaflar))
+                    elapsed = time.perf_counter() - start
+
+                    if len(books) != expected:
+                        raise AssertionError(f"Eksik sonuç: {len(books)} / {expected}")
+
+                    rate = engine.request_count / elapsed
+                    stats = engine.session_pool.stats()
+                    results.append((parse_mode, concurrency, engine.request_count, elapsed, rate))
+                    print(f"ayrıştırma={parse_mode:<7} eşzamanlılık={concurrency:<3} istek={engine.request_count:<5} "
+                          f"süre={elapsed:6.2f}s  {rate:7.1f} sayfa/s  "
+                          f"oturum isabet/ıskalama={stats['hits']}/{stats['misses']}")
+            finally:
+                if parse_pool:
+                    parse_pool.close()
+    return results
+
+
+def bench_rate_limiter(server_rate=20, duration_pages=200):
+    """Hız sınırlayıcının sunucu sınırına yakınsamasını ölç (429 sayısı düşük kalmalı)"""
+    inventory, sahaflar = make_city_inventory(sahaf_count=20, books_per_sahaf=250)
+    search_params = {'kitap_adi': '', 'yazar': '', 'secili_sehir': 'Test'}
+
+    with NadirKitapStandIn(inventory, latency=0.02, max_rate=server_rate) as stand_in:
+        limiter = AdaptiveRateLimiter(rate=5.0)
+        engine = CrawlEngine(search_params, concurrency=32, base_url=stand_in.base_url, rate_limiter=limiter)
+        start = time.perf_counter()
+        engine.run(engine.crawl_city(sahaflar))
+        elapsed = time.perf_counter() - start
+
+    print(f"sunucu sınırı={server_rate}/s  son hız={limiter.current_rate:.1f}/s  "
+          f"ortalama={stand_in.request_count / elapsed:.1f}/s  429={stand_in.throttled_count}  "
+          f"yavaşlama={limiter.throttle_count}")
+    return limiter.current_rate, stand_in.throttled_count
+
+
+def bench_frontier(process_counts=(1, 2, 4), latency=0.1, concurrency=4):
+    """Paylaşılan kuyruktan çalışan worker süreç sayısına göre ölçeklenmeyi ölç
+
+    Her süreç düşük eşzamanlılıkla çalışır; darboğaz tek sürecin ağ beklemesi
+    olduğundan süreç sayısı arttıkça sayfa/saniye hızı doğrusala yakın artmalı.
+    Bu ancak çekirdek yettiği sürece geçerlidir: bir worker sayfa başına
+    ~12-15 ms CPU harcar (lxml ayrıştırma, HTTP istemcisi, SQLite/FTS yazımı),
+    taklit sunucu da aynı makinede çalışır. Toplam worker CPU süresi (cpu)
+    duvar saati süresine yaklaştığında çekirdekler doymuştur; süreç sayısı
+    çekirdek sayısını aştıkça hızlanma doğrusallıktan uzaklaşır.
+    """
+    inventory, sahaflar = make_city_inventory(sahaf_count=40, books_per_sahaf=250)
+    search_params = {'kitap_adi': '', 'yazar': ''}
+    expected = sum(inventory.values())
+    context = multiprocessing.get_context("spawn")
+    results = []
+
+    with NadirKitapStandIn(inventory, latency=latency) as stand_in:
+        for processes in process_counts:
+            with tempfile.TemporaryDirectory() as tmp:
+                db_path = os.path.join(tmp, "kitaplar.db")
+                frontier = CrawlFrontier(db_path)
+                tasks = frontier.seed(search_params, sahaflar, chunk_pages=5)
+                frontier.close()
+
+                requests_before = stand_in.request_count
+                with context.Pool(processes) as pool:
+                    workers = pool.starmap(run_frontier_worker,
+                                           [(db_path, stand_in.base_url, f"worker-{i}", concurrency)
+                                            for i in range(processes)])
+                # Süreç başlatma (spawn ve import) süresi dışarıda kalsın diye worker'ların kendi süreleri
+                elapsed = max(worker['elapsed'] for worker in workers)
+                cpu = sum(worker['cpu'] for worker in workers)
+                requests = stand_in.request_count - requests_before
+
+                with sqlite3.connect(db_path) as conn:
+                    saved = conn.execute('SELECT COUNT(*) FROM kitaplar').fetchone()[0]
+                if saved != expected:
+                    raise AssertionError(f"Eksik sonuç: {saved} / {expected}")
+
+            rate = requests / elapsed
+            results.append((processes, requests, elapsed, rate))
+            speedup = rate / results[0][3]
+            print(f"süreç={processes:<2} görev={tasks:<4} istek={requests:<5} süre={elapsed:6.2f}s  "
+                  f"{rate:7.1f} sayfa/s  hızlanma={speedup:.2f}x  cpu={cpu:5.2f}s (çekirdek={os.cpu_count()})")
+    return results
+
+
+def bench_coalesce(searches=4, latency=0.2, concurrency=8):
+    """Aynı anda çalışan aynı aramaların sunucuya giden istek sayısını ölç
+
+    Birleştirme olmadan her arama her sayfayı ayrı indirir; paylaşılan
+    RequestCoalescer ile uçuştaki aynı sayfalar bir kez indirilmeli.
+    """
+    inventory, sahaflar = make_city_inventory(sahaf_count=10, books_per_sahaf=250)
+    search_params = {'kitap_adi': '', 'yazar': '', 'secili_sehir': 'Test'}
+    expected = sum(inventory.values())
+    results = []
+
+    with NadirKitapStandIn(inventory, latency=latency) as stand_in:
+        for coalescer in (None, RequestCoalescer()):
+            engines = [CrawlEngine(search_params, concurrency=concurrency,
+                                   base_url=stand_in.base_url, coalescer=coalescer)
+                       for _ in range(searches)]
+            requests_before = stand_in.request_count
+            start = time.perf_counter()
+            with concurrent.futures.ThreadPoolExecutor(max_workers=searches) as executor:
+                outputs = list(executor.map(lambda engine: engine.run(engine.crawl_city(sahaflar)), engines))
+            elapsed = time.perf_counter() - start
+            requests = stand_in.request_count - requests_before
+
+            for books in outputs:
+                if len(books) != expected:
+                    raise AssertionError(f"Eksik sonuç: {len(books)} / {expected}")
+
+            deduplicated = coalescer.stats()['deduplicated'] if coalescer else 0
+            results.append((coalescer is not None, requests, deduplicated, elapsed))
+            print(f"birleştirme={'açık' if coalescer else 'kapalı':<6} arama={searches} sunucu isteği={requests:<5} "
+                  f"paylaşılan={deduplicated:<5} süre={elapsed:6.2f}s")
+    return results
+
+
+# Arama sekmesindeki yerel aramanın biçimi
+LOCAL_SEARCH_QUERY = (
+    "SELECT baslik, yazar, fiyat_text, sahaf_name, sehir FROM kitaplar "
+    "WHERE yazar LIKE ? ORDER BY fiyat ASC LIMIT 1000"
+)
+
+
+class _ConnectPerCallDatabase:
+    """Karşılaştırma için eski erişim biçimi: her çağrıda yeni bağlantı, okuma ve yazma tek kilitte"""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+        self.lock = threading.Lock()
+
+    def save_books(self, books):
+        rows = [self.db_manager._book_row(book) for book in books]
+        with self.lock:
+            conn = sqlite3.connect(self.db_manager.db_path, timeout=30.0)
+            try:
+                conn.executemany('''
+                    INSERT OR IGNORE INTO kitaplar
+                    (unique_id, baslik, yazar, sahaf_name, sahaf_url, fiyat, fiyat_text, kitap_url, aciklama, kategori, alt_kategori, sehir,
+                     baslik_key, yazar_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                conn.commit()
+            finally:
+                conn.close()
+
+    def execute_query(self, query, params):
+        with self.lock:
+            conn = sqlite3.connect(self.db_manager.db_path, timeout=30.0)
+            try:
+                return conn.execute(query, params).fetchall()
+            finally:
+                conn.close()
+
+
+def _engine_books(sahaf_id, count):
+    return [{
+        'kitap_adi': book['title'], 'yazar': book['author'], 'fiyat': f"{book['price']:.2f} TL",
+        'fiyat_numeric': book['price'], 'site_url': book['url'], 'sahaf_adi': book['sahaf_name'],
+        'sehir': "Test",
+    } for book in generate_sahaf_books(sahaf_id, count)]
+
+
+def bench_database(initial_rows=20000, insert_batches=200, batch_size=50, readers=2):
+    """Kayıt sürerken yerel aramaların hızını ve gecikmesini ölç (eski erişim biçimi / WAL havuzu)
+
+    Bir thread 50'lik partiler halinde kitap yazarken okuyucu thread'ler arama
+    sekmesinin sorgusunu çalıştırır. Eski biçimde okuyucular yazmayı bekler.
+    """
+    results = []
+    for mode in ("eski", "wal"):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_manager = DatabaseManager(os.path.join(tmp, "kitaplar.db"))
+            if mode == "eski":
+                # Eski kod varsayılan (rollback journal) modda çalışıyordu
+                with db_manager._write() as conn:
+                    conn.execute("PRAGMA journal_mode = DELETE")
+                store = _ConnectPerCallDatabase(db_manager)
+            else:
+                store = db_manager
+            for i in range(0, initial_rows, 1000):
+                db_manager.save_books(_engine_books(i // 1000, 1000))
+
+            latencies = []
+            done = threading.Event()
+
+            def reader(index):
+                author = AUTHORS[index % len(AUTHORS)]
+                while not done.is_set():
+                    start = time.perf_counter()
+                    store.execute_query(LOCAL_SEARCH_QUERY, (f"%{author}%",))
+                    latencies.append(time.perf_counter() - start)
+
+            threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+            for thread in threads:
+                thread.start()
+            start = time.perf_counter()
+            for batch in range(insert_batches):
+                store.save_books(_engine_books(1000 + batch, batch_size))
+            insert_elapsed = time.perf_counter() - start
+            done.set()
+            for thread in threads:
+                thread.join()
+            db_manager.close()
+
+        latencies.sort()
+        insert_rate = insert_batches * batch_size / insert_elapsed
+        query_rate = len(latencies) / insert_elapsed
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000
+        results.append((mode, insert_rate, query_rate, p95))
+        print(f"erişim={mode:<4} kayıt={insert_rate:8.0f} kitap/s  arama={query_rate:6.1f} sorgu/s  "
+              f"arama p95={p95:6.1f} ms  en yavaş={latencies[-1] * 1000:6.1f} ms")
+    return results
+
+
+BENCH_CITIES = ("Adana", "Ankara", "İstanbul", "İzmir", "Konya", "Bursa", "Eskişehir", "Trabzon")
+BENCH_CATEGORIES = (("Tarih", "Osmanlı Tarihi"), ("Tarih", "Cumhuriyet Tarihi"), ("Edebiyat", "Roman"),
+                    ("Edebiyat", "Şiir"), ("Bilim ve Teknik", "Astronomi"), ("Çocuk Kitapları", ""))
+
+
+# Sahte başlıklar: bilinen bir eser adı + baskı/cilt eki ("Nutuk 2. Cilt", "Huzur İlk Baskı")
+BENCH_TITLES = (
+    "Nutuk", "Kürk Mantolu Madonna", "Tutunamayanlar", "Huzur", "Saatleri Ayarlama Enstitüsü", "İnce Memed",
+    "Kuyucaklı Yusuf", "Sinekli Bakkal", "Çalıkuşu", "Yaprak Dökümü", "Kiralık Konak", "Yaban", "Aşk-ı Memnu",
+    "Eylül", "Araba Sevdası", "Mai ve Siyah", "Sefiller", "Suç ve Ceza", "Seyahatname", "Mesnevi",
+    "Osmanlı Tarihi", "Türk Edebiyatı Tarihi", "Anadolu Notları", "İstanbul Hatırası", "Memleket Hikâyeleri",
+    "Beyaz Kale", "Kara Kitap", "Benim Adım Kırmızı", "Semaver", "Alemdağ'da Var Bir Yılan", "Devlet Ana",
+    "Bereketli Topraklar Üzerinde", "Fahim Bey ve Biz", "Dokuzuncu Hariciye Koğuşu", "Ağrı Dağı Efsanesi",
+    "Sözlük", "Ansiklopedi", "Divan", "Mektuplar", "Hatıralar",
+)
+BENCH_TITLE_SUFFIXES = ("", "", "", "1. Cilt", "2. Cilt", "İlk Baskı", "Eski Harf", "Ciltli", "Tıpkıbasım", "Seçmeler")
+BENCH_FIRST_NAMES = ("Ahmet", "Mehmet", "Ayşe", "Fatma", "Orhan", "Yaşar", "Sait", "Halide", "Reşat", "Peyami",
+                     "Cemal", "Refik", "Necip", "Attilâ", "Sabahattin", "Oğuz", "Nazım", "Ziya", "Namık", "Ömer")
+BENCH_LAST_NAMES = ("Kemal", "Pamuk", "Faik", "Edib", "Nuri", "Safa", "Süreya", "Halit", "Fazıl", "İlhan",
+                    "Ali", "Atay", "Hikmet", "Paşa", "Seyfettin", "Tanpınar", "Karaosmanoğlu", "Güntekin",
+                    "Abasıyanık", "Sevük", "Koçu", "Belge", "Baykurt", "Makal", "Ağaoğlu")
+
+
+def _bench_word(seed, words):
+    return words[(seed * 2654435761) % 4294967291 % len(words)]
+
+
+def fill_database(db_manager, rows, batch=5000):
+    """Ölçüm için şehir, kategori ve sahafa dağılmış, başlık ve yazarları çeşitli sahte kitaplarla doldur"""
+    for start in range(0, rows, batch):
+        books = []
+        for book in generate_sahaf_books(start // batch, min(batch, rows - start)):
+            kategori, alt_kategori = BENCH_CATEGORIES[book['id'] % len(BENCH_CATEGORIES)]
+            book_no = book['id']
+            title = f"{_bench_word(book_no * 3, BENCH_TITLES)} {_bench_word(book_no * 11 + 2, BENCH_TITLE_SUFFIXES)}".strip()
+            author = f"{_bench_word(book_no * 5, BENCH_FIRST_NAMES)} {_bench_word(book_no * 7 + 1, BENCH_LAST_NAMES)}"
+            books.append({
+                'kitap_adi': title, 'yazar': author, 'fiyat': f"{book['price']:.2f} TL",
+                'fiyat_numeric': book['price'], 'site_url': book['url'],
+                'aciklama': f"{PUBLISHERS[book_no % len(PUBLISHERS)]}, {book['year']}",
+                'sahaf_adi': f"Sahaf {book['id'] % 400}", 'sehir': BENCH_CITIES[book['id'] % 97 % len(BENCH_CITIES)],
+                'kategori': kategori, 'alt_kategori': alt_kategori,
+            })
+        db_manager.save_books(books)
+
+
+def check_query_plans(db_manager):
+    """Sık sorguların hiçbirinin kitaplar tablosunu baştan sona taramadığını doğrula"""
+    scans = db_manager.table_scans()
+    for name, plan in scans:
+        print(f"TABLO TARAMASI: {name}: {' / '.join(plan)}")
+    if scans:
+        raise AssertionError(f"{len(scans)} sık sorgu kitaplar tablosunu tarıyor")
+    print(f"Şema v{db_manager.schema_version()}: {len(HOT_QUERIES)} sık sorgunun hiçbiri tabloyu taramıyor.")
+
+
+def bench_indexes(rows=200000, repeat=5):
+    """Sık sorguların indeksli ve indekssiz (göç öncesi şema) sürelerini karşılaştır"""
+    index_names = [statement.split()[5] for _, _, statements in MIGRATIONS
+                   for statement in statements if isinstance(statement, str) and statement.startswith('CREATE INDEX')]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "kitaplar.db"))
+        fill_database(db_manager, rows)
+        check_query_plans(db_manager)
+
+        def timings():
+            times = {}
+            for name, query, params in HOT_QUERIES:
+                with db_manager._read() as conn:
+                    start = time.perf_counter()
+                    for _ in range(repeat):
+                        conn.execute(query, params).fetchall()
+                    times[name] = (time.perf_counter() - start) / repeat * 1000
+            return times
+
+        indexed = timings()
+        with db_manager._write() as conn:
+            for index_name in index_names:
+                conn.execute(f"DROP INDEX {index_name}")
+        plain = timings()
+        db_manager.close()
+
+    for name, _, _ in HOT_QUERIES:
+        results.append((name, plain[name], indexed[name]))
+        print(f"{name:<26} indekssiz={plain[name]:8.1f} ms  indeksli={indexed[name]:7.1f} ms  "
+              f"hızlanma={plain[name] / max(indexed[name], 1e-3):7.1f}x")
+    return results
+
+
+# (ad, search_books argümanları, eşdeğer eski LIKE koşulları)
+FTS_CASES = (
+    ("tek kelime başlık", {'kitap_adi': "Tutunamayanlar"}, ("baslik LIKE ?",), ("%Tutunamayanlar%",)),
+    ("çok kelimeli başlık", {'kitap_adi': "Kürk Mantolu"}, ("baslik LIKE ?",), ("%Kürk Mantolu%",)),
+    ("önek", {'kitap_adi': "Seyahat"}, ("baslik LIKE ?",), ("%Seyahat%",)),
+    ("nadir eşleşme", {'kitap_adi': "Fahim tıpkıbasım"}, ("baslik LIKE ?", "baslik LIKE ?"), ("%Fahim%", "%Tıpkıbasım%")),
+    ("yazar", {'yazar': "Reşat Güntekin"}, ("yazar LIKE ?", "yazar LIKE ?"), ("%Reşat%", "%Güntekin%")),
+    ("başlık + yazar + şehir", {'kitap_adi': "Nutuk", 'yazar': "Orhan", 'sehir': "Adana"},
+     ("baslik LIKE ?", "yazar LIKE ?", "sehir = ?"), ("%Nutuk%", "%Orhan%", "Adana")),
+    ("ilgi sıralı", {'kitap_adi': "Osmanlı Tarihi", 'siralama': 'ilgi'},
+     ("baslik LIKE ?", "baslik LIKE ?"), ("%Osmanlı%", "%Tarihi%")),
+)
+
+
+def bench_fts(rows=1000000, repeat=5):
+    """Yerel aramanın eski LIKE '%x%' sorgusuyla ve FTS5 indeksiyle süresini karşılaştır"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "kitaplar.db"))
+        start = time.perf_counter()
+        fill_database(db_manager, rows)
+        print(f"{rows} kitap {time.perf_counter() - start:.1f} sn'de kaydedildi")
+        # Eski sorgu SQLite'ın yerleşik LIKE'ı ile (DatabaseManager bağlantılarında LIKE Türkçe katlar)
+        like_conn = sqlite3.connect(db_manager.db_path)
+
+        for name, kwargs, like_conditions, like_params in FTS_CASES:
+            where = " AND ".join(like_conditions)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                like_conn.execute(f"SELECT COUNT(*) FROM kitaplar WHERE {where}", like_params).fetchall()
+                like_conn.execute(f"SELECT * FROM kitaplar WHERE {where} ORDER BY fiyat LIMIT 1000", like_params).fetchall()
+            like_ms = (time.perf_counter() - start) / repeat * 1000
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                total, _ = db_manager.search_books(**kwargs)
+            fts_ms = (time.perf_counter() - start) / repeat * 1000
+
+            results.append((name, total, like_ms, fts_ms))
+            print(f"{name:<24} eşleşme={total:<7} LIKE={like_ms:8.1f} ms  FTS5={fts_ms:7.1f} ms  "
+                  f"hızlanma={like_ms / max(fts_ms, 1e-3):6.1f}x")
+        like_conn.close()
+        db_manager.close()
+    return results
+
+
+# (ad, fuzzy_search_books argümanları); sorgular yazım hatalı, ilanlarda da hatalı yazımlar var
+FUZZY_CASES = (
+    ("doğru yazım", {'kitap_adi': "Tutunamayanlar"}),
+    ("eksik harf", {'kitap_adi': "Tutunamyanlar"}),
+    ("Türkçe karaktersiz", {'kitap_adi': "kurk mantolu madonna"}),
+    ("iki hata", {'kitap_adi': "Saatleri Ayarlma Enstitusu"}),
+    ("yazar", {'yazar': "Resat Guntekn"}),
+    ("başlık + yazar + şehir", {'kitap_adi': "Calikusu", 'yazar': "Reşat Nuri", 'sehir': "Adana"}),
+)
+
+
+def _typo_variants(title):
+    """Satıcıların farklı yazımları: büyük harf, Türkçe karaktersiz, eksik ve çift harf"""
+    middle = len(title) // 2
+    return (title.upper(), to_ascii(title), title[:middle] + title[middle + 1:],
+            title[:middle] + title[middle] + title[middle:])
+
+
+def bench_fuzzy(rows=200000, repeat=5, variant_copies=10):
+    """Bulanık aramayı tüm tabloyu okuyup puanlayan aramayla karşılaştır (süre ve bulunan ilan)"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "kitaplar.db"))
+        start = time.perf_counter()
+        fill_database(db_manager, rows)
+        variants = [{'kitap_adi': variant, 'yazar': "Reşat Nuri Güntekin", 'fiyat_numeric': 10 + copy,
+                     'site_url': f"https://www.nadirkitap.com/varyant-{number}-{copy}.html", 'sahaf_adi': "Sahaf 0",
+                     'sehir': BENCH_CITIES[copy % len(BENCH_CITIES)]}
+                    for number, variant in enumerate(v for title in BENCH_TITLES for v in _typo_variants(title))
+                    for copy in range(variant_copies)]
+        db_manager.save_books(variants)
+        print(f"{rows} kitap + {len(variants)} hatalı yazım {time.perf_counter() - start:.1f} sn'de kaydedildi")
+
+        for name, kwargs in FUZZY_CASES:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                total, _ = db_manager.fuzzy_search_books(**kwargs)
+            fuzzy_ms = (time.perf_counter() - start) / repeat * 1000
+
+            # Karşılaştırma: her satırın başlık/yazarını okuyup aynı eşikle süz (her alan eşiği geçmeli; aynı metin bir kez puanlanır)
+            start = time.perf_counter()
+            fields = [(search_key(kwargs[key]), index) for key, index in (('kitap_adi', 0), ('yazar', 1)) if kwargs.get(key)]
+            where = " WHERE sehir = ?" if kwargs.get('sehir') else ""
+            scores, scanned = {}, 0
+            for row in db_manager.execute_query(f"SELECT baslik, yazar FROM kitaplar{where}", [kwargs['sehir']] if where else []):
+                if row not in scores:
+                    scores[row] = min(fuzzy_score(key, search_key(row[index])) for key, index in fields)
+                scanned += scores[row] >= FUZZY_MIN_SCORE
+            scan_ms = (time.perf_counter() - start) * 1000
+
+            results.append((name, total, scanned, fuzzy_ms, scan_ms))
+            print(f"{name:<24} bulunan={total:<6} tarama={scanned:<6} trigram={fuzzy_ms:7.1f} ms  "
+                  f"tarama={scan_ms:8.1f} ms  hızlanma={scan_ms / max(fuzzy_ms, 1e-3):6.1f}x")
+        db_manager.close()
+    return results
+
+
+# Karşılaştırma için turkish_text öncesi uygulamalar
+def _replace_chain_ascii(text):
+    """Eski utils.turkish_to_english_chars: 14 ardışık str.replace"""
+    if not text:
+        return text
+    char_map = {'ç': 'c', 'Ç': 'C', 'ğ': 'g', 'Ğ': 'G', 'ı': 'i', 'I': 'I', 'İ': 'I', 'i': 'i',
+                'ö': 'o', 'Ö': 'O', 'ş': 's', 'Ş': 'S', 'ü': 'u', 'Ü': 'U'}
+    result = text
+    for tr_char, en_char in char_map.items():
+        result = result.replace(tr_char, en_char)
+    return result
+
+
+def _replace_chain_sort_key(text):
+    """Eski arama sekmesi yedeği (Turkish_Turkey.1254 yereli bulunamazsa): 12 str.replace"""
+    return (text.replace('ç', 'c1').replace('ğ', 'g1').replace('ı', 'i1').replace('ö', 'o1').replace('ş', 's1')
+            .replace('ü', 'u1').replace('Ç', 'C1').replace('Ğ', 'G1').replace('İ', 'I1').replace('Ö', 'O1')
+            .replace('Ş', 'S1').replace('Ü', 'U1'))
+
+
+def _nfkd_search_key(text):
+    """Eski utils.search_key: her Türkçe metinde NFKD ayrıştırma + aksan silme"""
+    if not text:
+        return ''
+    if not text.isascii():
+        text = re.sub(r'[\u0300-\u036f]+', '', unicodedata.normalize('NFKD', text)).replace('ı', 'i')
+    return re.sub(r'[\W_]+', ' ', text.casefold()).strip()
+
+
+# Türk alfabesi sırasında şehirler (C < Ç, I < İ, O < Ö, S < Ş, U < Ü)
+TURKISH_CITY_ORDER = ("Adana", "Ağrı", "Aydın", "Ceyhan", "Çanakkale", "Çorum", "Iğdır", "Isparta", "İstanbul",
+                      "İzmir", "Ordu", "Ödemiş", "Sinop", "Şanlıurfa", "Uşak", "Ünye", "Zonguldak")
+
+
+def bench_turkish(count=200000, repeat=3):
+    """turkish_text tablolarını eski str.replace/NFKD fonksiyonlarıyla karşılaştır (süre ve sonuç)"""
+    texts = []
+    for number in range(count):
+        text = (f"{_bench_word(number * 3, BENCH_TITLES)} {_bench_word(number * 11 + 2, BENCH_TITLE_SUFFIXES)}"
+                if number % 2 else f"{_bench_word(number * 5, BENCH_FIRST_NAMES)} {_bench_word(number * 7 + 1, BENCH_LAST_NAMES)}")
+        # Satıcıların bir kısmı büyük harf yazar
+        texts.append(turkish_upper(text) if number % 3 == 0 else text)
+    circumflex = str.maketrans('âÂîÎûÛ', 'aAiIuU')  # Eski tablo şapkalı harfleri çevirmezdi
+
+    cases = (
+        ("ASCII (URL)", _replace_chain_ascii, to_ascii,
+         lambda old, new: old.translate(circumflex) == new),
+        ("katlama (istek listesi)", lambda text: _replace_chain_ascii(text).casefold(), fold,
+         lambda old, new: old.translate(circumflex).casefold() == new),
+        ("arama anahtarı", _nfkd_search_key, search_key, lambda old, new: old == new),
+    )
+    results = []
+    for name, old_function, new_function, same in cases:
+        timings = []
+        for function in (old_function, new_function):
+            start = time.perf_counter()
+            for _ in range(repeat):
+                outputs = [function(text) for text in texts]
+            timings.append(((time.perf_counter() - start) / repeat * 1000, outputs))
+        (old_ms, old_outputs), (new_ms, new_outputs) = timings
+        matching = sum(same(old, new) for old, new in zip(old_outputs, new_outputs))
+        results.append((name, old_ms, new_ms))
+        print(f"{name:<24} eski={old_ms:7.1f} ms  yeni={new_ms:7.1f} ms  hızlanma={old_ms / max(new_ms, 1e-3):5.1f}x  "
+              f"aynı sonuç={matching}/{len(texts)}")
+
+    sort_keys = [("sıralama (eski yedek)", _replace_chain_sort_key), ("sıralama (sort_key)", sort_key)]
+    # Eski birincil yol: Türkçe yerel yüklüyse locale.strxfrm
+    for name in ('Turkish_Turkey.1254', 'tr_TR.UTF-8', 'tr_TR.utf8'):
+        try:
+            locale.setlocale(locale.LC_COLLATE, name)
+        except locale.Error:
+            continue
+        sort_keys.insert(0, (f"sıralama ({name})", locale.strxfrm))
+        break
+    else:
+        print("Türkçe yerel yüklü değil; locale.strxfrm ölçülmedi")
+    for name, key in sort_keys:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            sorted(texts, key=key)
+        elapsed = (time.perf_counter() - start) / repeat * 1000
+        cities = sorted(reversed(TURKISH_CITY_ORDER), key=key)
+        results.append((name, elapsed, elapsed))
+        print(f"{name:<24} {elapsed:7.1f} ms  şehir sırası {'doğru' if tuple(cities) == TURKISH_CITY_ORDER else 'YANLIŞ: ' + ', '.join(cities)}")
+
+    # SQL: yerleşik BINARY sıralama ve register_sqlite ile COLLATE TURKCE
+    conn = sqlite3.connect(":memory:")
+    register_sqlite(conn)
+    conn.execute("CREATE TABLE metin (deger TEXT)")
+    conn.executemany("INSERT INTO metin VALUES (?)", ((text,) for text in texts))
+    conn.execute("CREATE TABLE sehir (ad TEXT)")
+    conn.executemany("INSERT INTO sehir VALUES (?)", ((city,) for city in reversed(TURKISH_CITY_ORDER)))
+    for collation in ("BINARY", "TURKCE"):
+        start = time.perf_counter()
+        conn.execute(f"SELECT deger FROM metin ORDER BY deger COLLATE {collation}").fetchall()
+        elapsed = (time.perf_counter() - start) * 1000
+        cities = [row[0] for row in conn.execute(f"SELECT ad FROM sehir ORDER BY ad COLLATE {collation}")]
+        results.append((f"ORDER BY {collation}", elapsed, elapsed))
+        print(f"ORDER BY COLLATE {collation:<8} {elapsed:7.1f} ms  şehir sırası "
+              f"{'doğru' if tuple(cities) == TURKISH_CITY_ORDER else 'yanlış'}")
+    conn.close()
+
+    # Yerel arama: büyük harfle yazılmış başlıkta ı/I, şema v4 öncesi ayrı kelimelerdi
+    with tempfile.TemporaryDirectory() as tmp:
+        db_manager = DatabaseManager(os.path.join(tmp, "kitaplar.db"))
+        db_manager.save_books([{'kitap_adi': title, 'site_url': f"https://www.nadirkitap.com/isik-{number}.html"}
+                               for number, title in enumerate(("IŞIK", "ışık", "Işıklı Yollar", "Işık Kitabevi"))])
+        counts = [db_manager.search_books(kitap_adi=query)[0] for query in ("ışık", "IŞIK", "isik")]
+        db_manager.close()
+    print(f"yerel arama ışık/IŞIK/isik: {counts} (4 ilanın hepsi bulunmalı)")
+    assert counts == [4, 4, 4]
+    return results
+
+
+BENCHMARKS = {
+    'crawl': bench_crawl,
+    'parsers': bench_parsers,
+    'rate': bench_rate_limiter,
+    'frontier': bench_frontier,
+    'coalesce': bench_coalesce,
+    'database': bench_database,
+    'indexes': bench_indexes,
+    'fts': bench_fts,
+    'fuzzy': bench_fuzzy,
+    'turkish': bench_turkish,
+}
+
+
+def main(argv=None):
+    argv = argv if argv is not None else sys.argv[1:]
+    names = [arg for arg in argv if arg in BENCHMARKS]
+    paths = [arg for arg in argv if arg.endswith('.html')]
+    unknown = [arg for arg in argv if arg not in names and arg not in paths]
+    if unknown:
+        print(f"Bilinmeyen ölçüm: {', '.join(unknown)} (seçenekler: {', '.join(BENCHMARKS)})")
+        return 2
+    for name in names or list(BENCHMARKS):
+        print(f"== {name} ==")
+        if name == 'parsers':
+            BENCHMARKS[name](paths or None)
+        else:
+            BENCHMARKS[name]()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+kategoriler.json'daki tüm alt kategorilerin (veya bir alt ağacın) taranması
+
+Her alt kategori ayrı bir genel aramadır. Kategoriler birkaç thread'de
+paralel taranır; motorlar oturum havuzunu ve hız sınırlayıcıyı paylaştığı
+için toplam istek hızı tek bir aramanınkiyle aynı sınırda kalır. Birden çok
+kategoride görünen ilanlar ilk bulunduğu kategoriyle bir kez kaydedilir.
+"""
+
+import json
+import threading
+import time
+import concurrent.futures
+
+from crawler import CrawlEngine, DEFAULT_CONCURRENCY, BASE_URL
+
+
+DEFAULT_PARALLEL_CATEGORIES = 4
+
+
+def _matches(value, record_id, record_name):
+    value = str(value)
+    return value == str(record_id) or value.casefold() == record_name.casefold()
+
+
+def category_targets(path="kategoriler.json", ana=None, alt=None):
+    """Taranacak kategoriler: kategori2/kategori ID'leri ve adlarıyla
+
+    ana verilirse yalnızca o ana kategorinin alt ağacı, alt da verilirse tek
+    alt kategori döner (ID veya ad). Alt kategorisi olmayan ana kategori
+    kendisi hedef olur.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        kategoriler = json.load(f)
+
+    targets = []
+    for ana_kayit in kategoriler:
+        if ana and not _matches(ana, ana_kayit['ana_kategori_id'], ana_kayit['ana_kategori_adi']):
+            continue
+        alt_kayitlar = ana_kayit.get('alt_kategoriler') or [None]
+        for alt_kayit in alt_kayitlar:
+            if alt and (alt_kayit is None or not _matches(alt, alt_kayit['kategori_id'], alt_kayit['kategori_adi'])):
+                continue
+            targets.append({
+                'kategori2': ana_kayit['ana_kategori_id'],
+                'kategori': alt_kayit['kategori_id'] if alt_kayit else "",
+                'kategori_adi': ana_kayit['ana_kategori_adi'],
+                'alt_kategori_adi': alt_kayit['kategori_adi'] if alt_kayit else "",
+            })
+    return targets
+
+
+def target_label(target):
+    if target['alt_kategori_adi']:
+        return f"{target['kategori_adi']} / {target['alt_kategori_adi']}"
+    return target['kategori_adi']
+
+
+class CategorySweep:
+    """Hedef kategorileri paralel tarayıp sonuçları tekilleştiren tarama
+
+    concurrency toplam eşzamanlı istek sınırıdır ve paralel kategoriler
+    arasında bölünür. db_manager verilirse kategori başına durum ve
+    sayaçlar category_sweep_item tablosuna yazılır; sweep_id ile yarıda
+    kalmış bir tarama sürdürülürse tamamlanmış kategoriler atlanır.
+    """
+
+    def __init__(self, search_params, targets, db_manager=None, auto_save=False,
+                 concurrency=DEFAULT_CONCURRENCY, parallel_categories=DEFAULT_PARALLEL_CATEGORIES,
+                 session_pool=None, parse_pool=None, page_cache=None, rate_limiter=None,
+                 coalescer=None, sahaf_registry=None, base_url=BASE_URL, sweep_id=None,
+                 progress_callback=None, category_callback=None):
+        self.search_params = search_params
+        self.targets = targets
+        self.db_manager = db_manager
+        self.auto_save = auto_save
+        self.parallel_categories = max(1, min(parallel_categories, len(targets) or 1))
+        self.category_concurrency = max(1, int(concurrency) // self.parallel_categories)
+        self.session_pool = session_pool
+        self.parse_pool = parse_pool
+        self.page_cache = page_cache
+        self.rate_limiter = rate_limiter
+        self.coalescer = coalescer
+        self.sahaf_registry = sahaf_registry
+        self.base_url = base_url
+        self.sweep_id = sweep_id
+        self.progress_callback = progress_callback
+        # category_callback(tamamlanan, toplam, hedef, istatistik) her kategori bitince
+        self.category_callback = category_callback
+        self.stats = {}
+        self.incomplete = []
+        self.request_count = 0
+        self._seen = set()
+        self._lock = threading.Lock()
+        self._engines = set()
+        self._completed = 0
+        self._stop_requested = False
+
+    def _emit(self, message):
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    def request_stop(self):
+        self._stop_requested = True
+        with self._lock:
+            engines = list(self._engines)
+        for engine in engines:
+            engine.request_stop()
+
+    @property
+    def stopped(self):
+        return self._stop_requested
+
+    def _record(self, target, **fields):
+        if self.db_manager and self.sweep_id is not None:
+            if fields.get('status') == 'done' and self.auto_save:
+                # Kitaplar kuyruktan yazıldıktan sonra kategori tamamlandı sayılır
+                self.db_manager.update_sweep_item_async(self.sweep_id, target, **fields)
+            else:
+                self.db_manager.update_sweep_item(self.sweep_id, target, **fields)
+
+    def _crawl_target(self, target):
+        if self._stop_requested:
+            return []
+        label = target_label(target)
+        engine = CrawlEngine(
+            dict(self.search_params, **target),
+            concurrency=self.category_concurrency,
+            base_url=self.base_url,
+            session_pool=self.session_pool,
+            parse_pool=self.parse_pool,
+            page_cache=self.page_cache,
+            cache_max_age=self.search_params.get('cache_max_age', 0),
+            rate_limiter=self.rate_limiter,
+            coalescer=self.coalescer,
+            sahaf_registry=self.sahaf_registry,
+            progress_callback=self.progress_callback
+        )
+        with self._lock:
+            self._engines.add(engine)
+            if self.session_pool is None:
+                self.session_pool = engine.session_pool
+        self._record(target, status='running', started_at=time.time())
+
+        pages = 0
+
+        def on_page_done(pages_done, page_books, total_books):
+            nonlocal pages
+            pages = pages_done
+
+        try:
+            books = engine.run(engine.crawl_query(label, on_page_done=on_page_done,
+                                                  partition_by=self.search_params.get('partition_by') or 'fiyat'))
+        finally:
+            with self._lock:
+                self._engines.discard(engine)
+                self.request_count += engine.request_count
+
+        # Başka kategoride zaten bulunan ilanlar tekrar kaydedilmez
+        with self._lock:
+            new_books = []
+            for book_data in books:
+                key = book_data.get('site_url')
+                if key and key in self._seen:
+                    continue
+                self._seen.add(key)
+                new_books.append(book_data)
+            self.incomplete.extend(engine.incomplete)
+            self._completed += 1
+            completed = self._completed
+
+        stats = {
+            'pages': pages,
+            'books': len(books),
+            'new_books': len(new_books),
+            'duplicates': len(books) - len(new_books),
+            'incomplete': len(engine.incomplete),
+        }
+        self.stats[label] = stats
+
+        if self.auto_save and self.db_manager and new_books:
+            self.db_manager.save_books_async(new_books)
+        # Durdurulan veya eksik kalan kategori devam ederken baştan taranır
+        status = 'stopped' if self._stop_requested else ('incomplete' if engine.incomplete else 'done')
+        self._record(target, status=status, finished_at=time.time(), **stats)
+
+        self._emit(
+            f"Kategori {completed}/{len(self.targets)}: {label} - {len(books)} ilan, "
+            f"{len(new_books)} yeni, {stats['duplicates']} başka kategoride de var"
+        )
+        if self.category_callback:
+            self.category_callback(completed, len(self.targets), target, stats)
+        return new_books
+
+    def run(self):
+        """Tüm hedef kategorileri tara, tekilleştirilmiş kitapları döndür"""
+        targets = self.targets
+        if self.db_manager and self.sweep_id is not None:
+            done = {(item['kategori2'], item['kategori'])
+                    for item in self.db_manager.get_sweep_items(self.sweep_id) if item['status'] == 'done'}
+            targets = [t for t in targets if (t['kategori2'], t['kategori']) not in done]
+            if done:
+                self._emit(f"Kaldığı yerden devam: {len(done)} kategori tamamlanmış")
+                self._completed = len(self.targets) - len(targets)
+        elif self.db_manager and self.auto_save:
+            self.sweep_id = self.db_manager.create_sweep(self.search_params, targets)
+
+        self._emit(
+            f"{len(targets)} kategori taranacak ({self.parallel_categories} paralel, "
+            f"kategori başına {self.category_concurrency} eşzamanlı istek)"
+        )
+
+        all_books = []
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel_categories) as executor:
+            for books in executor.map(self._crawl_target, targets):
+                all_books.extend(books)
+
+        if self.db_manager and self.sweep_id is not None:
+            finished = not self._stop_requested and not self.incomplete
+            self.db_manager.finish_sweep(self.sweep_id, 'done' if finished else 'stopped')
+        return all_books
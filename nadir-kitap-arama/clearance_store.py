@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Cloudflare clearance çerezlerinin kalıcı deposu
+"""
+
+import json
+import os
+import threading
+import time
+
+
+CLEARANCE_COOKIES = ('cf_clearance', '__cf_bm')
+
+
+class ClearanceStore:
+    """Çözülmüş Cloudflare çerezlerini ve user-agent'ı süreleriyle birlikte saklar
+
+    cf_clearance çerezi user-agent'a bağlı olduğundan ikisi birlikte tutulur;
+    yeni oturumlar bu depodan beslenerek challenge turunu atlar.
+    """
+
+    def __init__(self, path="cf_clearance.json", default_ttl=3600):
+        self.path = path
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Clearance deposu okunamadı: {e}")
+            return {}
+        now = time.time()
+        return {domain: entry for domain, entry in entries.items() if entry.get('expires', 0) > now}
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"Clearance deposu yazılamadı: {e}")
+
+    def get(self, domain):
+        """Süresi dolmamış kaydı döndür"""
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry and entry['expires'] > time.time():
+                return entry
+            return None
+
+    def apply(self, session, domain):
+        """Oturumu kayıtlı çerez ve user-agent ile besle; kayıt varsa True"""
+        entry = self.get(domain)
+        if not entry:
+            return False
+        session.headers['User-Agent'] = entry['user_agent']
+        for name, value in entry['cookies'].items():
+            session.cookies.set(name, value, domain=domain)
+        return True
+
+    def capture(self, session, domain):
+        """Oturumdaki clearance çerezini depoya yaz (değiştiyse)"""
+        cookies = {}
+        expires = None
+        for cookie in session.cookies:
+            if cookie.name in CLEARANCE_COOKIES and domain.endswith(cookie.domain.lstrip('.')):
+                cookies[cookie.name] = cookie.value
+                if cookie.name == 'cf_clearance' and cookie.expires:
+                    expires = cookie.expires
+        if 'cf_clearance' not in cookies:
+            return False
+
+        user_agent = session.headers.get('User-Agent', '')
+        with self._lock:
+            entry = self._entries.get(domain)
+            if entry and entry['cookies'] == cookies and entry['user_agent'] == user_agent:
+                return False
+            self._entries[domain] = {
+                'cookies': cookies,
+                'user_agent': user_agent,
+                'expires': expires or time.time() + self.default_ttl,
+            }
+            self._save()
+        return True
+
+    def invalidate(self, domain):
+        """Artık geçerli olmayan kaydı sil"""
+        with self._lock:
+            if self._entries.pop(domain, None) is not None:
+                self._save()
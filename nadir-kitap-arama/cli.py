@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GUI'siz komut satırı taraması (cron ve sunucular için)
+
+PyQt import edilmez. İlerleme stdout'a satır başına bir JSON olayı olarak
+yazılır:
+
+    {"event": "log", "message": "..."}
+    {"event": "progress", "done": 120, "total": 480, "eta": 35.2}
+    {"event": "wishlist", "kitap_adi": "...", "matches": 12, "cheapest_price": 45.0, ...}
+    {"event": "result", "books": 3120, "incomplete": [], "requests": 480, "deduplicated": 0, "elapsed": 41.7}
+    {"event": "error", "message": "..."}
+
+Çıkış kodları: 0 başarılı, 1 hata, 2 hatalı kullanım, 3 eksik kalan sahaf
+var, 130 kullanıcı tarafından durduruldu.
+
+    python cli.py --sehir Adana --db kitaplar.db
+    python cli.py --kitap-adi "Nutuk" --yazar "Atatürk" --concurrency 8
+    python cli.py --sehir İzmir --ana-kategori "Tarih" --kategori "Osmanlı Tarihi"
+    python cli.py --kategori-taramasi --ana-kategori "Bilim ve Teknik"
+    python cli.py --istek-listesi istediklerim.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import threading
+import time
+
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_INCOMPLETE = 3
+EXIT_INTERRUPTED = 130
+
+SORT_ORDERS = ('fiyatartan.', 'fiyatazalan.', 'tarihyeni.', 'tariheski.')
+
+# Olaylar asıl stdout'a yazılır; modüllerin print çıktıları stderr'e yönlendirilir
+_events = sys.stdout
+
+
+def emit(event, **fields):
+    """Tek satırlık JSON olayı yaz"""
+    _events.write(json.dumps(dict(event=event, **fields), ensure_ascii=False) + "\n")
+    _events.flush()
+
+
+def find_category(kategoriler, ana, alt):
+    """Ana/alt kategoriyi ID veya ada göre bul; (ana, alt) kayıtlarını döndür"""
+    def matches(value, record_id, record_name):
+        return value == record_id or value.casefold() == record_name.casefold()
+
+    ana_kayit = None
+    if ana:
+        ana_kayit = next((k for k in kategoriler if matches(ana, k['ana_kategori_id'], k['ana_kategori_adi'])), None)
+        if ana_kayit is None:
+            raise ValueError(f"Ana kategori bulunamadı: {ana}")
+    if not alt:
+        return ana_kayit, None
+    for kayit in ([ana_kayit] if ana_kayit else kategoriler):
+        for alt_kayit in kayit.get('alt_kategoriler', []):
+            if matches(alt, alt_kayit['kategori_id'], alt_kayit['kategori_adi']):
+                return kayit, alt_kayit
+    raise ValueError(f"Alt kategori bulunamadı: {alt}")
+
+
+def build_search_params(args):
+    """Komut satırı argümanlarını GUI'nin ürettiği arama parametrelerine çevir"""
+    ana_kayit = alt_kayit = None
+    if args.ana_kategori or args.kategori:
+        with open(args.kategoriler, 'r', encoding='utf-8') as f:
+            ana_kayit, alt_kayit = find_category(json.load(f), args.ana_kategori, args.kategori)
+
+    return {
+        'yazar': args.yazar.strip(),
+        'kitap_adi': args.kitap_adi.strip(),
+        'kategori2': ana_kayit['ana_kategori_id'] if ana_kayit else "",
+        'kategori': alt_kayit['kategori_id'] if alt_kayit else "",
+        'kategori_adi': ana_kayit['ana_kategori_adi'] if ana_kayit else "",
+        'alt_kategori_adi': alt_kayit['kategori_adi'] if alt_kayit else "",
+        'selected_city': args.sehir or None,
+        'secili_sehir': args.sehir or "",
+        'siralama': args.siralama,
+        'concurrency': args.concurrency,
+        'cache_max_age': args.onbellek_yas,
+        'partition_by': args.bolumle or "",
+        'incremental': args.artimli,
+        'skip_unchanged': args.degismeyenleri_atla,
+        'category_sweep': args.kategori_taramasi,
+        'parallel_categories': args.paralel_kategori,
+    }
+
+
+def add_wishlist(search_params, path, max_pages):
+    """İstek listesini dosyadan okuyup arama parametrelerine ekle"""
+    from wishlist import load_wishlist
+
+    try:
+        items = load_wishlist(path)
+    except (OSError, ValueError, csv.Error) as e:
+        raise ValueError(f"İstek listesi okunamadı: {e}")
+    if not items:
+        raise ValueError(f"İstek listesi boş: {path}")
+    search_params['wishlist'] = items
+    search_params['wishlist_name'] = os.path.splitext(os.path.basename(path))[0]
+    search_params['wishlist_max_pages'] = max_pages
+    return search_params
+
+
+def parse_args(argv):
+    from crawl_defaults import DEFAULT_CONCURRENCY, BASE_URL
+
+    parser = argparse.ArgumentParser(description="Nadir Kitap komut satırı taraması (JSON satırları çıktısı)")
+    parser.add_argument('--sehir', default='', help="Şehir (boşsa genel arama)")
+    parser.add_argument('--ana-kategori', default='', help="Ana kategori ID'si veya adı")
+    parser.add_argument('--kategori', default='', help="Alt kategori ID'si veya adı")
+    parser.add_argument('--kitap-adi', default='')
+    parser.add_argument('--yazar', default='')
+    parser.add_argument('--siralama', choices=SORT_ORDERS, default='fiyatartan.')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help="Eşzamanlı istek sayısı")
+    parser.add_argument('--db', default='kitaplar.db', help="Sonuçların yazılacağı SQLite veritabanı")
+    parser.add_argument('--kayit-yok', action='store_true', help="Sonuçları veritabanına yazma")
+    parser.add_argument('--artimli', action='store_true', help="Yalnızca son senkrondan beri eklenen ilanlar")
+    parser.add_argument('--degismeyenleri-atla', action='store_true', help="Parmak izi değişmeyen sahafları atla")
+    parser.add_argument('--bolumle', choices=('fiyat', 'tarih'), help="Genel aramayı aralıklara böl")
+    parser.add_argument('--onbellek-yas', type=int, default=0, help="Sayfa önbelleği en fazla yaşı (saniye)")
+    parser.add_argument('--kategori-taramasi', action='store_true',
+                        help="Tüm alt kategorileri (--ana-kategori verilirse onun alt ağacını) ayrı ayrı tara")
+    parser.add_argument('--paralel-kategori', type=int, default=4, help="Kategori taramasında aynı anda taranan kategori")
+    parser.add_argument('--istek-listesi', help="Kitap adı/yazar listesi (CSV veya JSON) için toplu arama")
+    parser.add_argument('--istek-sayfa', type=int, default=10, help="İstek listesinde sorgu başına en fazla sayfa")
+    parser.add_argument('--devam', action='store_true',
+                        help="Yarıda kalan son şehir taramasını (--kategori-taramasi ile kategori taramasını) sürdür")
+    parser.add_argument('--kategoriler', default='kategoriler.json', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', default=BASE_URL, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sys.stdout = sys.stderr
+    # Artımlı arama veritabanındaki ilanlara gelince durur; yeni ilanlar kaydedilmezse sonraki arama onları tekrar bulur
+    if args.artimli and args.kayit_yok:
+        emit('error', message="--artimli, --kayit-yok ile birlikte kullanılamaz")
+        return EXIT_USAGE
+
+    # Ağır modüller argümanlar okunduktan sonra yüklenir (--help anında döner)
+    from database import DatabaseManager
+    from sahaf_registry import get_sahaf_registry
+    from search_pipeline import SearchPipeline
+
+    db_manager = DatabaseManager(args.db)
+    resume_checkpoint = None
+    try:
+        if args.devam and args.kategori_taramasi:
+            sweep = db_manager.get_resumable_sweep()
+            if not sweep:
+                emit('error', message="Devam ettirilebilir kategori taraması yok")
+                return EXIT_USAGE
+            sweep_id, search_params, _ = sweep
+            search_params['sweep_id'] = sweep_id
+        elif args.devam:
+            checkpoint = db_manager.get_resumable_checkpoint()
+            if not checkpoint:
+                emit('error', message="Devam ettirilebilir tarama yok")
+                return EXIT_USAGE
+            resume_checkpoint, search_params, _ = checkpoint
+        else:
+            search_params = build_search_params(args)
+            if args.istek_listesi:
+                add_wishlist(search_params, args.istek_listesi, args.istek_sayfa)
+    except ValueError as e:
+        emit('error', message=str(e))
+        return EXIT_USAGE
+
+    if search_params.get('selected_city') and not get_sahaf_registry().by_city(search_params['selected_city']):
+        emit('error', message=f"Şehirde sahaf bulunamadı: {search_params['selected_city']}")
+        return EXIT_USAGE
+
+    auto_save = not args.kayit_yok or resume_checkpoint is not None or search_params.get('sweep_id') is not None
+    pipeline = SearchPipeline(
+        search_params,
+        db_manager if auto_save or search_params.get('skip_unchanged') else None,
+        auto_save,
+        resume_checkpoint=resume_checkpoint,
+        progress_callback=lambda message: emit('log', message=message),
+        progress_changed=lambda done, total, eta: emit('progress', done=done, total=total,
+                                                       eta=None if eta < 0 else round(eta, 1)),
+        base_url=args.base_url
+    )
+
+    # Tarama ayrı thread'de çalışır; Ctrl+C / SIGINT taramayı düzgünce durdurur
+    # (Thread.join kesilirse thread bitmiş görünebildiği için bitiş bir Event ile izlenir)
+    outcome = {}
+    finished = threading.Event()
+
+    def run():
+        try:
+            outcome['books'] = pipeline.run()
+        except Exception as e:
+            outcome['error'] = e
+        finally:
+            finished.set()
+
+    started = time.monotonic()
+    threading.Thread(target=run, daemon=True).start()
+    while not finished.is_set():
+        try:
+            finished.wait(0.5)
+        except KeyboardInterrupt:
+            pipeline.stop_search()
+
+    # Kuyruktaki kayıtlar bitmeden çıkılmaz
+    db_manager.wait_for_save_completion()
+
+    if 'error' in outcome:
+        emit('error', message=str(outcome['error']))
+        return EXIT_ERROR
+    if pipeline.stopped:
+        emit('result', books=0, incomplete=[], elapsed=round(time.monotonic() - started, 1), stopped=True)
+        return EXIT_INTERRUPTED
+
+    incomplete = [{'sahaf': name, 'page': page, 'reason': reason}
+                  for name, page, reason in pipeline.engine.incomplete]
+    if pipeline.wishlist:
+        for item in pipeline.wishlist.summary:
+            emit('wishlist', **item)
+    emit('result', books=len(outcome['books']), incomplete=incomplete,
+         requests=pipeline.engine.request_count, deduplicated=pipeline.engine.coalescer.stats()['deduplicated'],
+         elapsed=round(time.monotonic() - started, 1))
+    return EXIT_INCOMPLETE if incomplete else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
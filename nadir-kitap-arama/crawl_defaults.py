@@ -0,0 +1,12 @@
+# -*- coding: utf-8 -*-
+"""
+Tarama sabitleri
+
+Bağımlılığı yoktur; cli.py --help seçenekleri kurarken crawler'ı
+(cloudscraper, requests, asyncio) yüklemeden bu değerleri okur.
+"""
+
+BASE_URL = "https://www.nadirkitap.com"
+PAGE_SIZE = 25  # nadirkitap sonuç sayfası başına kitap sayısı
+DEFAULT_CONCURRENCY = 16
+MAX_QUERY_PAGES = 100  # Tek sorguda taranacak en fazla sayfa; aşılırsa sorgu aralıklara bölünür
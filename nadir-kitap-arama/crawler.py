@@ -0,0 +1,761 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio tabanlı tarama motoru
+"""
+
+import asyncio
+import hashlib
+import re
+import threading
+import time
+import urllib.parse
+import concurrent.futures
+
+from turkish_text import to_ascii
+from utils import extract_sahaf_id
+from session_pool import SessionPool
+from parsers import get_parser
+from partitioning import initial_partitions
+from resilience import RetryPolicy, CircuitBreaker, TransientFetchError, RETRYABLE_STATUS, RETRYABLE_ERRORS
+from crawl_defaults import BASE_URL, PAGE_SIZE, DEFAULT_CONCURRENCY, MAX_QUERY_PAGES
+
+
+def build_search_url(search_params, page, sahaf_id="0", base_url=BASE_URL):
+    """kitapara.php arama URL'ini oluştur"""
+    # Türkçe karakterleri İngilizce'ye çevir ve URL encode et
+    kitap_adi_converted = to_ascii(search_params.get('kitap_adi', ''))
+    yazar_converted = to_ascii(search_params.get('yazar', ''))
+    kitap_adi = urllib.parse.quote(kitap_adi_converted) if kitap_adi_converted else ''
+    yazar = urllib.parse.quote(yazar_converted) if yazar_converted else ''
+    kategori2 = search_params.get('kategori2', '')
+    kategori = search_params.get('kategori', '')
+    siralama = search_params.get('siralama', 'fiyatartan.')
+    # Fiyat ve yıl aralıkları (bölümlenmiş aramalarda kullanılır)
+    fiyat1 = search_params.get('fiyat1', '')
+    fiyat2 = search_params.get('fiyat2', '')
+    tarih1 = search_params.get('tarih1', 0)
+    tarih2 = search_params.get('tarih2', 0)
+
+    return f"{base_url}/kitapara.php?ara=aramayap&ref=&kategori2={kategori2}&kitap_Adi={kitap_adi}&yazar={yazar}&ceviren=&hazirlayan=&siralama={siralama}&satici={sahaf_id}&ortakkargo=0&yayin_Evi=&yayin_Yeri=&isbn=&fiyat1={fiyat1}&fiyat2={fiyat2}&tarih1={tarih1}&tarih2={tarih2}&guzelciltli=0&birincibaski=0&imzali=0&eskiyeni=0&cilt=0&listele=&tip=&dil=0&kategori={kategori}&page={page}"
+
+
+# Artımlı senkron durumunu tanımlayan arama alanları (sıralama ve sayfa hariç)
+QUERY_KEY_FIELDS = ('kitap_adi', 'yazar', 'kategori2', 'kategori')
+INCREMENTAL_SORT = 'tarihyeni.'
+
+
+def query_key(search_params):
+    """Artımlı senkron durumu için sorgunun kısa ve okunur anahtarı"""
+    return "&".join(f"{field}={search_params.get(field, '')}" for field in QUERY_KEY_FIELDS)
+
+
+FINGERPRINT_TOP_N = 10
+
+
+def listing_fingerprint(listing, top_n=FINGERPRINT_TOP_N):
+    """Sahafın en yeni ilanlar sayfasından envanter parmak izi
+
+    Toplam sonuç sayısı (bulunamazsa sayfa sayısı) satılan ilanları, en yeni
+    top_n ilanın URL'leri eklenenleri yakalar.
+    """
+    count = listing.total if listing.total is not None else f"p{listing.last_page}"
+    top = "|".join(book_data.get('site_url', '') for book_data in listing.books[:top_n])
+    return f"{count}:{hashlib.sha1(top.encode('utf-8')).hexdigest()}"
+
+
+def extract_listing_id(book_url):
+    """İlan URL'inden ilan numarasını çıkar (yeni ilanların numarası büyüktür; yoksa 0)"""
+    match = re.search(r'kitap(\d+)\.html', book_url or '')
+    return int(match.group(1)) if match else 0
+
+
+def _listing_price(book_data):
+    return book_data.get('fiyat_numeric') or 0
+
+
+def _listing_number(book_data):
+    return extract_listing_id(book_data.get('site_url'))
+
+
+# Aralık sonuçları birleştirilirken sitenin sıralaması yeniden kurulur: siralama -> (anahtar, azalan)
+MERGE_SORT_KEYS = {
+    'fiyatartan.': (_listing_price, False),
+    'fiyatazalan.': (_listing_price, True),
+    'tarihyeni.': (_listing_number, True),
+    'tariheski.': (_listing_number, False),
+}
+
+
+class CrawlEngine:
+    """Tüm sahaf ve sayfalar için ortak eşzamanlılık sınırıyla çalışan tarama motoru
+
+    Ağ istekleri bloklayan cloudscraper oturumlarıyla yapıldığından her istek
+    sınırlı bir thread havuzunda çalışır; hangi isteğin ne zaman gideceğine
+    event loop ve semafor karar verir.
+    """
+
+    def __init__(self, search_params, concurrency=DEFAULT_CONCURRENCY, base_url=BASE_URL,
+                 timeout=10, session_pool=None, parser=None, parse_pool=None,
+                 page_cache=None, cache_max_age=0, rate_limiter=None, retry_policy=None,
+                 circuit_breaker=None, sahaf_registry=None, sync_store=None, coalescer=None,
+                 progress_callback=None):
+        # Artımlı modda (sync_store: known_urls ve get_last_sync sağlayan veritabanı)
+        # sonuçlar en yeniden eskiye sıralanır ve bilinen ilanlarda durulur
+        self.sync_store = sync_store
+        self.incremental = bool(search_params.get('incremental') and sync_store)
+        if self.incremental:
+            search_params = dict(search_params, siralama=INCREMENTAL_SORT)
+        self.query_key = query_key(search_params)
+        # Parmak izi değişmeyen sahaflar yeniden taranmaz, kitaplar veritabanından gelir
+        self.skip_unchanged = bool(search_params.get('skip_unchanged') and sync_store and not self.incremental)
+        # Bu taramada eksiksiz taranan sahafların parmak izleri: {sahaf_id: (parmak izi, ilan URL'leri)}
+        self.fingerprints = {}
+        self.skipped = []
+        self.recrawled = []
+        # Sonuna kadar senkronlanan sahaflar: {sahaf_id ("0": genel arama): en yeni ilan URL'i}
+        self.synced = {}
+        self.search_params = search_params
+        self.concurrency = max(1, int(concurrency))
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session_pool = session_pool or SessionPool(size=self.concurrency)
+        self.parser = get_parser(parser)
+        self.parse_pool = parse_pool
+        # cache_max_age saniye cinsinden; 0 ise önbellek kullanılmaz
+        self.page_cache = page_cache if cache_max_age else None
+        self.cache_max_age = cache_max_age
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        # Aramalar arasında paylaşılırsa aynı anda istenen aynı sayfa bir kez indirilir
+        self.coalescer = coalescer
+        # Genel aramada kitabın şehri sahaf kaydından bulunur
+        self.sahaf_registry = sahaf_registry
+        # İlk sayfası retry_policy sonrasında da alınamayan, sona ertelenen sahaflar: {sahaf_id: (sahaf, sayfa, neden)}
+        self.parked = {}
+        # Şehir taramasında sayfa ilerlemesini ve ETA'yı izleyen plan (planner.CrawlPlan)
+        self.plan = None
+        # Sahafın her sayfası tamamlandığında page_callback(sahaf_id, sayfa, kitaplar) (kontrol noktası için)
+        self.page_callback = None
+        # Tüm denemelere rağmen tamamlanamayanlar: [(ad, kalınan sayfa, neden)]
+        self.incomplete = []
+        self.progress_callback = progress_callback
+        self.request_count = 0
+        self._stop_requested = False
+        self._count_lock = threading.Lock()
+        self._semaphore = None
+        self._parse_slots = None
+        self._executor = None
+
+    def request_stop(self):
+        """Taramayı durdur"""
+        self._stop_requested = True
+
+    @property
+    def stopped(self):
+        return self._stop_requested
+
+    def _emit(self, message):
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    def _fetch_blocking(self, url, use_cache=True):
+        if self.page_cache and use_cache:
+            cached = self.page_cache.get(url, self.cache_max_age)
+            if cached is not None:
+                return cached
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        session = self.session_pool.acquire()
+        start = time.monotonic()
+        try:
+            response = session.get(url, timeout=self.timeout)
+        except Exception:
+            self.session_pool.release(session, error=True)
+            if self.rate_limiter:
+                self.rate_limiter.record_failure()
+            raise
+        if self.rate_limiter:
+            self.rate_limiter.record_response(response.status_code, time.monotonic() - start)
+        # Cloudflare engeli veya sunucu hatası alan oturumu yenile
+        self.session_pool.release(
+            session,
+            error=response.status_code in (403, 503),
+            blocked=response.status_code == 403
+        )
+        with self._count_lock:
+            self.request_count += 1
+        if response.status_code in RETRYABLE_STATUS:
+            raise TransientFetchError(response.status_code)
+        if response.status_code != 200:
+            return None
+        if self.page_cache:
+            self.page_cache.put(url, response.text)
+        return response.text
+
+    async def parse(self, html):
+        """Sayfayı event loop'u bloklamadan ayrıştır (varsa süreç havuzunda)
+
+        parsers.Listing (kitaplar, son sayfa, toplam) döndürür.
+        """
+        if self.parse_pool:
+            return await self.parse_pool.parse(html, self.parser.name)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.parser.parse_listing, html)
+
+    async def _fetch_and_parse(self, url, use_cache=True):
+        """İndirme slotu, ham HTML için ayrıştırma kuyruğunda yer açılana kadar
+        bırakılmaz; bellekte en fazla concurrency + bekleyen ayrıştırma kadar
+        sayfa bulunur.
+        """
+        async with self._semaphore:
+            if self._stop_requested:
+                return None
+            loop = asyncio.get_running_loop()
+            html = await loop.run_in_executor(self._executor, self._fetch_blocking, url, use_cache)
+            if not html:
+                return None
+            await self._parse_slots.acquire()
+        try:
+            return await self.parse(html)
+        finally:
+            self._parse_slots.release()
+
+    async def fetch_listing(self, url, use_cache=True):
+        """Sayfayı indir ve ayrıştır (Listing); sayfa yoksa None
+
+        Ağ hataları ve geçici HTTP durumları (RETRYABLE_ERRORS) retry_policy'ye
+        göre jitter'lı üstel beklemeyle yeniden denenir (bekleme sırasında
+        indirme slotu tutulmaz). Tüm denemeler başarısız olursa son hata,
+        diğer hatalar ise hemen yükseltilir.
+        """
+        attempt = 0
+        while True:
+            try:
+                if self.coalescer:
+                    cache_max_age = self.cache_max_age if self.page_cache and use_cache else 0
+                    return await self.coalescer.fetch(url, lambda: self._fetch_and_parse(url, use_cache), cache_max_age)
+                return await self._fetch_and_parse(url, use_cache)
+            except RETRYABLE_ERRORS:
+                attempt += 1
+                if attempt >= self.retry_policy.max_attempts or self._stop_requested:
+                    raise
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+
+    async def fetch_books(self, url):
+        """Sayfadaki kitapları döndür; sayfa yoksa None"""
+        listing = await self.fetch_listing(url)
+        return listing.books if listing else None
+
+    async def _run(self, coro):
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._parse_slots = asyncio.Semaphore(self.parse_pool.max_pending if self.parse_pool else self.concurrency)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            return await coro
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, coro):
+        """Coroutine'i yeni bir event loop'ta çalıştır (QThread veya CLI içinden)"""
+        return asyncio.run(self._run(coro))
+
+    def _tag_book(self, book_data, sehir):
+        # Kategori bilgilerini ekle
+        book_data['kategori'] = self.search_params.get('kategori_adi', '')
+        book_data['alt_kategori'] = self.search_params.get('alt_kategori_adi', '')
+        if not sehir and self.sahaf_registry:
+            sehir = self.sahaf_registry.city_of(book_data)
+        book_data['sehir'] = sehir
+        return book_data
+
+    async def crawl_sahaf(self, sahaf, max_pages=MAX_QUERY_PAGES, start_page=1, end_page=None):
+        """Belirli bir sahafın sonuç sayfalarını tara
+
+        İlk sayfadaki sayfalama bilgisiyle kalan sayfalar eşzamanlı çekilir.
+        Sahaf max_pages'ten fazla sayfa dönüyorsa envanterin tamamı için sorgu
+        fiyat aralıklarına bölünür. İlk sayfa retry_policy'nin denemelerinden
+        sonra da alınamazsa sahaf park edilir, tarama sonunda crawl_city
+        tarafından tekrar denenir.
+        end_page verilirse yalnızca start_page..end_page aralığı taranır
+        (frontier görevleri); bu durumda ilk sayfanın hatası park edilmeden
+        yükseltilir, görevi kuyruk tekrar dener.
+        """
+        sahaf_id = extract_sahaf_id(sahaf.get('seller_url'))
+        sahaf_name = sahaf.get('name', '')
+
+        def make_url(page):
+            return build_search_url(self.search_params, page, sahaf_id, self.base_url)
+
+        fingerprint = None
+        if self.skip_unchanged and start_page == 1:
+            fingerprint, cached_books = await self._check_fingerprint(sahaf_id, sahaf_name)
+            if cached_books is not None:
+                if self.plan:
+                    self.plan.finish(sahaf_id, 1)
+                self.skipped.append(sahaf_name)
+                return cached_books
+
+        pages_done = 0
+
+        def count_page(page, page_books, *_):
+            nonlocal pages_done
+            pages_done += 1
+            for book_data in page_books:
+                # Sahaf adını güncelle (parametre olarak gelen ismi kullan)
+                book_data['sahaf_name'] = sahaf_name
+                if not book_data.get('sahaf_url'):
+                    book_data['sahaf_url'] = sahaf.get('seller_url', '')
+                self._tag_book(book_data, self.search_params.get('secili_sehir', ''))
+            if self.plan:
+                self.plan.page_done()
+
+        def checkpoint_page(page, page_books):
+            count_page(page, page_books)
+            if self.page_callback:
+                self.page_callback(sahaf_id, page, page_books)
+
+        try:
+            listing = await self.fetch_listing(make_url(start_page))
+        except Exception as e:
+            # fetch_listing retry_policy'ye göre zaten yeniden denedi, burada tekrar çekilmez
+            self.circuit_breaker.record_failure(sahaf_id)
+            if end_page is not None:
+                raise
+            self._emit(f"Sahaf {sahaf_name} sayfa {start_page} alınamadı ({e}), sonra tekrar denenecek")
+            self.parked[sahaf_id] = (sahaf, start_page, str(e))
+            if self.plan:
+                self.plan.finish(sahaf_id, 0)
+            return []
+
+        self.circuit_breaker.record_success(sahaf_id)
+        if not listing or not listing.books:
+            if self.plan:
+                self.plan.finish(sahaf_id, 1 if listing else 0)
+            return []
+
+        first_books, last_page = listing.books, listing.last_page
+        if self.incremental and end_page is None and await self._is_synced(sahaf_id):
+            count_page(start_page, first_books)
+            sahaf_books = await self.crawl_incremental(make_url, sahaf_id, sahaf_name, first_books,
+                                                       max_pages, on_page_done=count_page)
+        elif last_page > max_pages and start_page == 1 and end_page is None:
+            count_page(start_page, first_books)
+            self._emit(f"Sahaf {sahaf_name}: {last_page} sayfa, {max_pages} sayfa sınırı aşıldığı için fiyat aralıklarına bölünüyor...")
+            if self.plan:
+                self.plan.set_pages(sahaf_id, last_page + last_page // max_pages)
+            sahaf_books = await self.crawl_partitioned('fiyat', max_pages, on_page_done=count_page,
+                                                       sahaf_id=sahaf_id, label=sahaf_name)
+        else:
+            if end_page is not None:
+                last_page, max_pages = min(last_page, end_page), end_page
+            if self.plan:
+                self.plan.set_pages(sahaf_id, last_page - start_page + 1)
+            # Sayfa numaraları kararlı olduğundan yalnızca bu yolda sayfa bazlı kontrol noktası tutulur
+            checkpoint_page(start_page, first_books)
+            sahaf_books = await self.crawl_pages(make_url, sahaf_name, first_books, last_page,
+                                                 max_pages, on_page_done=checkpoint_page, first_page=start_page)
+        if self.incremental and sahaf_id not in self.synced:
+            # İlk senkron: tam tarama yapıldı, yalnızca veritabanında olmayanlar döner
+            sahaf_books = await self._finish_full_sync(sahaf_id, sahaf_name, sahaf_books, first_books)
+        if self.plan:
+            self.plan.finish(sahaf_id, pages_done)
+        if fingerprint and not self._stop_requested and not self.has_incomplete(sahaf_name):
+            self.fingerprints[sahaf_id] = (fingerprint, [book_data.get('site_url') for book_data in sahaf_books])
+            self.recrawled.append(sahaf_name)
+
+        return sahaf_books
+
+    async def _check_fingerprint(self, sahaf_id, sahaf_name):
+        """Sahafın en yeni ilanlar sayfasını önbelleksiz çekip kayıtlı parmak iziyle karşılaştır
+
+        (parmak izi, kitaplar) döndürür; kitaplar sadece sahaf değişmemişse ve
+        önceki taramanın ilanlarının tamamı veritabanında bulunuyorsa doludur.
+        """
+        loop = asyncio.get_running_loop()
+        probe_params = dict(self.search_params, siralama=INCREMENTAL_SORT)
+        try:
+            listing = await self.fetch_listing(build_search_url(probe_params, 1, sahaf_id, self.base_url),
+                                               use_cache=False)
+        except Exception:
+            return None, None  # Asıl tarama hatayı kendi yönetir
+        if listing is None:
+            return None, None
+
+        fingerprint = listing_fingerprint(listing)
+        previous = await loop.run_in_executor(self._executor, self.sync_store.get_fingerprint,
+                                              self.query_key, sahaf_id)
+        if not previous or previous[0] != fingerprint:
+            return fingerprint, None
+        books = await loop.run_in_executor(self._executor, self.sync_store.books_by_urls, previous[1])
+        if len(books) < len(previous[1]):
+            return fingerprint, None
+        for book_data in books:
+            book_data['sahaf_name'] = sahaf_name
+        return fingerprint, books
+
+    def has_incomplete(self, label, first_page=1, last_page=None):
+        """label (sahaf adı) için tamamlanamayan sayfa kaldı mı; label boşsa herhangi biri
+
+        first_page/last_page verilirse yalnızca bu aralıktaki sayfalara bakılır
+        (aynı sahafın farklı sayfa aralıkları aynı motorda taranabilir).
+        """
+        def in_range(page):
+            return page >= first_page and (last_page is None or page <= last_page)
+
+        if not label:
+            return any(in_range(page) for _, page, _ in self.incomplete)
+        return any((name == label or name.startswith(f"{label} / ")) and in_range(page)
+                   for name, page, _ in self.incomplete)
+
+    async def _is_synced(self, key):
+        """Bu sorgu ve sahaf daha önce sonuna kadar senkronlandı mı"""
+        loop = asyncio.get_running_loop()
+        last_sync = await loop.run_in_executor(self._executor, self.sync_store.get_last_sync, self.query_key, key)
+        return last_sync is not None
+
+    async def _unknown_books(self, books, seen):
+        """Veritabanında ve bu taramada daha önce görülmemiş ilanlar"""
+        loop = asyncio.get_running_loop()
+        urls = [book_data.get('site_url') for book_data in books]
+        known = await loop.run_in_executor(self._executor, self.sync_store.known_urls, urls)
+        fresh = []
+        for book_data in books:
+            url = book_data.get('site_url')
+            if url in known or url in seen:
+                continue
+            seen.add(url)
+            fresh.append(book_data)
+        return fresh
+
+    async def _finish_full_sync(self, key, label, books, first_books):
+        """İlk senkronda tam taramanın sonucunu süz, eksiksizse senkronlandı say"""
+        fresh = await self._unknown_books(books, set())
+        if not self._stop_requested and not self.has_incomplete(label):
+            self.synced[key] = first_books[0].get('site_url', '') if first_books else ''
+        return fresh
+
+    async def crawl_incremental(self, make_url, key, label, first_books, max_pages=MAX_QUERY_PAGES, on_page_done=None):
+        """En yeni ilanlardan başlayarak sayfaları sırayla gez, yalnızca yeni ilanları döndür
+
+        Sayfadaki ilanların tamamı veritabanında zaten varsa (ya da son sayfaya
+        gelindiyse) durulur. Sonuna kadar taranan anahtar self.synced'e eklenir.
+        """
+        seen = set()
+        new_books = []
+        page, page_books = 1, first_books
+        while True:
+            fresh = await self._unknown_books(page_books, seen)
+            new_books.extend(fresh)
+            if not fresh or len(page_books) < PAGE_SIZE or self._stop_requested:
+                break
+            if page >= max_pages:
+                self.incomplete.append((label, page + 1, "artımlı tarama sayfa sınırına ulaştı"))
+                return new_books
+            page += 1
+            try:
+                page_books = await self.fetch_books(make_url(page))
+            except Exception as e:
+                self.incomplete.append((label, page, str(e)))
+                return new_books
+            if not page_books:
+                break
+            if on_page_done:
+                on_page_done(page, page_books)
+
+        if not self._stop_requested:
+            self.synced[key] = first_books[0].get('site_url', '')
+        return new_books
+
+    async def crawl_general_incremental(self, on_page_done=None):
+        """Genel aramanın yalnızca son senkrondan beri eklenen ilanlarını tara
+
+        Sorgu ilk kez senkronlanıyorsa sonuçların tamamı fiyat aralıklarına
+        bölünerek taranır.
+        """
+        key = "0"
+        if not await self._is_synced(key):
+            self._emit("Bu sorgu ilk kez senkronlanıyor, tüm sonuçlar taranacak...")
+            books = await self.crawl_partitioned('fiyat', on_page_done=on_page_done)
+            return await self._finish_full_sync(key, "", books, books[:1])
+
+        def make_url(page):
+            return build_search_url(self.search_params, page, key, self.base_url)
+
+        try:
+            listing = await self.fetch_listing(make_url(1))
+        except Exception as e:
+            self.incomplete.append(("Genel arama", 1, str(e)))
+            return []
+        if not listing or not listing.books:
+            self.synced[key] = ''
+            return []
+
+        total = 0
+
+        def count_page(page, page_books):
+            nonlocal total
+            total += len(page_books)
+            if on_page_done:
+                on_page_done(page, page_books, total)
+
+        books = await self.crawl_incremental(make_url, key, "Genel arama", listing.books, on_page_done=count_page)
+        for book_data in books:
+            self._tag_book(book_data, '')  # Şehir varsa sahaf kaydından gelir
+        return books
+
+    async def _retry_parked(self, on_sahaf_done, all_books, total):
+        """Park edilmiş sahafları devre süresi dolunca kaldıkları sayfadan bir kez daha dene"""
+        parked = list(self.parked.values())
+        self.parked.clear()
+        self._emit(f"{len(parked)} sahaf hata nedeniyle park edildi, tekrar deneniyor...")
+
+        wait = max(self.circuit_breaker.remaining(extract_sahaf_id(sahaf.get('seller_url'))) for sahaf, _, _ in parked)
+        await asyncio.sleep(wait)
+
+        async def retry_one(sahaf, page):
+            self.circuit_breaker.half_open(extract_sahaf_id(sahaf.get('seller_url')))
+            return sahaf, await self.crawl_sahaf(sahaf, start_page=page)
+
+        tasks = [asyncio.create_task(retry_one(sahaf, page)) for sahaf, page, _ in parked]
+        for next_done in asyncio.as_completed(tasks):
+            sahaf, sahaf_books = await next_done
+            all_books.extend(sahaf_books)
+            if on_sahaf_done:
+                on_sahaf_done(total, total, sahaf, sahaf_books, len(all_books))
+
+        # İkinci denemede de park edilenler eksik kalır
+        for sahaf, page, reason in self.parked.values():
+            self.incomplete.append((sahaf.get('name', ''), page, reason))
+        self.parked.clear()
+
+    async def crawl_city(self, sahaflar, on_sahaf_done=None, plan=None, start_pages=None):
+        """Sahafları eşzamanlı tara, her biten sahaf için callback çağır
+
+        plan (planner.CrawlPlan) verilirse sahaflar planın sırasıyla (büyükten
+        küçüğe) başlatılır ve sayfa ilerlemesi plana bildirilir. start_pages
+        ({sahaf_id: sayfa}) devam ettirilen taramada sahafların kaldığı sayfadır.
+        """
+        start_pages = start_pages or {}
+        self.plan = plan
+        if plan:
+            sahaflar = plan.order
+        sahaflar = [sahaf for sahaf in sahaflar if extract_sahaf_id(sahaf.get('seller_url'))]
+
+        async def crawl_one(sahaf):
+            start_page = start_pages.get(extract_sahaf_id(sahaf.get('seller_url')), 1)
+            return sahaf, await self.crawl_sahaf(sahaf, start_page=start_page)
+
+        tasks = [asyncio.create_task(crawl_one(sahaf)) for sahaf in sahaflar]
+        all_books = []
+        completed = 0
+
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                sahaf, sahaf_books = await next_done
+                completed += 1
+                all_books.extend(sahaf_books)
+                if on_sahaf_done:
+                    on_sahaf_done(completed, len(sahaflar), sahaf, sahaf_books, len(all_books))
+                if self._stop_requested:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        if self.parked and not self._stop_requested:
+            await self._retry_parked(on_sahaf_done, all_books, len(sahaflar))
+
+        return all_books
+
+    async def crawl_general(self, max_pages=1000, on_page_done=None):
+        """Sahaf filtresi olmadan genel aramanın sayfalarını tara"""
+        all_books = []
+        page = 1
+
+        while page <= max_pages and not self._stop_requested:
+            self._emit(f"Sayfa {page} çekiliyor...")
+            url = build_search_url(self.search_params, page, "0", self.base_url)
+            try:
+                page_books = await self.fetch_books(url)
+            except Exception as e:
+                # Yeniden denemeler fetch_listing'in retry_policy'sinde yapıldı; sonraki
+                # sayfaların varlığı bu sayfaya bağlı, tarama eksik olarak işaretlenip durur
+                self._emit(f"Sayfa {page} için hata: {str(e)}")
+                self.incomplete.append(("Genel arama", page, str(e)))
+                break
+
+            if not page_books:
+                break
+
+            for book_data in page_books:
+                self._tag_book(book_data, '')  # Şehir varsa sahaf kaydından gelir
+
+            all_books.extend(page_books)
+            if on_page_done:
+                on_page_done(page, page_books, len(all_books))
+
+            # Eğer bu sayfada 25'den az kitap varsa sonraki sayfa yok demektir
+            if len(page_books) < PAGE_SIZE:
+                break
+
+            page += 1
+
+        return all_books
+
+    async def crawl_query(self, label, on_page_done=None, partition_by='fiyat', max_pages=MAX_QUERY_PAGES):
+        """Genel aramayı 1. sayfanın sayfalama bilgisine göre tara
+
+        Sonuç MAX_QUERY_PAGES'i aşmıyorsa kalan sayfalar eşzamanlı çekilir;
+        aşıyorsa (site bu sınırdan sonraki sayfaları döndürmez) sorgu
+        partition_by alanının aralıklarına bölünür. max_pages daha küçük
+        verilirse yalnızca ilk max_pages sayfa alınır. on_page_done(tamamlanan
+        sayfa, sayfa kitapları, toplam kitap) crawl_partitioned ile aynıdır.
+        """
+        def make_url(page):
+            return build_search_url(self.search_params, page, "0", self.base_url)
+
+        try:
+            listing = await self.fetch_listing(make_url(1))
+        except Exception as e:
+            self._emit(f"{label} alınamadı: {e}")
+            self.incomplete.append((label, 1, str(e)))
+            return []
+        if not listing or not listing.books:
+            return []
+
+        if listing.last_page > MAX_QUERY_PAGES and max_pages >= MAX_QUERY_PAGES and partition_by:
+            self._emit(f"{label}: {listing.last_page}+ sayfa, aralıklara bölünüyor...")
+            return await self.crawl_partitioned(partition_by, on_page_done=on_page_done, label=label)
+
+        pages_done = 0
+        books_found = 0
+
+        def count_page(page, page_books):
+            nonlocal pages_done, books_found
+            pages_done += 1
+            books_found += len(page_books)
+            for book_data in page_books:
+                self._tag_book(book_data, '')  # Şehir varsa sahaf kaydından gelir
+            if on_page_done:
+                on_page_done(pages_done, page_books, books_found)
+
+        count_page(1, listing.books)
+        return await self.crawl_pages(make_url, label, listing.books, listing.last_page,
+                                      max_pages=min(max_pages, MAX_QUERY_PAGES), on_page_done=count_page)
+
+    async def crawl_pages(self, make_url, label, first_books, last_page, max_pages=1000,
+                          on_page_done=None, first_page=1):
+        """İlk sayfası alınmış bir sorgunun kalan sayfalarını eşzamanlı çek
+
+        Sayfalar first_page+1..last_page aynı anda istenir, sonuçlar sayfa sırasıyla
+        birleştirilir. Sayfalama linkleri son sayfayı göstermiyorsa (son
+        sayfa da doluysa) sonraki sayfalar tek tek denenir. Alınamayan
+        sayfalar self.incomplete'e label ile eklenir.
+        """
+        pages = {first_page: first_books}
+
+        async def fetch_page(page):
+            try:
+                return page, await self.fetch_books(make_url(page))
+            except Exception as e:
+                self.incomplete.append((label, page, str(e)))
+                return page, None
+
+        def page_done(page, page_books):
+            pages[page] = page_books
+            if page_books and on_page_done:
+                on_page_done(page, page_books)
+
+        last = max(first_page, min(last_page, max_pages))
+        tasks = [asyncio.create_task(fetch_page(page)) for page in range(first_page + 1, last + 1)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                page_done(*await next_done)
+                if self._stop_requested:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        page = last
+        while (pages.get(page) and len(pages[page]) >= PAGE_SIZE
+               and page < max_pages and not self._stop_requested):
+            page += 1
+            page_done(*await fetch_page(page))
+
+        return [book for number in sorted(pages) for book in (pages[number] or [])]
+
+    async def crawl_partitioned(self, field='fiyat', max_partition_pages=MAX_QUERY_PAGES, on_page_done=None,
+                                sahaf_id="0", label=''):
+        """Aramayı fiyat ('fiyat') veya yıl ('tarih') aralıklarına bölerek tara
+
+        Her aralığın 1. sayfasından toplam sayfa sayısı okunur; max_partition_pages'den
+        fazla sayfa dönen aralıklar ikiye bölünür, diğerlerinin sayfaları
+        eşzamanlı çekilir. Aralık sınırındaki kitaplar site_url ile tekilleştirilir;
+        birleşik liste arama parametrelerindeki sıralamaya göre yeniden dizilir.
+        sahaf_id verilirse tek bir sahafın envanteri bölünür.
+        """
+        seen = set()
+        pages_done = 0
+
+        def count_page(page, page_books):
+            nonlocal pages_done
+            pages_done += 1
+            for book_data in page_books:
+                self._tag_book(book_data, '')  # Şehir varsa sahaf kaydından gelir
+                seen.add(book_data.get('site_url'))
+            if on_page_done:
+                on_page_done(pages_done, page_books, len(seen))
+
+        async def crawl_partition(partition):
+            params = partition.apply(self.search_params)
+            partition_label = f"{label} / {partition.label}" if label else partition.label
+
+            def make_url(page):
+                return build_search_url(params, page, sahaf_id, self.base_url)
+
+            try:
+                listing = await self.fetch_listing(make_url(1))
+            except Exception as e:
+                self._emit(f"{partition_label} alınamadı: {e}")
+                self.incomplete.append((partition_label, 1, str(e)))
+                return []
+            if not listing or not listing.books:
+                return []
+
+            first_books, last_page = listing.books, listing.last_page
+            if last_page > max_partition_pages and partition.can_split():
+                self._emit(f"{partition_label}: {last_page} sayfa, aralık bölünüyor...")
+                parts = await asyncio.gather(*(crawl_partition(part) for part in partition.split()))
+                return [book for part in parts for book in part]
+
+            if last_page > MAX_QUERY_PAGES:
+                # Aralık daha fazla bölünemiyor; site MAX_QUERY_PAGES'ten sonraki sayfaları döndürmez
+                self._emit(f"{partition_label}: {last_page} sayfa, yalnızca ilk {MAX_QUERY_PAGES} sayfa alınabilir")
+                self.incomplete.append((partition_label, MAX_QUERY_PAGES + 1,
+                                        f"aralık bölünemiyor, {last_page - MAX_QUERY_PAGES} sayfa alınamadı"))
+            self._emit(f"{partition_label}: {min(last_page, MAX_QUERY_PAGES)} sayfa çekiliyor...")
+            count_page(1, first_books)
+            return await self.crawl_pages(make_url, partition_label, first_books, last_page,
+                                          max_pages=MAX_QUERY_PAGES, on_page_done=count_page)
+
+        parts = await asyncio.gather(*(crawl_partition(part) for part in initial_partitions(field)))
+
+        # Aralıkları sırayla birleştir, sınırda iki kez gelenleri at
+        all_books = []
+        merged = set()
+        for part in parts:
+            for book_data in part:
+                key = book_data.get('site_url')
+                if key and key in merged:
+                    continue
+                merged.add(key)
+                all_books.append(book_data)
+        # Aralıklar artan sırada birleşir; her aralık kendi içinde site sıralamasındadır (sıralama kararlı)
+        sort_key = MERGE_SORT_KEYS.get(self.search_params.get('siralama', 'fiyatartan.'))
+        if sort_key:
+            all_books.sort(key=sort_key[0], reverse=sort_key[1])
+        return all_books
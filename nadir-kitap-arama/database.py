@@ -5,26 +5,522 @@ Veritabanı yönetimi
 
 import sqlite3
 import hashlib
+import json
+import os
+import pathlib
+import re
 import threading
 import time
 import gc
-from queue import Queue
+import zlib
+from contextlib import contextmanager
+from queue import Queue, Empty
+
+from turkish_text import register_sqlite, search_key
+
+
+def _field(book_data, key, legacy_key):
+    """Yeni anahtar yoksa eski anahtar adına bak"""
+    return book_data.get(key) or book_data.get(legacy_key) or ''
+
+
+def _sahaf_name(book_data):
+    return book_data.get('sahaf_name') or book_data.get('sahaf_adi') or ''
+
+
+def book_unique_id(url, baslik, yazar, sahaf_name):
+    """Kitabın unique_id'si: ilan URL'i varsa onun, yoksa başlık, yazar ve sahaf adının md5 özeti"""
+    # İlan URL'i ilanı tek başına tanımlar
+    content = url or f"{baslik or ''}{yazar or ''}{sahaf_name or ''}"
+    return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+
+def _pack_urls(books):
+    """Kitapların ilan URL'lerini sıkıştırılmış tek bloba çevir"""
+    return zlib.compress('\n'.join(book.get('site_url') or '' for book in books).encode('utf-8'))
+
+
+def _unpack_urls(packed):
+    return [url for url in zlib.decompress(packed).decode('utf-8').split('\n') if url] if packed else []
+
+
+# Yazıcı bağlantının ayarları. WAL modunda okuyucular yazıcıyı beklemez;
+# synchronous=NORMAL WAL'de yalnızca checkpoint sırasında fsync yapar
+WRITER_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('cache_size', -65536),      # KiB cinsinden, ~64 MB sayfa önbelleği
+    ('mmap_size', 268435456),    # 256 MB bellek eşlemeli okuma
+    ('temp_store', 'MEMORY'),
+)
+READER_PRAGMAS = (
+    ('cache_size', -32768),
+    ('mmap_size', 268435456),
+    ('temp_store', 'MEMORY'),
+)
+DEFAULT_READ_POOL_SIZE = 4
+
+def _rekey_unique_ids(conn):
+    """Başlık+yazar+sahaf özetiyle kaydedilmiş ilanların unique_id'sini ilan URL'inden yeniden hesapla
+    
+    Aynı ilanın URL anahtarıyla kaydedilmiş kopyası varsa eski satır silinir.
+    """
+    taken = {row[0] for row in conn.execute('SELECT unique_id FROM kitaplar')}
+    updates, duplicates = [], []
+    for row_id, unique_id, url in conn.execute(
+            "SELECT id, unique_id, kitap_url FROM kitaplar WHERE kitap_url != '' ORDER BY id").fetchall():
+        new_id = book_unique_id(url, '', '', '')
+        if new_id == unique_id:
+            continue
+        if new_id in taken:
+            duplicates.append((row_id,))
+        else:
+            updates.append((new_id, row_id))
+            taken.add(new_id)
+    conn.executemany('DELETE FROM kitaplar WHERE id = ?', duplicates)
+    conn.executemany('UPDATE kitaplar SET unique_id = ? WHERE id = ?', updates)
+
+
+def _backfill_search_keys(conn):
+    """Göç öncesi kaydedilmiş kitapların baslik_key/yazar_key değerlerini hesapla"""
+    rows = conn.execute('SELECT id, baslik, yazar FROM kitaplar').fetchall()
+    conn.executemany('UPDATE kitaplar SET baslik_key = ?, yazar_key = ? WHERE id = ?',
+                     [(search_key(baslik), search_key(yazar), row_id) for row_id, baslik, yazar in rows])
+
+
+# Şema göçleri: (sürüm, açıklama, adımlar). Adım bir SQL cümlesi ya da
+# bağlantıyı alan bir fonksiyondur. Uygulanan son sürüm PRAGMA user_version'da
+# tutulur; yeni değişiklik listenin sonuna eklenir.
+MIGRATIONS = (
+    (1, "kitaplar için yerel arama ve analiz indeksleri", (
+        # Fiyata/tarihe göre sıralı listeler ve fiyat > 0 süzgeçleri
+        'CREATE INDEX IF NOT EXISTS idx_kitaplar_fiyat ON kitaplar(fiyat)',
+        'CREATE INDEX IF NOT EXISTS idx_kitaplar_tarih ON kitaplar(tarih)',
+        # Yazar analizi: GROUP BY yazar + fiyat toplamları + sahaf sayısı tablodan okunmadan
+        'CREATE INDEX IF NOT EXISTS idx_kitaplar_yazar ON kitaplar(yazar, fiyat, sahaf_name)',
+        # Sahaf analizi
+        'CREATE INDEX IF NOT EXISTS idx_kitaplar_sahaf ON kitaplar(sahaf_name, fiyat, yazar, sehir)',
+        # Şehir süzgeci fiyata göre sıralı gelir; şehir analizi tablodan okunmaz
+        'CREATE INDEX IF NOT EXISTS idx_kitaplar_sehir ON kitaplar(sehir, fiyat, sahaf_name, yazar, kategori)',
+        # Kategori/alt kategori süzgeçleri ve kategori analizi
+        'CREATE INDEX IF NOT EXISTS idx_kitaplar_kategori ON kitaplar(kategori, fiyat, alt_kategori, yazar, sahaf_name)',
+        'CREATE INDEX IF NOT EXISTS idx_kitaplar_alt_kategori ON kitaplar(alt_kategori, fiyat)',
+        'ANALYZE kitaplar',
+    )),
+    (2, "başlık, yazar ve açıklama için FTS5 tam metin indeksi", (
+        # İçerik kitaplar tablosundan okunur, indeks tetikleyicilerle güncel tutulur.
+        # remove_diacritics ş/ç/ğ/ö/ü'yü sadeleştirir; 2-3 harflik önekler ayrıca indekslenir
+        """CREATE VIRTUAL TABLE IF NOT EXISTS kitaplar_fts USING fts5(
+            baslik, yazar, aciklama, content='kitaplar', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS kitaplar_fts_ai AFTER INSERT ON kitaplar BEGIN
+            INSERT INTO kitaplar_fts(rowid, baslik, yazar, aciklama) VALUES (new.id, new.baslik, new.yazar, new.aciklama);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS kitaplar_fts_ad AFTER DELETE ON kitaplar BEGIN
+            INSERT INTO kitaplar_fts(kitaplar_fts, rowid, baslik, yazar, aciklama)
+            VALUES ('delete', old.id, old.baslik, old.yazar, old.aciklama);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS kitaplar_fts_au AFTER UPDATE OF baslik, yazar, aciklama ON kitaplar BEGIN
+            INSERT INTO kitaplar_fts(kitaplar_fts, rowid, baslik, yazar, aciklama)
+            VALUES ('delete', old.id, old.baslik, old.yazar, old.aciklama);
+            INSERT INTO kitaplar_fts(rowid, baslik, yazar, aciklama) VALUES (new.id, new.baslik, new.yazar, new.aciklama);
+        END""",
+        # Göç öncesinde kaydedilmiş kitaplar
+        "INSERT INTO kitaplar_fts(kitaplar_fts) VALUES ('rebuild')",
+    )),
+    (3, "bulanık arama için normalize başlık/yazar anahtarları ve trigram indeksi", (
+        # search_key() ile sadeleştirilmiş başlık ve yazar; anahtarlar Python'da hesaplanır
+        # (yeni satırlarda _book_row), şemada Python fonksiyonu kullanılmaz
+        "ALTER TABLE kitaplar ADD COLUMN baslik_key TEXT DEFAULT ''",
+        "ALTER TABLE kitaplar ADD COLUMN yazar_key TEXT DEFAULT ''",
+        _backfill_search_keys,
+        'CREATE INDEX IF NOT EXISTS idx_kitaplar_baslik_key ON kitaplar(baslik_key, yazar_key)',
+        'CREATE INDEX IF NOT EXISTS idx_kitaplar_yazar_key ON kitaplar(yazar_key)',
+        # Farklı anahtarlar bir kez indekslenir: aynı kitabın binlerce ilanı tek aday olur
+        """CREATE TABLE IF NOT EXISTS bulanik_anahtar (
+            id INTEGER PRIMARY KEY,
+            alan TEXT NOT NULL,
+            anahtar TEXT NOT NULL,
+            UNIQUE (alan, anahtar)
+        )""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS bulanik_anahtar_fts USING fts5(
+            anahtar, alan UNINDEXED, content='bulanik_anahtar', content_rowid='id',
+            tokenize='trigram', detail='column'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS bulanik_anahtar_ai AFTER INSERT ON bulanik_anahtar BEGIN
+            INSERT INTO bulanik_anahtar_fts(rowid, anahtar, alan) VALUES (new.id, new.anahtar, new.alan);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS bulanik_anahtar_ad AFTER DELETE ON bulanik_anahtar BEGIN
+            INSERT INTO bulanik_anahtar_fts(bulanik_anahtar_fts, rowid, anahtar, alan)
+            VALUES ('delete', old.id, old.anahtar, old.alan);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS kitaplar_anahtar_ai AFTER INSERT ON kitaplar BEGIN
+            INSERT OR IGNORE INTO bulanik_anahtar(alan, anahtar) SELECT 'baslik', new.baslik_key WHERE new.baslik_key != '';
+            INSERT OR IGNORE INTO bulanik_anahtar(alan, anahtar) SELECT 'yazar', new.yazar_key WHERE new.yazar_key != '';
+        END""",
+        # Son ilanı silinen anahtar aday listesinden çıkar
+        """CREATE TRIGGER IF NOT EXISTS kitaplar_anahtar_ad AFTER DELETE ON kitaplar BEGIN
+            DELETE FROM bulanik_anahtar WHERE alan = 'baslik' AND anahtar = old.baslik_key
+                AND NOT EXISTS (SELECT 1 FROM kitaplar WHERE baslik_key = old.baslik_key);
+            DELETE FROM bulanik_anahtar WHERE alan = 'yazar' AND anahtar = old.yazar_key
+                AND NOT EXISTS (SELECT 1 FROM kitaplar WHERE yazar_key = old.yazar_key);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS kitaplar_anahtar_au AFTER UPDATE OF baslik_key, yazar_key ON kitaplar BEGIN
+            INSERT OR IGNORE INTO bulanik_anahtar(alan, anahtar) SELECT 'baslik', new.baslik_key WHERE new.baslik_key != '';
+            INSERT OR IGNORE INTO bulanik_anahtar(alan, anahtar) SELECT 'yazar', new.yazar_key WHERE new.yazar_key != '';
+            DELETE FROM bulanik_anahtar WHERE alan = 'baslik' AND anahtar = old.baslik_key
+                AND NOT EXISTS (SELECT 1 FROM kitaplar WHERE baslik_key = old.baslik_key);
+            DELETE FROM bulanik_anahtar WHERE alan = 'yazar' AND anahtar = old.yazar_key
+                AND NOT EXISTS (SELECT 1 FROM kitaplar WHERE yazar_key = old.yazar_key);
+        END""",
+        "INSERT OR IGNORE INTO bulanik_anahtar(alan, anahtar) SELECT 'baslik', baslik_key FROM kitaplar WHERE baslik_key != ''",
+        "INSERT OR IGNORE INTO bulanik_anahtar(alan, anahtar) SELECT 'yazar', yazar_key FROM kitaplar WHERE yazar_key != ''",
+        'ANALYZE kitaplar',
+    )),
+    (4, "FTS5 indeksinde noktasız ı harfini i ile eşle", (
+        # unicode61 I/İ'yi i'ye katlar ama ı'yı ayrı harf sayar: "IŞIK" isik, "ışık" ısık olarak
+        # indekslenir ve birbirini bulmaz. İndeks ı'ları i yapılmış görünümden okunur;
+        # fts_match sorgudaki ı'yı aynı şekilde çevirir
+        'DROP TRIGGER IF EXISTS kitaplar_fts_ai',
+        'DROP TRIGGER IF EXISTS kitaplar_fts_ad',
+        'DROP TRIGGER IF EXISTS kitaplar_fts_au',
+        'DROP TABLE IF EXISTS kitaplar_fts',
+        """CREATE VIEW IF NOT EXISTS kitaplar_fts_metin AS
+            SELECT id, replace(baslik, 'ı', 'i') AS baslik, replace(yazar, 'ı', 'i') AS yazar,
+                   replace(aciklama, 'ı', 'i') AS aciklama
+            FROM kitaplar""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS kitaplar_fts USING fts5(
+            baslik, yazar, aciklama, content='kitaplar_fts_metin', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS kitaplar_fts_ai AFTER INSERT ON kitaplar BEGIN
+            INSERT INTO kitaplar_fts(rowid, baslik, yazar, aciklama)
+            VALUES (new.id, replace(new.baslik, 'ı', 'i'), replace(new.yazar, 'ı', 'i'), replace(new.aciklama, 'ı', 'i'));
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS kitaplar_fts_ad AFTER DELETE ON kitaplar BEGIN
+            INSERT INTO kitaplar_fts(kitaplar_fts, rowid, baslik, yazar, aciklama)
+            VALUES ('delete', old.id, replace(old.baslik, 'ı', 'i'), replace(old.yazar, 'ı', 'i'), replace(old.aciklama, 'ı', 'i'));
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS kitaplar_fts_au AFTER UPDATE OF baslik, yazar, aciklama ON kitaplar BEGIN
+            INSERT INTO kitaplar_fts(kitaplar_fts, rowid, baslik, yazar, aciklama)
+            VALUES ('delete', old.id, replace(old.baslik, 'ı', 'i'), replace(old.yazar, 'ı', 'i'), replace(old.aciklama, 'ı', 'i'));
+            INSERT INTO kitaplar_fts(rowid, baslik, yazar, aciklama)
+            VALUES (new.id, replace(new.baslik, 'ı', 'i'), replace(new.yazar, 'ı', 'i'), replace(new.aciklama, 'ı', 'i'));
+        END""",
+        "INSERT INTO kitaplar_fts(kitaplar_fts) VALUES ('rebuild')",
+    )),
+    (5, "unique_id'yi ilan URL'inden yeniden hesapla", (
+        # URL'li ilanlar önceden başlık+yazar+sahaf özetiyle kaydediliyordu; aynı ilan tekrar eklenmesin
+        _rekey_unique_ids,
+    )),
+)
+
+# Yerel aramada bm25 sütun ağırlıkları (baslik, yazar, aciklama)
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+# "İlgi" sıralaması; search_books ve HOT_QUERIES aynı ifadeyi kullanır
+FTS_RANK = f"bm25(kitaplar_fts, {', '.join(str(weight) for weight in FTS_WEIGHTS)})"
+
+# Yerel arama sıralamaları; 'ilgi' yalnızca metin araması varsa anlamlıdır
+LOCAL_SORTS = {
+    'fiyatartan.': 'kitaplar.fiyat ASC',
+    'fiyatazalan.': 'kitaplar.fiyat DESC',
+    'tarihyeni.': 'kitaplar.tarih DESC',
+    'tariheski.': 'kitaplar.tarih ASC',
+}
+RELEVANCE_SORT = 'ilgi'
+# Çok satır eşleşen metin aramasında sıralama indeksi boyunca yürünür (sort sütunu -> indeks)
+SORT_INDEXES = {'fiyat': 'idx_kitaplar_fiyat', 'tarih': 'idx_kitaplar_tarih'}
+
+
+def fts_match(text, columns):
+    """Serbest metni FTS5 MATCH ifadesine çevir: her kelime önek olarak, hepsi birlikte
+
+    fts_match("nutuk cil", "baslik") -> 'baslik : ("nutuk"* "cil"*)'. Kelime
+    dışındaki karakterler atılır, kullanıcı girdisi FTS sözdizimi olarak yorumlanmaz.
+    İndeks gibi ı harfi i sayılır (bkz. şema v4).
+    """
+    words = re.findall(r'\w+', (text or '').replace('ı', 'i'))
+    if not words:
+        return None
+    return f"{columns} : (" + " ".join(f'"{word}"*' for word in words) + ")"
+
+
+# Bulanık aramada trigram indeksinden okunup yeniden puanlanan farklı anahtar sayısı ve kabul eşiği
+FUZZY_CANDIDATES = 500
+FUZZY_MIN_SCORE = 0.5
+# Bulanık aramada anahtarın saklandığı kitaplar sütunu (alan -> sütun)
+FUZZY_KEY_COLUMNS = {'baslik': 'baslik_key', 'yazar': 'yazar_key'}
+FUZZY_KEY_INDEXES = {'baslik_key': 'idx_kitaplar_baslik_key', 'yazar_key': 'idx_kitaplar_yazar_key'}
+
+
+def register_functions(conn):
+    """Elle yazılan sorguların kullandığı TURKCE sıralamasını ve search_key fonksiyonunu bağlantıya ekle
+
+    Şema (göçler, tetikleyiciler) bunlara dayanmaz; bkz. turkish_text.register_sqlite.
+    """
+    register_sqlite(conn)
+
+
+def trigrams(key):
+    """search_key çıktısının kelime içi trigramları (3 harften kısa kelimeler katılmaz)"""
+    return {word[i:i + 3] for word in key.split() for i in range(len(word) - 2)}
+
+
+def trigram_match(key):
+    """Yazım hatası payı bırakan trigram MATCH ifadesi; trigramı olmayan sorguda None
+
+    Her kelimenin trigramları ardışık bloklara bölünür ve bloklardan birinin
+    tamamı aranır. Bir düzenleme en çok üç ardışık trigramı bozduğundan 6+
+    trigramlı kelimede 3 bloktan biri, 10+ trigramlıda (iki düzenlemede) 5
+    bloktan biri sağlam kalır. Daha kısa kelimelerde tek ortak trigram yeter.
+    Kelimelerin hepsi eşleşmelidir.
+    """
+    words = []
+    for word in key.split():
+        grams = [word[i:i + 3] for i in range(len(word) - 2)]
+        if not grams:
+            continue
+        if len(grams) < 6:
+            blocks = [[gram] for gram in grams]
+        else:
+            count = 5 if len(grams) >= 10 else 3
+            blocks = [grams[i * len(grams) // count:(i + 1) * len(grams) // count] for i in range(count)]
+        words.append("(" + " OR ".join("(" + " AND ".join(f'"{gram}"' for gram in block) + ")" for block in blocks) + ")")
+    return " AND ".join(words) or None
+
+
+def edit_distance(a, b):
+    """Levenshtein uzaklığı (ekleme, silme, değiştirme)"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def fuzzy_score(query_key, key):
+    """0-1 arası benzerlik: trigram Jaccard benzerliği ile kelime düzenleme benzerliğinin ortalaması
+
+    Kelime benzerliği, sorgunun her kelimesi için adaydaki en yakın kelimeye
+    göre hesaplanır; "nutuk" ile "nutuk 1 cilt" tam eşleşme kadar yakın sayılır,
+    ekstra kelimeler yalnızca trigram benzerliğini düşürür.
+    """
+    query_words, words = query_key.split(), key.split()
+    if not query_words or not words:
+        return 0.0
+    query_grams, grams = trigrams(query_key), trigrams(key)
+    union = query_grams | grams
+    trigram_similarity = len(query_grams & grams) / len(union) if union else 0.0
+    word_similarity = sum(
+        max(1 - edit_distance(query_word, word) / max(len(query_word), len(word)) for word in words)
+        for query_word in query_words
+    ) / len(query_words)
+    return (trigram_similarity + word_similarity) / 2
+
+
+# Arama ve analiz sekmelerinin sık çalışan sorgu biçimleri; hiçbiri kitaplar
+# tablosunu baştan sona taramamalı (bkz. DatabaseManager.table_scans)
+HOT_QUERIES = (
+    ("şehir + fiyat sıralı", "SELECT * FROM kitaplar WHERE sehir = ? ORDER BY fiyat ASC LIMIT 1000", ('Adana',)),
+    ("kategori + fiyat sıralı", "SELECT * FROM kitaplar WHERE kategori = ? ORDER BY fiyat DESC LIMIT 1000", ('Tarih',)),
+    ("alt kategori", "SELECT * FROM kitaplar WHERE alt_kategori = ? ORDER BY fiyat LIMIT 1000", ('Osmanlı Tarihi',)),
+    ("en yeni kayıtlar", "SELECT baslik, yazar, sahaf_name, fiyat, tarih FROM kitaplar ORDER BY tarih DESC LIMIT 10", ()),
+    ("en pahalı", "SELECT baslik, yazar, sahaf_name, fiyat FROM kitaplar WHERE fiyat > 0 ORDER BY fiyat DESC LIMIT 10", ()),
+    ("fiyat istatistikleri", "SELECT AVG(fiyat), SUM(fiyat) FROM kitaplar WHERE fiyat > 0", ()),
+    ("yazar analizi", """
+        SELECT yazar, COUNT(*), AVG(fiyat), MIN(fiyat), MAX(fiyat), COUNT(DISTINCT sahaf_name)
+        FROM kitaplar WHERE yazar != '' AND yazar IS NOT NULL AND fiyat > 0
+        GROUP BY yazar ORDER BY COUNT(*) DESC LIMIT 15""", ()),
+    ("sahaf analizi", """
+        SELECT sahaf_name, COUNT(*), AVG(fiyat), COUNT(DISTINCT yazar), MIN(fiyat), MAX(fiyat), sehir
+        FROM kitaplar WHERE sahaf_name != '' AND sahaf_name IS NOT NULL AND fiyat > 0
+        GROUP BY sahaf_name ORDER BY COUNT(*) DESC LIMIT 15""", ()),
+    ("şehir analizi", """
+        SELECT sehir, COUNT(*), COUNT(DISTINCT sahaf_name), COUNT(DISTINCT yazar), AVG(fiyat), COUNT(DISTINCT kategori)
+        FROM kitaplar WHERE sehir != '' AND sehir IS NOT NULL
+        GROUP BY sehir ORDER BY COUNT(*) DESC LIMIT 15""", ()),
+    ("kategori analizi", """
+        SELECT kategori, COUNT(*), COUNT(DISTINCT yazar), COUNT(DISTINCT sahaf_name), AVG(fiyat), MIN(fiyat), MAX(fiyat)
+        FROM kitaplar WHERE kategori != '' AND kategori IS NOT NULL
+        GROUP BY kategori ORDER BY COUNT(*) DESC LIMIT 20""", ()),
+    ("şehir listesi", "SELECT DISTINCT sehir FROM kitaplar WHERE sehir != '' AND sehir IS NOT NULL ORDER BY sehir COLLATE TURKCE", ()),
+    ("alt kategori listesi", """
+        SELECT DISTINCT alt_kategori FROM kitaplar
+        WHERE alt_kategori != '' AND alt_kategori IS NOT NULL ORDER BY alt_kategori COLLATE TURKCE""", ()),
+    ("ilan var mı", "SELECT kitap_url FROM kitaplar WHERE kitap_url IN (?, ?)", ('a', 'b')),
+    ("metin araması", f"""
+        SELECT kitaplar.* FROM (
+            SELECT rowid AS id, {FTS_RANK} AS ilgi FROM kitaplar_fts WHERE kitaplar_fts MATCH ? ORDER BY ilgi LIMIT 1000
+        ) AS hit CROSS JOIN kitaplar ON kitaplar.id = hit.id ORDER BY hit.ilgi""",
+     ('{baslik aciklama} : ("nutuk"*)',)),
+    ("metin + şehir ilgi sıralı", f"""
+        SELECT kitaplar.* FROM kitaplar_fts CROSS JOIN kitaplar ON kitaplar.id = kitaplar_fts.rowid
+        WHERE kitaplar_fts MATCH ? AND kitaplar.sehir = ? ORDER BY {FTS_RANK} LIMIT 1000""",
+     ('{baslik aciklama} : ("nutuk"*)', 'Adana')),
+    ("metin + şehir araması", """
+        SELECT kitaplar.* FROM kitaplar_fts CROSS JOIN kitaplar ON kitaplar.id = kitaplar_fts.rowid
+        WHERE kitaplar_fts MATCH ? AND kitaplar.sehir = ? ORDER BY kitaplar.fiyat LIMIT 1000""",
+     ('yazar : ("orhan"*)', 'Adana')),
+    ("bulanık arama adayları", """
+        SELECT anahtar FROM bulanik_anahtar_fts
+        WHERE bulanik_anahtar_fts MATCH ? AND alan = ? ORDER BY rank LIMIT 500""",
+     ('("nut" OR "utu" OR "tuk")', 'baslik')),
+    ("bulanık arama ilan sayıları", """
+        SELECT baslik_key, COUNT(*) FROM kitaplar WHERE baslik_key IN (?, ?) GROUP BY baslik_key""",
+     ('nutuk', 'nutuk 1 cilt')),
+    ("bulanık arama ilanları", """
+        SELECT * FROM kitaplar WHERE yazar_key = ? AND sehir = ? ORDER BY fiyat LIMIT 1000""",
+     ('orhan pamuk', 'Adana')),
+)
+
+# category_sweep_item tablosunda güncellenebilen kategori istatistikleri
+SWEEP_ITEM_FIELDS = ('status', 'pages', 'books', 'new_books', 'duplicates', 'incomplete', 'started_at', 'finished_at')
 
 
 class DatabaseManager:
-    def __init__(self, db_path="kitaplar.db"):
+    """kitaplar.db erişimi
+    
+    Yazmalar tek bir uzun ömürlü yazıcı bağlantıdan sırayla yapılır (self.lock
+    yalnızca yazmaları sıralar). Okumalar salt okunur bağlantı havuzundan
+    yapılır; WAL modunda okuyucular yazıcıyı, yazıcı da okuyucuları beklemez.
+    """
+    
+    def __init__(self, db_path="kitaplar.db", timeout=30.0, read_pool_size=DEFAULT_READ_POOL_SIZE):
         self.db_path = db_path
-        self.lock = threading.Lock()  # Thread safety için
+        # Aynı dosyaya başka süreçler (tarama worker'ları) de yazabilir; kilit için beklenecek süre
+        self.timeout = timeout
+        self.lock = threading.Lock()  # Yazıcı bağlantı için
+        self.read_pool_size = max(1, read_pool_size)
+        self._readers = Queue()
+        self._reader_count = 0
+        self._reader_lock = threading.Lock()
+        self._writer = self._connect()
         self.save_queue = Queue(maxsize=1000)  # Queue boyutunu sınırla
         self.batch_size = 50  # Batch boyutunu küçült
         self.init_database()
         self.start_save_worker()
     
+    def _connect(self, read_only=False):
+        if read_only:
+            # Salt okunur bağlantı yanlışlıkla yazamaz ve yazma kilidi almaz
+            uri = pathlib.Path(os.path.abspath(self.db_path)).as_uri() + "?mode=ro"
+            conn = sqlite3.connect(uri, uri=True, timeout=self.timeout, check_same_thread=False)
+            pragmas = READER_PRAGMAS
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+            pragmas = WRITER_PRAGMAS
+        for name, value in pragmas:
+            conn.execute(f"PRAGMA {name} = {value}")
+        register_functions(conn)
+        return conn
+    
+    @contextmanager
+    def _write(self):
+        """Yazıcı bağlantıyı kilitle; blok hatasız biterse commit, hata olursa rollback"""
+        with self.lock:
+            try:
+                yield self._writer
+                self._writer.commit()
+            except BaseException:
+                self._writer.rollback()
+                raise
+    
+    @contextmanager
+    def _read(self):
+        """Havuzdan salt okunur bağlantı al (havuz dolana kadar yenisi açılır)"""
+        try:
+            conn = self._readers.get_nowait()
+        except Empty:
+            with self._reader_lock:
+                create = self._reader_count < self.read_pool_size
+                if create:
+                    self._reader_count += 1
+            if create:
+                try:
+                    conn = self._connect(read_only=True)
+                except BaseException:
+                    # Açılamayan bağlantı havuzda yer tutmasın
+                    with self._reader_lock:
+                        self._reader_count -= 1
+                    raise
+            else:
+                conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            # Açık kalan okuma işlemi WAL checkpoint'ini engellemesin
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+    
+    def close(self):
+        """Kuyruktaki kayıtları bitir ve bağlantıları kapat"""
+        self.wait_for_save_completion()
+        with self.lock:
+            self._writer.close()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except Empty:
+                break
+    
     def init_database(self):
         """Veritabanını oluştur ve tabloları hazırla"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._write() as conn:
+            self._create_tables(conn.cursor())
+            self._migrate(conn)
+    
+    def _migrate(self, conn):
+        """user_version'dan sonraki şema göçlerini sırayla uygula
         
+        Her göç kendi işleminde uygulanır. Sürüm işlem içinde yeniden okunur;
+        aynı dosyayı açan başka bir süreç göçü uyguladıysa tekrarlanmaz.
+        """
+        conn.commit()
+        for version, description, statements in MIGRATIONS:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                    conn.rollback()
+                    continue
+                for statement in statements:
+                    if callable(statement):
+                        statement(conn)
+                    else:
+                        conn.execute(statement)
+                conn.execute(f'PRAGMA user_version = {version}')
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            print(f"Veritabanı şeması v{version}: {description}")
+    
+    def schema_version(self):
+        """Uygulanmış son şema göçü"""
+        with self._read() as conn:
+            return conn.execute('PRAGMA user_version').fetchone()[0]
+    
+    def query_plan(self, query, params=()):
+        """EXPLAIN QUERY PLAN satırlarının açıklamaları"""
+        with self._read() as conn:
+            return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+    
+    def table_scans(self, queries=HOT_QUERIES):
+        """kitaplar tablosunu indekssiz baştan sona tarayan sorgular: [(ad, plan), ...]"""
+        scans = []
+        for name, query, params in queries:
+            plan = self.query_plan(query, params)
+            if any(step.split()[:2] == ['SCAN', 'kitaplar'] and 'INDEX' not in step for step in plan):
+                scans.append((name, plan))
+        return scans
+    
+    def _create_tables(self, cursor):
+        """Tüm tabloları (yoksa) oluştur"""
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS kitaplar (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -44,8 +540,110 @@ class DatabaseManager:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Artımlı taramada "bu ilan zaten var mı" kontrolü kitap_url üzerinden yapılır
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_kitaplar_kitap_url ON kitaplar(kitap_url)')
+        
+        # Sorgu ve sahaf başına son artımlı senkron zamanı
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sync_state (
+                query_key TEXT,
+                sahaf_id TEXT,
+                last_sync REAL,
+                newest_url TEXT,
+                PRIMARY KEY (query_key, sahaf_id)
+            )
+        ''')
+        
+        # Sorgu ve sahaf başına envanter parmak izi ve son taramanın ilan URL'leri
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS sahaf_fingerprint (
+                query_key TEXT,
+                sahaf_id TEXT,
+                fingerprint TEXT,
+                urls BLOB,
+                checked_at REAL,
+                PRIMARY KEY (query_key, sahaf_id)
+            )
+        ''')
+        
+        # Yarıda kalan şehir taramalarının kaldığı yer
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_checkpoint (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query_key TEXT,
+                params TEXT,
+                status TEXT,
+                created_at REAL,
+                updated_at REAL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_checkpoint_page (
+                checkpoint_id INTEGER,
+                sahaf_id TEXT,
+                page INTEGER,
+                urls BLOB,
+                PRIMARY KEY (checkpoint_id, sahaf_id, page)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_checkpoint_sahaf (
+                checkpoint_id INTEGER,
+                sahaf_id TEXT,
+                urls BLOB,
+                PRIMARY KEY (checkpoint_id, sahaf_id)
+            )
+        ''')
+        
+        # Kategori taramaları ve kategori başına ilerleme/tamamlanma istatistikleri
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS category_sweep (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                params TEXT,
+                status TEXT,
+                created_at REAL,
+                updated_at REAL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS category_sweep_item (
+                sweep_id INTEGER,
+                kategori2 TEXT,
+                kategori TEXT,
+                kategori_adi TEXT,
+                alt_kategori_adi TEXT,
+                status TEXT DEFAULT 'pending',
+                pages INTEGER DEFAULT 0,
+                books INTEGER DEFAULT 0,
+                new_books INTEGER DEFAULT 0,
+                duplicates INTEGER DEFAULT 0,
+                incomplete INTEGER DEFAULT 0,
+                started_at REAL,
+                finished_at REAL,
+                PRIMARY KEY (sweep_id, kategori2, kategori)
+            )
+        ''')
+        
+        # İstek listesi kalemleri ve her kalem için bulunan ilanlar
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS wishlist_item (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                wishlist TEXT,
+                kitap_adi TEXT,
+                yazar TEXT,
+                created_at REAL,
+                UNIQUE (wishlist, kitap_adi, yazar)
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS wishlist_match (
+                item_id INTEGER,
+                kitap_url TEXT,
+                fiyat REAL,
+                found_at REAL,
+                PRIMARY KEY (item_id, kitap_url)
+            )
+        ''')
     
     def start_save_worker(self):
         """Veritabanı kaydetme thread'ini başlat"""
@@ -60,6 +658,18 @@ class DatabaseManager:
                         # Toplu kaydetme
                         _, books_list = item
                         self.save_books(books_list)
+                    elif isinstance(item, tuple) and item[0] == 'checkpoint':
+                        # Kontrol noktası, önündeki kitaplar kaydedildikten sonra yazılır
+                        _, table, row = item
+                        self._write_checkpoint(table, row)
+                    elif isinstance(item, tuple) and item[0] == 'wishlist':
+                        # İstek listesi eşleşmeleri, ilanlar kaydedildikten sonra yazılır
+                        _, item_ids, books = item
+                        self.save_wishlist_matches(item_ids, books)
+                    elif isinstance(item, tuple) and item[0] == 'sweep':
+                        # Kategori istatistiği, kategorinin kitapları kaydedildikten sonra yazılır
+                        _, sweep_id, target, fields = item
+                        self.update_sweep_item(sweep_id, target, **fields)
                     else:
                         # Tekil kaydetme
                         self._save_book_direct(item)
@@ -73,9 +683,31 @@ class DatabaseManager:
     
     def generate_unique_id(self, book_data):
         """Kitap için unique ID oluştur"""
-        # Başlık, yazar ve sahaf adının birleşiminden hash oluştur
-        content = f"{book_data.get('title', '')}{book_data.get('author', '')}{book_data.get('sahaf_name', '')}"
-        return hashlib.md5(content.encode('utf-8')).hexdigest()
+        return book_unique_id(_field(book_data, 'site_url', 'url'), _field(book_data, 'kitap_adi', 'title'),
+                              _field(book_data, 'yazar', 'author'), _sahaf_name(book_data))
+    
+    def _book_row(self, book_data):
+        """Kitap sözlüğünü kitaplar tablosu satırına çevir
+        
+        Tarama motoru kitap_adi/yazar/fiyat/site_url anahtarlarını üretir;
+        eski title/author/price/url anahtarları da kabul edilir.
+        """
+        return (
+            self.generate_unique_id(book_data),
+            _field(book_data, 'kitap_adi', 'title'),
+            _field(book_data, 'yazar', 'author'),
+            _sahaf_name(book_data),
+            book_data.get('sahaf_url', ''),
+            book_data.get('fiyat_numeric', book_data.get('price_numeric', 0)) or 0,
+            _field(book_data, 'fiyat', 'price'),
+            _field(book_data, 'site_url', 'url'),
+            _field(book_data, 'aciklama', 'description'),
+            book_data.get('kategori', ''),
+            book_data.get('alt_kategori', ''),
+            book_data.get('sehir', ''),
+            search_key(_field(book_data, 'kitap_adi', 'title')),
+            search_key(_field(book_data, 'yazar', 'author'))
+        )
     
     def save_book_async(self, book_data):
         """Kitabı asenkron olarak kaydetme kuyruğuna ekle"""
@@ -83,87 +715,46 @@ class DatabaseManager:
     
     def _save_book_direct(self, book_data):
         """Kitabı doğrudan veritabanına kaydet (thread-safe)"""
-        with self.lock:
-            unique_id = self.generate_unique_id(book_data)
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            try:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO kitaplar 
-                    (unique_id, baslik, yazar, sahaf_name, sahaf_url, fiyat, fiyat_text, kitap_url, aciklama, kategori, alt_kategori, sehir)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    unique_id,
-                    book_data.get('title', ''),
-                    book_data.get('author', ''),
-                    book_data.get('sahaf_name', ''),
-                    book_data.get('sahaf_url', ''),
-                    book_data.get('price_numeric', 0),
-                    book_data.get('price', ''),
-                    book_data.get('url', ''),
-                    book_data.get('description', ''),
-                    book_data.get('kategori', ''),
-                    book_data.get('alt_kategori', ''),
-                    book_data.get('sehir', '')
-                ))
-                
-                conn.commit()
-                return cursor.rowcount > 0
-            except Exception as e:
-                print(f"Veritabanı kayıt hatası: {e}")
-                return False
-            finally:
-                conn.close()
+        try:
+            with self._write() as conn:
+                cursor = conn.execute('''
+                    INSERT OR IGNORE INTO kitaplar
+                    (unique_id, baslik, yazar, sahaf_name, sahaf_url, fiyat, fiyat_text, kitap_url, aciklama, kategori, alt_kategori, sehir,
+                     baslik_key, yazar_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', self._book_row(book_data))
+            return cursor.rowcount > 0
+        except Exception as e:
+            print(f"Veritabanı kayıt hatası: {e}")
+            return False
     
     def save_book(self, book_data):
         """Tek kitabı senkron olarak kaydet (eski metod)"""
         return self._save_book_direct(book_data)
     
     def save_books(self, books_list):
-        """Kitap listesini toplu olarak veritabanına kaydet (optimize edilmiş)"""
+        """Kitap listesini toplu olarak veritabanına kaydet (optimize edilmiş)
+        
+        Eklenen kitap sayısını döndürür (zaten kayıtlı olanlar sayılmaz); hata olursa None.
+        """
         if not books_list:
             return 0
             
-        with self.lock:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            try:
-                # Toplu insert için verileri hazırla
-                insert_data = []
-                for book in books_list:
-                    unique_id = self.generate_unique_id(book)
-                    insert_data.append((
-                        unique_id,
-                        book.get('title', ''),
-                        book.get('author', ''),
-                        book.get('sahaf_name', ''),
-                        book.get('sahaf_url', ''),
-                        book.get('price_numeric', 0),
-                        book.get('price', ''),
-                        book.get('url', ''),
-                        book.get('description', ''),
-                        book.get('kategori', ''),
-                        book.get('alt_kategori', ''),
-                        book.get('sehir', '')
-                    ))
-                
-                # Toplu insert yap
-                cursor.executemany('''
-                    INSERT OR IGNORE INTO kitaplar 
-                    (unique_id, baslik, yazar, sahaf_name, sahaf_url, fiyat, fiyat_text, kitap_url, aciklama, kategori, alt_kategori, sehir)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        # Toplu insert için verileri kilit dışında hazırla
+        insert_data = [self._book_row(book) for book in books_list]
+        
+        try:
+            with self._write() as conn:
+                cursor = conn.executemany('''
+                    INSERT OR IGNORE INTO kitaplar
+                    (unique_id, baslik, yazar, sahaf_name, sahaf_url, fiyat, fiyat_text, kitap_url, aciklama, kategori, alt_kategori, sehir,
+                     baslik_key, yazar_key)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''', insert_data)
-                
-                conn.commit()
-                return cursor.rowcount
-            except Exception as e:
-                print(f"Toplu veritabanı kayıt hatası: {e}")
-                return 0
-            finally:
-                conn.close()
+            return cursor.rowcount
+        except Exception as e:
+            print(f"Toplu veritabanı kayıt hatası: {e}")
+            return None
     
     def save_books_async(self, books_list):
         """Kitap listesini asenkron olarak parçalı kaydet (RAM optimized)"""
@@ -185,6 +776,394 @@ class DatabaseManager:
                 self.save_books(batch)
                 print(f"Queue dolu, {len(batch)} kitap direkt kaydedildi")
     
+    def known_urls(self, urls):
+        """Verilen ilan URL'lerinden veritabanında zaten bulunanlar"""
+        urls = [url for url in urls if url]
+        if not urls:
+            return set()
+        known = set()
+        with self._read() as conn:
+            # SQLite parametre sınırı için parçalı sorgu
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT kitap_url FROM kitaplar WHERE kitap_url IN ({placeholders})", chunk
+                ).fetchall()
+                known.update(row[0] for row in rows)
+        return known
+    
+    def get_last_sync(self, query_key, sahaf_id="0"):
+        """Sorgu ve sahaf için son artımlı senkron zamanı (epoch, yoksa None)"""
+        rows = self.execute_query(
+            "SELECT last_sync FROM sync_state WHERE query_key = ? AND sahaf_id = ?",
+            (query_key, sahaf_id)
+        )
+        return rows[0][0] if rows else None
+    
+    def set_last_sync(self, query_key, sahaf_id, newest_url='', timestamp=None):
+        """Sorgu ve sahaf için senkron zamanını kaydet"""
+        with self._write() as conn:
+            conn.execute('''
+                INSERT OR REPLACE INTO sync_state (query_key, sahaf_id, last_sync, newest_url)
+                VALUES (?, ?, ?, ?)
+            ''', (query_key, sahaf_id, timestamp or time.time(), newest_url))
+    
+    def get_fingerprint(self, query_key, sahaf_id):
+        """Kayıtlı (parmak izi, ilan URL listesi); yoksa None"""
+        rows = self.execute_query(
+            "SELECT fingerprint, urls FROM sahaf_fingerprint WHERE query_key = ? AND sahaf_id = ?",
+            (query_key, sahaf_id)
+        )
+        if not rows:
+            return None
+        fingerprint, urls = rows[0]
+        return fingerprint, _unpack_urls(urls)
+    
+    def set_fingerprints(self, query_key, fingerprints):
+        """{sahaf_id: (parmak izi, ilan URL'leri)} sözlüğünü kaydet"""
+        now = time.time()
+        rows = [
+            (query_key, sahaf_id, fingerprint,
+             zlib.compress('\n'.join(url for url in urls if url).encode('utf-8')), now)
+            for sahaf_id, (fingerprint, urls) in fingerprints.items()
+        ]
+        with self._write() as conn:
+            conn.executemany('''
+                INSERT OR REPLACE INTO sahaf_fingerprint (query_key, sahaf_id, fingerprint, urls, checked_at)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+    
+    def books_by_urls(self, urls):
+        """İlan URL'lerine göre kitapları tarama motorunun sözlük biçiminde döndür"""
+        urls = [url for url in urls if url]
+        books = []
+        with self._read() as conn:
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(f'''
+                    SELECT baslik, yazar, fiyat_text, fiyat, kitap_url, aciklama, sahaf_name,
+                           sahaf_url, kategori, alt_kategori, sehir
+                    FROM kitaplar WHERE kitap_url IN ({placeholders})
+                ''', chunk).fetchall()
+                for row in rows:
+                    books.append({
+                        'kitap_adi': row[0], 'yazar': row[1], 'fiyat': row[2], 'fiyat_numeric': row[3],
+                        'site_url': row[4], 'aciklama': row[5], 'sahaf_adi': row[6], 'sahaf_url': row[7],
+                        'kategori': row[8], 'alt_kategori': row[9], 'sehir': row[10]
+                    })
+        return books
+    
+    def create_checkpoint(self, query_key, params):
+        """Yeni şehir taraması için kontrol noktası aç, ID'sini döndür"""
+        now = time.time()
+        with self._write() as conn:
+            cursor = conn.execute('''
+                INSERT INTO crawl_checkpoint (query_key, params, status, created_at, updated_at)
+                VALUES (?, ?, 'running', ?, ?)
+            ''', (query_key, json.dumps(params, ensure_ascii=False), now, now))
+        return cursor.lastrowid
+    
+    def checkpoint_page_async(self, checkpoint_id, sahaf_id, page, books):
+        """Sayfayı kaydetme kuyruğuna al; kitapları yazıldıktan sonra sayfa tamamlandı sayılır"""
+        self.save_books_async(books)
+        self.save_queue.put(('checkpoint', 'page', (checkpoint_id, sahaf_id, page, _pack_urls(books))))
+    
+    def checkpoint_sahaf_async(self, checkpoint_id, sahaf_id, books):
+        """Sahafın tüm ilanları kaydedildikten sonra sahafı tamamlandı işaretle"""
+        self.save_queue.put(('checkpoint', 'sahaf', (checkpoint_id, sahaf_id, _pack_urls(books))))
+    
+    def _write_checkpoint(self, table, row):
+        try:
+            with self._write() as conn:
+                if table == 'page':
+                    conn.execute('INSERT OR REPLACE INTO crawl_checkpoint_page VALUES (?, ?, ?, ?)', row)
+                else:
+                    conn.execute('INSERT OR REPLACE INTO crawl_checkpoint_sahaf VALUES (?, ?, ?)', row)
+                conn.execute('UPDATE crawl_checkpoint SET updated_at = ? WHERE id = ?', (time.time(), row[0]))
+        except Exception as e:
+            print(f"Kontrol noktası yazılamadı: {e}")
+    
+    def finish_checkpoint(self, checkpoint_id, status='done'):
+        """Kontrol noktasının durumunu güncelle ('done' veya 'stopped')"""
+        self.execute_query(
+            "UPDATE crawl_checkpoint SET status = ?, updated_at = ? WHERE id = ?",
+            (status, time.time(), checkpoint_id)
+        )
+    
+    def get_resumable_checkpoint(self):
+        """Tamamlanmamış en son tarama: (id, parametreler, son güncelleme) veya None"""
+        rows = self.execute_query('''
+            SELECT id, params, updated_at FROM crawl_checkpoint
+            WHERE status != 'done' ORDER BY updated_at DESC LIMIT 1
+        ''')
+        if not rows:
+            return None
+        return rows[0][0], json.loads(rows[0][1]), rows[0][2]
+    
+    def load_checkpoint(self, checkpoint_id):
+        """Kaldığı yer: (tamamlanan sahaflar, {sahaf_id: sonraki sayfa}, kaydedilmiş ilan URL'leri)
+        
+        Bir sahafın sonraki sayfası, kesintisiz tamamlanmış sayfalardan sonraki ilk sayfadır;
+        eşzamanlı çekilip sıranın ilerisinde kalan sayfalar yeniden çekilir.
+        """
+        done = set()
+        urls = []
+        pages = {}
+        with self._read() as conn:
+            for sahaf_id, packed in conn.execute(
+                    'SELECT sahaf_id, urls FROM crawl_checkpoint_sahaf WHERE checkpoint_id = ?', (checkpoint_id,)):
+                done.add(sahaf_id)
+                urls.extend(_unpack_urls(packed))
+            for sahaf_id, page, packed in conn.execute(
+                    'SELECT sahaf_id, page, urls FROM crawl_checkpoint_page WHERE checkpoint_id = ?', (checkpoint_id,)):
+                if sahaf_id not in done:
+                    pages.setdefault(sahaf_id, {})[page] = packed
+        
+        next_pages = {}
+        for sahaf_id, sahaf_pages in pages.items():
+            page = 1
+            while page in sahaf_pages:
+                urls.extend(_unpack_urls(sahaf_pages[page]))
+                page += 1
+            next_pages[sahaf_id] = page
+        return done, next_pages, urls
+    
+    def create_sweep(self, params, targets):
+        """Kategori taraması aç ve hedef kategorileri 'pending' olarak ekle, ID'sini döndür"""
+        now = time.time()
+        with self._write() as conn:
+            cursor = conn.execute(
+                "INSERT INTO category_sweep (params, status, created_at, updated_at) VALUES (?, 'running', ?, ?)",
+                (json.dumps(params, ensure_ascii=False), now, now)
+            )
+            sweep_id = cursor.lastrowid
+            conn.executemany('''
+                INSERT OR IGNORE INTO category_sweep_item (sweep_id, kategori2, kategori, kategori_adi, alt_kategori_adi)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(sweep_id, t['kategori2'], t['kategori'], t['kategori_adi'], t['alt_kategori_adi']) for t in targets])
+        return sweep_id
+    
+    def update_sweep_item(self, sweep_id, target, **fields):
+        """Kategorinin durum ve sayaçlarını güncelle"""
+        columns = [name for name in SWEEP_ITEM_FIELDS if name in fields]
+        if not columns:
+            return
+        try:
+            with self._write() as conn:
+                conn.execute(
+                    f"UPDATE category_sweep_item SET {', '.join(f'{name} = ?' for name in columns)} "
+                    "WHERE sweep_id = ? AND kategori2 = ? AND kategori = ?",
+                    [fields[name] for name in columns] + [sweep_id, target['kategori2'], target['kategori']]
+                )
+                conn.execute('UPDATE category_sweep SET updated_at = ? WHERE id = ?', (time.time(), sweep_id))
+        except Exception as e:
+            print(f"Kategori istatistiği yazılamadı: {e}")
+    
+    def update_sweep_item_async(self, sweep_id, target, **fields):
+        """Önündeki kitaplar kaydedildikten sonra kategori istatistiğini yaz"""
+        self.save_queue.put(('sweep', sweep_id, target, fields))
+    
+    def finish_sweep(self, sweep_id, status='done'):
+        """Kategori taramasının durumunu güncelle ('done' veya 'stopped')"""
+        self.execute_query(
+            "UPDATE category_sweep SET status = ?, updated_at = ? WHERE id = ?",
+            (status, time.time(), sweep_id)
+        )
+    
+    def get_sweep_items(self, sweep_id):
+        """Kategori taramasının kategori başına istatistikleri"""
+        columns = ('kategori2', 'kategori', 'kategori_adi', 'alt_kategori_adi') + SWEEP_ITEM_FIELDS
+        rows = self.execute_query(
+            f"SELECT {', '.join(columns)} FROM category_sweep_item WHERE sweep_id = ? ORDER BY rowid",
+            (sweep_id,)
+        )
+        return [dict(zip(columns, row)) for row in rows]
+    
+    def get_resumable_sweep(self):
+        """Tamamlanmamış en son kategori taraması: (id, parametreler, son güncelleme) veya None"""
+        rows = self.execute_query('''
+            SELECT id, params, updated_at FROM category_sweep
+            WHERE status != 'done' ORDER BY updated_at DESC LIMIT 1
+        ''')
+        if not rows:
+            return None
+        return rows[0][0], json.loads(rows[0][1]), rows[0][2]
+    
+    def add_wishlist_items(self, wishlist, items):
+        """İstek listesi kalemlerini ekle (varsa mevcut kaydı kullan), her kaleme 'item_id' yaz"""
+        now = time.time()
+        with self._write() as conn:
+            for item in items:
+                conn.execute(
+                    'INSERT OR IGNORE INTO wishlist_item (wishlist, kitap_adi, yazar, created_at) VALUES (?, ?, ?, ?)',
+                    (wishlist, item['kitap_adi'], item['yazar'], now)
+                )
+                item['item_id'] = conn.execute(
+                    'SELECT id FROM wishlist_item WHERE wishlist = ? AND kitap_adi = ? AND yazar = ?',
+                    (wishlist, item['kitap_adi'], item['yazar'])
+                ).fetchone()[0]
+        return items
+    
+    def save_wishlist_matches(self, item_ids, books):
+        """Bulunan ilanları istek listesi kalemleriyle eşle"""
+        now = time.time()
+        rows = [(item_id, book.get('site_url'), book.get('fiyat_numeric') or 0, now)
+                for item_id in item_ids for book in books if book.get('site_url')]
+        try:
+            with self._write() as conn:
+                conn.executemany('INSERT OR REPLACE INTO wishlist_match VALUES (?, ?, ?, ?)', rows)
+        except Exception as e:
+            print(f"İstek listesi eşleşmeleri yazılamadı: {e}")
+    
+    def save_wishlist_matches_async(self, item_ids, books):
+        """Kitapları ve ardından istek listesi eşleşmelerini kaydetme kuyruğuna al"""
+        self.save_books_async(books)
+        self.save_queue.put(('wishlist', list(item_ids), books))
+    
+    def get_wishlist_summary(self, wishlist):
+        """Kalem başına ilan sayısı ve en ucuz teklif (fiyatı bilinmeyen ilanlar hariç)"""
+        rows = self.execute_query('''
+            SELECT w.id, w.kitap_adi, w.yazar, COUNT(m.kitap_url),
+                   (SELECT m2.kitap_url FROM wishlist_match m2
+                    WHERE m2.item_id = w.id AND m2.fiyat > 0 ORDER BY m2.fiyat LIMIT 1) AS cheapest_url,
+                   (SELECT MIN(m3.fiyat) FROM wishlist_match m3 WHERE m3.item_id = w.id AND m3.fiyat > 0)
+            FROM wishlist_item w
+            LEFT JOIN wishlist_match m ON m.item_id = w.id
+            WHERE w.wishlist = ?
+            GROUP BY w.id ORDER BY w.id
+        ''', (wishlist,))
+        summary = []
+        for item_id, kitap_adi, yazar, count, cheapest_url, cheapest_price in rows:
+            sahaf = self.execute_query(
+                'SELECT sahaf_name FROM kitaplar WHERE kitap_url = ? LIMIT 1', (cheapest_url,)
+            ) if cheapest_url else []
+            summary.append({
+                'item_id': item_id, 'kitap_adi': kitap_adi, 'yazar': yazar, 'matches': count,
+                'cheapest_price': cheapest_price, 'cheapest_url': cheapest_url,
+                'cheapest_sahaf': sahaf[0][0] if sahaf else '',
+            })
+        return summary
+    
+    def search_books(self, kitap_adi='', yazar='', kategori='', alt_kategori='', sehir='',
+                     siralama='fiyatartan.', limit=1000):
+        """Yerel arama: (toplam eşleşme, kitaplar satırları)
+
+        Kitap adı başlık ve açıklamada (yayınevi vb.), yazar yazar sütununda
+        FTS5 indeksiyle önek olarak aranır. siralama='ilgi' bm25 puanına göre
+        sıralar; metin yoksa fiyata göre sıralanır.
+        """
+        matches = [expr for expr in (fts_match(kitap_adi, '{baslik aciklama}'), fts_match(yazar, 'yazar')) if expr]
+        conditions, params = [], []
+        for column, value in (('kategori', kategori), ('alt_kategori', alt_kategori), ('sehir', sehir)):
+            if value:
+                conditions.append(f"kitaplar.{column} = ?")
+                params.append(value)
+
+        filtered = bool(conditions)
+        if matches:
+            # CROSS JOIN FTS tablosunu dış döngüde tutar; aksi halde planlayıcı şehir/kategori
+            # indeksinden gelen her satır için MATCH sorgusunu yeniden çalıştırabilir
+            source = "kitaplar_fts CROSS JOIN kitaplar ON kitaplar.id = kitaplar_fts.rowid"
+            conditions.insert(0, "kitaplar_fts MATCH ?")
+            params.insert(0, " AND ".join(matches))
+        else:
+            source = "kitaplar"
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        # Ek filtre yoksa eşleşme sayısı kitaplar tablosuna gitmeden FTS indeksinden sayılır
+        count_source = "kitaplar_fts" if matches and not filtered else source
+        if siralama == RELEVANCE_SORT and matches:
+            order = FTS_RANK
+        else:
+            order = LOCAL_SORTS.get(siralama, LOCAL_SORTS['fiyatartan.'])
+
+        with self._read() as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM {count_source}{where}", params).fetchone()[0]
+            if matches and not filtered and siralama == RELEVANCE_SORT:
+                # Yalnızca rowid ve puan sıralanır, kitaplar satırı ilk limit eşleşme için okunur
+                source = (f"(SELECT rowid AS id, {FTS_RANK} AS ilgi FROM kitaplar_fts{where} "
+                          "ORDER BY ilgi LIMIT ?) AS hit CROSS JOIN kitaplar ON kitaplar.id = hit.id")
+                where, order = "", "hit.ilgi"
+                params = params + [limit]
+            elif matches and not filtered:
+                # Eşleşmeler tabloya yayılmışsa fiyat/tarih indeksinde sırayla yürüyüp ilk limit
+                # eşleşmede durmak, tüm eşleşmeleri okuyup sıralamaktan ucuzdur
+                table_rows = conn.execute("SELECT MAX(id) FROM kitaplar").fetchone()[0] or 0
+                if total * total * 4 > limit * table_rows:
+                    index = SORT_INDEXES[order.split('.')[1].split()[0]]
+                    source = f"kitaplar INDEXED BY {index}"
+                    where = " WHERE kitaplar.id IN (SELECT rowid FROM kitaplar_fts WHERE kitaplar_fts MATCH ?)"
+            rows = conn.execute(
+                f"SELECT kitaplar.* FROM {source}{where} ORDER BY {order} LIMIT ?", params + [limit]
+            ).fetchall()
+        return total, rows
+    
+    def fuzzy_search_books(self, kitap_adi='', yazar='', kategori='', alt_kategori='', sehir='',
+                           limit=1000, candidates=FUZZY_CANDIDATES, min_score=FUZZY_MIN_SCORE):
+        """Yazım hatalarına toleranslı yerel arama: (eşleşen ilan sayısı, kitaplar satırları)
+        
+        Başlık ve yazar anahtarları trigram indeksinde trigram_match ile
+        ön süzülür (kitaplar taranmaz); bm25 sırasıyla gelen en fazla
+        `candidates` farklı anahtar fuzzy_score ile yeniden puanlanır.
+        Eşiği geçen anahtarların ilanları benzerliğe, eşitlikte fiyata göre döner.
+        """
+        fields = [(search_key(text), alan) for text, alan in ((kitap_adi, 'baslik'), (yazar, 'yazar')) if search_key(text)]
+        matches = [trigram_match(key) for key, alan in fields]
+        if not fields or not all(matches):
+            # 3 harften kısa kelimelerin trigramı yok; önek aramasına düşülür
+            return self.search_books(kitap_adi, yazar, kategori, alt_kategori, sehir, limit=limit)
+        
+        filters, filter_params = "", []
+        for column, value in (('kategori', kategori), ('alt_kategori', alt_kategori), ('sehir', sehir)):
+            if value:
+                filters += f" AND {column} = ?"
+                filter_params.append(value)
+        
+        with self._read() as conn:
+            # Alan başına kabul edilen anahtarlar ve puanları
+            accepted = []
+            for (key, alan), match in zip(fields, matches):
+                keys = conn.execute(
+                    "SELECT anahtar FROM bulanik_anahtar_fts WHERE bulanik_anahtar_fts MATCH ? AND alan = ? "
+                    "ORDER BY rank LIMIT ?", (match, alan, candidates)
+                ).fetchall()
+                scores = {anahtar: fuzzy_score(key, anahtar) for (anahtar,) in keys}
+                scores = {anahtar: score for anahtar, score in scores.items() if score >= min_score}
+                if not scores:
+                    return 0, []
+                accepted.append((FUZZY_KEY_COLUMNS[alan], scores))
+            
+            # Anahtar çiftlerinin ilan sayıları indeksten; çiftler ortalama puana göre sıralanır.
+            # Anahtarlar şehir/kategoriden çok daha seçicidir, planlayıcı istatistiksiz de doğru indeksi kullansın
+            columns = [column for column, scores in accepted]
+            source = f"kitaplar INDEXED BY {FUZZY_KEY_INDEXES[columns[0]]}"
+            where = " AND ".join(f"{column} IN ({','.join('?' * len(scores))})" for column, scores in accepted)
+            params = [anahtar for column, scores in accepted for anahtar in scores] + filter_params
+            groups = conn.execute(
+                f"SELECT {', '.join(columns)}, COUNT(*) FROM {source} WHERE {where}{filters} GROUP BY {', '.join(columns)}",
+                params
+            ).fetchall()
+            total = sum(group[-1] for group in groups)
+            groups = sorted(
+                ((sum(scores[value] for (column, scores), value in zip(accepted, group[:-1])) / len(accepted), group[:-1])
+                 for group in groups),
+                key=lambda item: -item[0]
+            )
+            
+            ranked = []
+            for score, values in groups:
+                if len(ranked) >= limit:
+                    break
+                rows = conn.execute(
+                    f"SELECT * FROM {source} WHERE {' AND '.join(f'{column} = ?' for column in columns)}{filters} "
+                    f"ORDER BY fiyat LIMIT ?", list(values) + filter_params + [limit - len(ranked)]
+                ).fetchall()
+                ranked.extend((score, row) for row in rows)
+        
+        ranked.sort(key=lambda item: (-item[0], item[1][6] or 0))
+        return total, [row for score, row in ranked]
+    
     def get_queue_size(self):
         """Kaydetme kuyruğundaki bekleyen kayıt sayısı"""
         return self.save_queue.qsize()
@@ -204,27 +1183,16 @@ class DatabaseManager:
     def execute_query(self, query, params=None):
         """SQL sorgusu çalıştır ve sonuçları döndür"""
         try:
-            with self.lock:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                if params:
-                    cursor.execute(query, params)
-                else:
-                    cursor.execute(query)
-                
-                # SELECT sorgusu ise sonuçları al
-                if query.strip().upper().startswith('SELECT'):
-                    results = cursor.fetchall()
-                    conn.close()
-                    return results
-                else:
-                    # INSERT, UPDATE, DELETE sorguları için
-                    conn.commit()
-                    affected_rows = cursor.rowcount
-                    conn.close()
-                    return affected_rows
-                    
+            # SELECT sorgusu ise okuyucu havuzundan, yazmayı beklemeden
+            if query.strip().upper().startswith('SELECT'):
+                with self._read() as conn:
+                    return conn.execute(query, params or ()).fetchall()
+            
+            # INSERT, UPDATE, DELETE sorguları için
+            with self._write() as conn:
+                cursor = conn.execute(query, params or ())
+            return cursor.rowcount
+        
         except Exception as e:
             print(f"Veritabanı sorgu hatası: {e}")
             print(f"Sorgu: {query}")
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+"""
+Süreçler ve makineler arası paylaşılan tarama kuyruğu (crawl frontier)
+
+Görevler (sorgu, sahaf, sayfa aralığı) üçlüleridir ve kitaplar.db içindeki
+crawl_frontier tablosunda durur. Başsız (GUI'siz) worker'lar görevleri süreli
+kira (lease) ile alır, kira süresini heartbeat ile uzatır, sonuçları kitaplar
+tablosuna yazıp görevi tamamlar. Worker çökerse kirası dolan görev başka bir
+worker tarafından yeniden alınır.
+
+    python frontier.py seed --sehir Adana --sehir İzmir
+    python frontier.py seed --tum-sehirler --kategoriler
+    python frontier.py work --concurrency 16
+    python frontier.py stats
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from crawler import CrawlEngine, DEFAULT_CONCURRENCY, BASE_URL, MAX_QUERY_PAGES, extract_sahaf_id, query_key
+from database import DatabaseManager
+from planner import estimate_pages
+from sahaf_registry import get_sahaf_registry
+
+
+DEFAULT_LEASE_SECONDS = 60
+DEFAULT_CHUNK_PAGES = 20
+
+FrontierTask = namedtuple('FrontierTask', 'id query_key params sahaf_id page_from page_to attempts')
+
+
+class CrawlFrontier:
+    """crawl_frontier tablosu üzerinde kira tabanlı iş kuyruğu
+
+    Görev durumları: pending -> leased -> done; hata alan görev max_attempts
+    denemeye kadar pending'e döner, sonra failed olur. Kirası dolmuş leased
+    görevler de bir deneme sayılarak yeniden alınır.
+    """
+
+    def __init__(self, db_path="kitaplar.db", lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=3):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # isolation_level=None: görev alma BEGIN IMMEDIATE ile elle kilitlenir
+        self._conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS crawl_frontier (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                query_key TEXT,
+                params TEXT,
+                sahaf_id TEXT,
+                page_from INTEGER,
+                page_to INTEGER,
+                status TEXT DEFAULT 'pending',
+                lease_owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER DEFAULT 0,
+                books INTEGER DEFAULT 0,
+                error TEXT,
+                updated_at REAL,
+                UNIQUE (query_key, sahaf_id, page_from)
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_frontier_status ON crawl_frontier(status, lease_expires)')
+
+    def enqueue(self, params, sahaf_id, page_from=1, page_to=None):
+        """Görev ekle; aynı (sorgu, sahaf, başlangıç sayfası) zaten varsa eklenmez"""
+        with self._lock:
+            cursor = self._conn.execute('''
+                INSERT OR IGNORE INTO crawl_frontier (query_key, params, sahaf_id, page_from, page_to, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (query_key(params), json.dumps(params, ensure_ascii=False, sort_keys=True),
+                  sahaf_id, page_from, page_to, time.time()))
+            return cursor.rowcount > 0
+
+    def seed(self, params, sahaflar, chunk_pages=DEFAULT_CHUNK_PAGES):
+        """Sahafları tahmini sayfa sayılarına göre sayfa aralığı görevlerine böl
+
+        Sayfa sınırını aşan sahaflar tek görev olur (fiyat aralıklarına bölünerek
+        taranırlar). Son aralık açık uçludur, tahmin düşük kalsa da sahaf
+        sonuna kadar taranır.
+        """
+        added = 0
+        for sahaf in sahaflar:
+            sahaf_id = extract_sahaf_id(sahaf.get('seller_url'))
+            if not sahaf_id:
+                continue
+            pages = estimate_pages(sahaf, params)
+            if pages > MAX_QUERY_PAGES or pages <= chunk_pages:
+                added += self.enqueue(params, sahaf_id)
+                continue
+            for page_from in range(1, pages + 1, chunk_pages):
+                page_to = page_from + chunk_pages - 1
+                added += self.enqueue(params, sahaf_id, page_from, page_to if page_to < pages else None)
+        return added
+
+    def claim(self, owner, limit=1):
+        """En fazla limit görevi owner adına kirala
+
+        Kirası dolan görev, worker'ı çöktüğü ya da takıldığı için bitmemiştir;
+        yeniden alınırken bir deneme sayılır. Deneme hakkı biten görev
+        yeniden kiralanmaz, failed olur.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.execute('''
+                    UPDATE crawl_frontier
+                    SET status = 'failed', attempts = attempts + 1, lease_owner = NULL,
+                        error = 'kira süresi doldu', updated_at = ?
+                    WHERE status = 'leased' AND lease_expires < ? AND attempts + 1 >= ?
+                ''', (now, now, self.max_attempts))
+                rows = self._conn.execute('''
+                    SELECT id, query_key, params, sahaf_id, page_from, page_to, attempts, status
+                    FROM crawl_frontier
+                    WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                    ORDER BY id LIMIT ?
+                ''', (now, limit)).fetchall()
+                rows = [row[:6] + (row[6] + (row[7] == 'leased'),) for row in rows]
+                self._conn.executemany('''
+                    UPDATE crawl_frontier
+                    SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = ?, updated_at = ?
+                    WHERE id = ?
+                ''', [(owner, now + self.lease_seconds, row[6], now, row[0]) for row in rows])
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return [FrontierTask(row[0], row[1], json.loads(row[2]), row[3], row[4], row[5], row[6]) for row in rows]
+
+    def heartbeat(self, owner):
+        """owner'ın elindeki tüm kiraları uzat"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute('''
+                UPDATE crawl_frontier SET lease_expires = ?, updated_at = ?
+                WHERE status = 'leased' AND lease_owner = ?
+            ''', (now + self.lease_seconds, now, owner))
+
+    def complete(self, task_id, owner, books=0):
+        """Görevi tamamla (kira başkasına geçtiyse False)"""
+        with self._lock:
+            cursor = self._conn.execute('''
+                UPDATE crawl_frontier SET status = 'done', books = ?, lease_owner = NULL, updated_at = ?
+                WHERE id = ? AND lease_owner = ?
+            ''', (books, time.time(), task_id, owner))
+            return cursor.rowcount > 0
+
+    def fail(self, task_id, owner, error):
+        """Görevi kuyruğa geri ver; deneme hakkı bittiyse failed işaretle"""
+        with self._lock:
+            self._conn.execute('''
+                UPDATE crawl_frontier
+                SET attempts = attempts + 1,
+                    status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END,
+                    lease_owner = NULL, error = ?, updated_at = ?
+                WHERE id = ? AND lease_owner = ?
+            ''', (self.max_attempts, str(error), time.time(), task_id, owner))
+
+    def release(self, owner):
+        """Çıkarken owner'ın bitmemiş görevlerini hemen kuyruğa geri bırak"""
+        with self._lock:
+            self._conn.execute('''
+                UPDATE crawl_frontier SET status = 'pending', lease_owner = NULL, updated_at = ?
+                WHERE status = 'leased' AND lease_owner = ?
+            ''', (time.time(), owner))
+
+    def stats(self):
+        """Durum başına görev ve kitap sayıları"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT status, COUNT(*), COALESCE(SUM(books), 0) FROM crawl_frontier GROUP BY status'
+            ).fetchall()
+        return {status: {'tasks': count, 'books': books} for status, count, books in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class FrontierWorker:
+    """Görev alıp tarayan ve sonuçları kitaplar tablosuna yazan başsız worker"""
+
+    def __init__(self, frontier, db_manager, owner=None, concurrency=DEFAULT_CONCURRENCY, batch_size=None,
+                 base_url=BASE_URL, session_pool=None, rate_limiter=None, sahaf_registry=None,
+                 progress_callback=None):
+        self.frontier = frontier
+        self.db_manager = db_manager
+        self.owner = owner or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.concurrency = concurrency
+        # Eşzamanlılığı doldurmaya yetecek kadar görev birlikte alınır
+        self.batch_size = batch_size or concurrency
+        self.base_url = base_url
+        self.session_pool = session_pool
+        self.rate_limiter = rate_limiter
+        self.sahaf_registry = sahaf_registry
+        self.progress_callback = progress_callback
+        self.tasks_done = 0
+        self.tasks_failed = 0
+        self.books_saved = 0
+        self.requests = 0
+        self._stop = threading.Event()
+
+    def _emit(self, message):
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    def stop(self):
+        self._stop.set()
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.frontier.lease_seconds / 3):
+            try:
+                self.frontier.heartbeat(self.owner)
+            except Exception as e:
+                self._emit(f"Heartbeat hatası: {e}")
+
+    def _sahaf_for(self, sahaf_id):
+        sahaf = self.sahaf_registry.by_id(sahaf_id) if self.sahaf_registry else None
+        return sahaf or {'name': f"Sahaf {sahaf_id}", 'seller_url': f"{BASE_URL}/sahaf-sahaf{sahaf_id}.html"}
+
+    async def _crawl_task(self, engine, task):
+        sahaf = self._sahaf_for(task.sahaf_id)
+        books = await engine.crawl_sahaf(sahaf, start_page=task.page_from, end_page=task.page_to)
+        # Motor gruptaki görevlerce paylaşılır; yalnızca bu görevin sayfalarına bakılır
+        failed = engine.has_incomplete(sahaf.get('name', ''), task.page_from, task.page_to)
+        return task, books, failed
+
+    def _run_batch(self, tasks):
+        # Aynı sorgunun görevleri tek motor ve tek event loop'ta eşzamanlı taranır
+        groups = {}
+        for task in tasks:
+            groups.setdefault(json.dumps(task.params, sort_keys=True), []).append(task)
+
+        for group in groups.values():
+            engine = CrawlEngine(group[0].params, concurrency=self.concurrency, base_url=self.base_url,
+                                 session_pool=self.session_pool, rate_limiter=self.rate_limiter,
+                                 sahaf_registry=self.sahaf_registry)
+            if self.session_pool is None:
+                self.session_pool = engine.session_pool
+
+            async def crawl_group():
+                return await asyncio.gather(*(self._crawl_task(engine, task) for task in group),
+                                            return_exceptions=True)
+
+            results = engine.run(crawl_group())
+            self.requests += engine.request_count
+            for task, result in zip(group, results):
+                if isinstance(result, Exception):
+                    self.frontier.fail(task.id, self.owner, result)
+                    self.tasks_failed += 1
+                    continue
+                _, books, failed = result
+                if failed:
+                    self.frontier.fail(task.id, self.owner, "sayfalar alınamadı")
+                    self.tasks_failed += 1
+                    continue
+                if self.db_manager.save_books(books) is None:
+                    self.frontier.fail(task.id, self.owner, "kitaplar kaydedilemedi")
+                    self.tasks_failed += 1
+                    continue
+                self.frontier.complete(task.id, self.owner, len(books))
+                self.tasks_done += 1
+                self.books_saved += len(books)
+
+    def run(self, exit_when_idle=True, poll_interval=2.0):
+        """Kuyruk boşalana (veya stop çağrılana) kadar görev al ve tara"""
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        try:
+            while not self._stop.is_set():
+                tasks = self.frontier.claim(self.owner, self.batch_size)
+                if not tasks:
+                    if exit_when_idle:
+                        break
+                    self._stop.wait(poll_interval)
+                    continue
+                self._run_batch(tasks)
+                self._emit(f"[{self.owner}] {self.tasks_done} görev, {self.books_saved} kitap")
+        finally:
+            self._stop.set()
+            self.frontier.release(self.owner)
+        return {'owner': self.owner, 'tasks': self.tasks_done, 'failed': self.tasks_failed,
+                'books': self.books_saved, 'requests': self.requests, 'elapsed': time.perf_counter() - started,
+                'cpu': time.process_time() - cpu_started}
+
+
+def run_frontier_worker(db_path, base_url=BASE_URL, owner=None, concurrency=DEFAULT_CONCURRENCY,
+                        exit_when_idle=True, quiet=True):
+    """Ayrı süreçte çalıştırılabilen worker giriş noktası (benchmarks ve CLI)"""
+    frontier = CrawlFrontier(db_path)
+    worker = FrontierWorker(frontier, DatabaseManager(db_path), owner=owner, concurrency=concurrency,
+                            base_url=base_url, sahaf_registry=get_sahaf_registry(),
+                            progress_callback=None if quiet else print)
+    try:
+        return worker.run(exit_when_idle=exit_when_idle)
+    finally:
+        frontier.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paylaşılan tarama kuyruğu")
+    parser.add_argument('--db', default='kitaplar.db')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed = commands.add_parser('seed', help="Görevleri kuyruğa ekle")
+    seed.add_argument('--sehir', action='append', default=[], help="Şehir (birden çok verilebilir)")
+    seed.add_argument('--tum-sehirler', action='store_true')
+    seed.add_argument('--kategoriler', action='store_true', help="kategoriler.json'daki her alt kategori için ayrı sorgu")
+    seed.add_argument('--kitap-adi', default='')
+    seed.add_argument('--yazar', default='')
+    seed.add_argument('--chunk', type=int, default=DEFAULT_CHUNK_PAGES, help="Görev başına sayfa")
+
+    work = commands.add_parser('work', help="Kuyruktan görev alıp tara")
+    work.add_argument('--owner')
+    work.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY)
+    work.add_argument('--bekle', action='store_true', help="Kuyruk boşalınca çıkma, yeni görev bekle")
+
+    commands.add_parser('stats', help="Kuyruk durumunu göster")
+    args = parser.parse_args(argv)
+
+    if args.command == 'seed':
+        registry = get_sahaf_registry()
+        cities = registry.cities() if args.tum_sehirler else args.sehir
+        if not cities:
+            parser.error("--sehir veya --tum-sehirler gerekli")
+        queries = [{'kitap_adi': args.kitap_adi, 'yazar': args.yazar}]
+        if args.kategoriler:
+            with open('kategoriler.json', 'r', encoding='utf-8') as f:
+                kategoriler = json.load(f)
+            queries = [
+                dict(queries[0], kategori2=ana['ana_kategori_id'], kategori=alt['kategori_id'],
+                     kategori_adi=ana['ana_kategori_adi'], alt_kategori_adi=alt['kategori_adi'])
+                for ana in kategoriler for alt in ana.get('alt_kategoriler', [])
+            ]
+        frontier = CrawlFrontier(args.db)
+        added = sum(frontier.seed(params, registry.by_city(city), args.chunk) for params in queries for city in cities)
+        print(f"{added} görev eklendi ({len(queries)} sorgu, {len(cities)} şehir)")
+    elif args.command == 'work':
+        result = run_frontier_worker(args.db, owner=args.owner, concurrency=args.concurrency,
+                                     exit_when_idle=not args.bekle, quiet=False)
+        print(f"Bitti: {result['tasks']} görev, {result['failed']} hatalı, {result['books']} kitap")
+    else:
+        for status, counts in sorted(CrawlFrontier(args.db).stats().items()):
+            print(f"{status:<8} {counts['tasks']:>7} görev {counts['books']:>9} kitap")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
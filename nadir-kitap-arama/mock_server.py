@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+nadirkitap.com kitapara.php için yerel HTTP taklidi
+
+Tarama motorunun hızını ve davranışını internete çıkmadan ölçmek için
+nadirkitap sonuç sayfası işaretlemesini taklit eden sahte sayfalar üretir.
+"""
+
+import contextlib
+import html
+import random
+import threading
+import time
+import urllib.parse
+from collections import deque
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+from crawler import PAGE_SIZE
+from turkish_text import fold
+
+
+AUTHORS = ["Yaşar Kemal", "Sait Faik Abasıyanık", "Orhan Pamuk", "Sabahattin Ali",
+           "Oğuz Atay", "Halide Edib Adıvar", "Ahmet Hamdi Tanpınar", "Nazım Hikmet"]
+PUBLISHERS = ["Yapı Kredi Yayınları", "İletişim Yayınları", "Can Yayınları", "Remzi Kitabevi"]
+
+
+def generate_sahaf_books(sahaf_id, count):
+    """Sahaf için deterministik sahte kitap listesi üret"""
+    sahaf_id = int(sahaf_id)
+    books = []
+    for i in range(count):
+        book_no = sahaf_id * 100000 + i
+        books.append({
+            'id': book_no,
+            'title': f"Kitap {sahaf_id}-{i}",
+            'author': AUTHORS[(sahaf_id + i) % len(AUTHORS)],
+            'publisher': PUBLISHERS[i % len(PUBLISHERS)],
+            'price': 5 + ((sahaf_id * 7919 + i * 104729) % 500000) / 100,
+            'year': 1900 + (sahaf_id * 31 + i * 37) % 125,
+            'url': f"https://www.nadirkitap.com/kitap-{sahaf_id}-{i}-kitap{book_no}.html",
+            'sahaf_id': sahaf_id,
+            'sahaf_name': f"Sahaf {sahaf_id}",
+        })
+    return books
+
+
+def render_book_li(book):
+    """Tek kitap için nadirkitap liste işaretlemesini üret"""
+    price = f"{book['price']:.2f}".replace('.', ',')
+    return f"""
+<li>
+  <div class="product-list-image"><img src="/img/{book['id']}.jpg"></div>
+  <div class="product-list-content">
+    <h4 class="break-work"><a href="{book['url']}"><span>{html.escape(book['title'])}</span></a></h4>
+    <p>{html.escape(book['author'])}</p>
+    <ul class="product-list-bottom">
+      <li><span class="col-md-3">Yayınevi</span><span class="col-md-9">: {html.escape(book['publisher'])}</span></li>
+      <li><span class="col-md-3">Baskı Yılı</span><span class="col-md-9">: {book['year']}</span></li>
+    </ul>
+    <a class="seller-link" href="/sahaf-{book['sahaf_id']}-sahaf{book['sahaf_id']}.html">{html.escape(book['sahaf_name'])}</a>
+  </div>
+  <div class="product-list-price">{price} TL</div>
+</li>"""
+
+
+def render_page(books, page, total, query):
+    """Sonuç sayfasının tamamını üret"""
+    last_page = max(1, (total + PAGE_SIZE - 1) // PAGE_SIZE)
+    items = "".join(render_book_li(book) for book in books)
+    pages = []
+    for number in range(1, min(last_page, 10) + 1):
+        params = dict(query, page=str(number))
+        pages.append(f'<li><a href="kitapara.php?{html.escape(urllib.parse.urlencode(params))}">{number}</a></li>')
+    if last_page > 10:
+        params = dict(query, page=str(last_page))
+        pages.append(f'<li><a href="kitapara.php?{html.escape(urllib.parse.urlencode(params))}">Son</a></li>')
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Arama Sonuçları</title></head>
+<body>
+<div class="search-info"><span class="result-count">{total} sonuç</span></div>
+<div class="list-cell">
+  <ul class="product-list">{items}</ul>
+</div>
+<ul class="pagination">{''.join(pages)}</ul>
+</body></html>"""
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        stand_in = self.server.stand_in
+        parsed = urllib.parse.urlparse(self.path)
+        if parsed.path != '/kitapara.php':
+            self.send_error(404)
+            return
+
+        query = {key: values[0] for key, values in urllib.parse.parse_qs(parsed.query, keep_blank_values=True).items()}
+        if not stand_in.record_request(self.path):
+            self.send_error(429)
+            return
+        if stand_in.should_fail(query):
+            self.send_error(503)
+            return
+        if stand_in.latency:
+            with stand_in.track_inflight():
+                time.sleep(stand_in.latency)
+
+        books = stand_in.search(query)
+        try:
+            page = max(1, int(query.get('page', '1') or 1))
+        except ValueError:
+            page = 1
+        page_books = books[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+
+        body = render_page(page_books, page, len(books), query).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Konsolu istek loglarıyla doldurma
+
+
+class NadirKitapStandIn:
+    """Yerel nadirkitap taklidi sunucusu
+
+    inventory: {sahaf_id: kitap_sayisi}
+    latency: her isteğe eklenecek yapay gecikme (saniye)
+    max_rate: saniyede bundan fazla istek gelirse 429 döner (None: sınırsız)
+    error_rate: isteklerin bu oranı rastgele 503 döner
+    broken_sahaflar: bu sahaf ID'leri için her istek 503 döner
+    categories: [(ana_kategori_id, kategori_id), ...]; verilirse kitaplar bu kategorilere
+        dağıtılır, her 8. kitap bir sonraki kategoride de listelenir (kategori2/kategori filtresi)
+    """
+
+    def __init__(self, inventory, latency=0.05, max_rate=None, error_rate=0.0, broken_sahaflar=(),
+                 categories=None, host='127.0.0.1', port=0):
+        self.inventory = {str(sahaf_id): count for sahaf_id, count in inventory.items()}
+        self.latency = latency
+        self.max_rate = max_rate
+        self.error_rate = error_rate
+        self.broken_sahaflar = {str(sahaf_id) for sahaf_id in broken_sahaflar}
+        self._random = random.Random(42)
+        self.request_count = 0
+        self.throttled_count = 0
+        # Aynı anda yanıt bekleyen istek sayısı ve görülen en yüksek değeri
+        self.inflight = 0
+        self.max_inflight = 0
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._books = {sahaf_id: generate_sahaf_books(sahaf_id, count) for sahaf_id, count in self.inventory.items()}
+        if categories:
+            categories = [(str(ana), str(alt)) for ana, alt in categories]
+            for sahaf_books in self._books.values():
+                for book in sahaf_books:
+                    index = book['id'] * 7 % len(categories)
+                    listed = [categories[index]]
+                    if book['id'] % 8 == 0:
+                        listed.append(categories[(index + 1) % len(categories)])
+                    book['categories'] = {category for pair in listed for category in pair}
+        self._server = ThreadingHTTPServer((host, port), _StandInHandler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record_request(self, path):
+        """İsteği say; hız sınırı aşıldıysa False"""
+        with self._lock:
+            self.request_count += 1
+            if not self.max_rate:
+                return True
+            now = time.monotonic()
+            while self._recent and now - self._recent[0] > 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.max_rate:
+                self.throttled_count += 1
+                return False
+            self._recent.append(now)
+            return True
+
+    @contextlib.contextmanager
+    def track_inflight(self):
+        """Gecikme süresince isteği uçuşta say (istemcinin eşzamanlılığını ölçmek için)"""
+        with self._lock:
+            self.inflight += 1
+            self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.inflight -= 1
+
+    def should_fail(self, query):
+        """Hata enjeksiyonu: bu istek 503 mü dönmeli"""
+        if query.get('satici') in self.broken_sahaflar:
+            return True
+        with self._lock:
+            return self.error_rate > 0 and self._random.random() < self.error_rate
+
+    def search(self, query):
+        """Sorgu parametrelerine uyan kitapları döndür"""
+        sahaf_id = query.get('satici', '0') or '0'
+        if sahaf_id == '0':
+            books = [book for sahaf_books in self._books.values() for book in sahaf_books]
+        else:
+            books = self._books.get(sahaf_id, [])
+
+        # Kitap adı ve yazar: Türkçe karakterleri dönüştürülmüş, büyük/küçük harf duyarsız içerme
+        for key, field in (('kitap_Adi', 'title'), ('yazar', 'author')):
+            wanted = fold(query.get(key, ''))
+            if wanted:
+                books = [book for book in books if wanted in fold(book[field])]
+
+        for key in ('kategori2', 'kategori'):
+            category = query.get(key, '')
+            if category and category != '0':
+                books = [book for book in books if category in book.get('categories', ())]
+
+        fiyat1 = query.get('fiyat1', '')
+        fiyat2 = query.get('fiyat2', '')
+        if fiyat1:
+            books = [book for book in books if book['price'] >= float(fiyat1)]
+        if fiyat2:
+            books = [book for book in books if book['price'] <= float(fiyat2)]
+
+        tarih1 = int(query.get('tarih1', '0') or 0)
+        tarih2 = int(query.get('tarih2', '0') or 0)
+        if tarih1:
+            books = [book for book in books if book['year'] >= tarih1]
+        if tarih2:
+            books = [book for book in books if book['year'] <= tarih2]
+
+        siralama = query.get('siralama', 'fiyatartan.')
+        if siralama == 'fiyatazalan.':
+            books = sorted(books, key=lambda book: book['price'], reverse=True)
+        elif siralama == 'tarihyeni.':
+            books = sorted(books, key=lambda book: book['id'], reverse=True)
+        elif siralama == 'tariheski.':
+            books = sorted(books, key=lambda book: book['id'])
+        else:
+            books = sorted(books, key=lambda book: book['price'])
+        return books
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+kitapara.php sonuç sayfaları için disk önbelleği
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+import urllib.parse
+import zlib
+
+
+# LRU erişim zamanı en fazla bu sıklıkla (saniye) güncellenir; her isabette yazma yapılmaz
+TOUCH_INTERVAL = 300
+
+
+def normalize_url(url):
+    """Aynı sorguyu ifade eden URL'leri tek biçime getir (parametre sırası, host büyük/küçük harf)"""
+    parsed = urllib.parse.urlsplit(url)
+    params = sorted(urllib.parse.parse_qsl(parsed.query, keep_blank_values=True))
+    query = urllib.parse.urlencode(params)
+    return urllib.parse.urlunsplit((parsed.scheme.lower(), parsed.netloc.lower(), parsed.path, query, ''))
+
+
+def cache_key(url):
+    """Normalize edilmiş URL'in içerik adresi"""
+    return hashlib.sha256(normalize_url(url).encode('utf-8')).hexdigest()
+
+
+class PageCache:
+    """Sıkıştırılmış sayfa gövdelerini TTL ve boyut sınırlı LRU ile saklar"""
+
+    def __init__(self, path="sayfa_cache.db", max_bytes=256 * 1024 * 1024, default_ttl=86400):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                body BLOB,
+                size INTEGER,
+                raw_size INTEGER,
+                stored_at REAL,
+                expires_at REAL,
+                accessed_at REAL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages(accessed_at)')
+        self._conn.commit()
+        self._total_bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def get(self, url, max_age=None):
+        """Önbellekteki sayfayı döndür; yoksa, süresi dolmuşsa veya max_age'den eskiyse None"""
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT body, raw_size, stored_at, expires_at, accessed_at FROM pages WHERE key = ?', (key,)
+            ).fetchone()
+            if not row or row[3] < now or (max_age is not None and now - row[2] > max_age):
+                self.misses += 1
+                return None
+            # Tahliye sırası için dakikalar mertebesinde doğruluk yeter
+            if now - row[4] > TOUCH_INTERVAL:
+                self._conn.execute('UPDATE pages SET accessed_at = ? WHERE key = ?', (now, key))
+                self._conn.commit()
+            self.hits += 1
+            self.bytes_saved += row[1]
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def put(self, url, text, ttl=None):
+        """Sayfayı sıkıştırarak sakla, gerekirse en az kullanılanları sil"""
+        raw = text.encode('utf-8')
+        body = zlib.compress(raw, 6)
+        now = time.time()
+        key = cache_key(url)
+        with self._lock:
+            old = self._conn.execute('SELECT size FROM pages WHERE key = ?', (key,)).fetchone()
+            self._conn.execute('''
+                INSERT OR REPLACE INTO pages (key, url, body, size, raw_size, stored_at, expires_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (key, normalize_url(url), body, len(body), len(raw), now, now + (ttl or self.default_ttl), now))
+            self._total_bytes += len(body) - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Süresi dolanları, ardından en eski erişilenleri sınırın %90'ına inene kadar sil"""
+        self._conn.execute('DELETE FROM pages WHERE expires_at < ?', (time.time(),))
+        target = self.max_bytes * 0.9
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+        if total > target:
+            removed = 0
+            victims = []
+            for key, size in self._conn.execute('SELECT key, size FROM pages ORDER BY accessed_at'):
+                if total - removed <= target:
+                    break
+                victims.append((key,))
+                removed += size
+            self._conn.executemany('DELETE FROM pages WHERE key = ?', victims)
+            total -= removed
+        self._total_bytes = total
+
+    def stats(self):
+        """İsabet oranı ve tasarruf edilen bayt sayaçları"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'bytes_saved': self.bytes_saved,
+                'stored_bytes': self._total_bytes,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM pages')
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Süreç havuzunda sayfa ayrıştırma
+
+Ayrıştırma GUI ve veritabanı thread'leriyle aynı GIL'i paylaşmasın diye ham
+HTML ayrı süreçlere gönderilir, geriye sadece küçük kayıt tuple'ları döner.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import concurrent.futures
+
+from parsers import get_parser, Listing
+
+
+# Süreçler arası taşınan kayıt alanları (sözlük yerine tuple, daha az pickle yükü)
+RECORD_FIELDS = ("kitap_adi", "yazar", "fiyat", "fiyat_numeric", "site_url", "aciklama", "sahaf_adi", "sahaf_url")
+
+
+def book_to_record(book):
+    return tuple(book[field] for field in RECORD_FIELDS)
+
+
+def record_to_book(record):
+    return dict(zip(RECORD_FIELDS, record))
+
+
+def parse_to_records(html, parser_name=None):
+    """Ayrıştırıcı süreçte çalışır: HTML -> (kayıt tuple listesi, son sayfa, toplam)"""
+    listing = get_parser(parser_name).parse_listing(html)
+    return [book_to_record(book) for book in listing.books], listing.last_page, listing.total
+
+
+class ParsePool:
+    """Ayrıştırıcı süreç havuzu
+
+    max_pending: aynı anda ayrıştırılmayı bekleyebilecek en fazla sayfa.
+    Kuyruk dolduğunda tarama motoru yeni sayfa indirmeyi bekletir, böylece
+    indirme ayrıştırmadan hızlı olsa bile bellekteki ham HTML sınırlı kalır.
+    """
+
+    def __init__(self, workers=None, max_pending=None, parser=None):
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.max_pending = max_pending or self.workers * 4
+        self.parser = parser
+        # Qt süreci fork edilmesin diye spawn kullanılır. Spawn edilen süreç ana
+        # betiği (run.py, cli.py) __mp_main__ olarak yeniden çalıştırır; betikler
+        # ağır modülleri (PyQt6) main() içinde yüklemelidir
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self._warmed = False
+        self._warm_lock = threading.Lock()
+
+    def warm(self):
+        """Süreçleri önceden başlat (ilk sayfada spawn gecikmesi yaşanmasın); yalnızca ilk çağrıda bekler"""
+        with self._warm_lock:
+            if self._warmed:
+                return
+            futures = [self._executor.submit(parse_to_records, "", self.parser) for _ in range(self.workers)]
+            concurrent.futures.wait(futures)
+            self._warmed = True
+
+    def submit(self, html, parser=None):
+        """HTML'i ayrıştırıcı sürece gönder, (kayıtlar, son sayfa, toplam) Future'ı döndür
+
+        parser: ayrıştırıcı adı; verilmezse havuzun varsayılanı kullanılır.
+        Havuz aramalar arasında paylaşıldığından her arama kendi seçimini iletir.
+        """
+        return self._executor.submit(parse_to_records, html, parser or self.parser)
+
+    async def parse(self, html, parser=None):
+        """Sayfayı ayrıştır ve Listing döndür"""
+        records, last_page, total = await asyncio.wrap_future(self.submit(html, parser))
+        return Listing([record_to_book(record) for record in records], last_page, total)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
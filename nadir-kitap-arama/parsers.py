@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Sonuç sayfası ayrıştırıcıları
+
+BeautifulSoup referans uygulamadır; lxml arka ucu aynı sözlükleri
+C seviyesinde ayrıştırma ve önceden derlenmiş XPath ifadeleriyle üretir.
+"""
+
+import re
+from collections import namedtuple
+from bs4 import BeautifulSoup
+
+try:
+    import lxml.html
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+SITE_URL = "https://www.nadirkitap.com"
+
+# Sayfalama bloğu olabilecek etiketler (class'ında "pagination" olan ul/ol/nav/div);
+# menü, blog vb. linklerindeki page= parametreleri sayılmaz
+PAGINATION_TAGS = ('ul', 'ol', 'nav', 'div')
+# Sayfalama linklerindeki sayfa numaraları (kitapara.php?...&page=N)
+_PAGE_LINK = re.compile(r'[?&;]page=(\d+)')
+# Toplam sonuç sayısı ("1.234 sonuç" gibi)
+_RESULT_COUNT = re.compile(r'(\d{1,3}(?:\.\d{3})+|\d+)\s*(?:sonuç|kayıt|ürün)', re.IGNORECASE)
+
+# Sayfanın kitapları, sayfalama bilgisinden son sayfa ve (bulunursa) toplam sonuç sayısı
+Listing = namedtuple('Listing', 'books last_page total')
+
+
+def parse_price(price_text):
+    """Fiyattan sadece sayıları çıkar (96,00 TL -> 96.00)"""
+    try:
+        price_clean = re.sub(r'[^\d,.]', '', price_text.replace(',', '.'))
+        if price_clean:
+            return float(price_clean)
+    except ValueError:
+        pass
+    return 0
+
+
+def last_page_from_links(hrefs):
+    """Sayfalama linklerinin href'lerinden son sayfa numarası (link yoksa 1)"""
+    numbers = [int(number) for href in hrefs for number in _PAGE_LINK.findall(href)]
+    return max(numbers) if numbers else 1
+
+
+def result_count_from_texts(texts):
+    """Sonuç sayısı öğelerinin metinlerinden toplam sonuç sayısı (bulunamazsa None)
+
+    Yalnızca class'ında "result-count" olan öğeler okunur; kenar çubuğundaki
+    kategori sayıları ve site geneli "ürün" sayıları sayılmaz.
+    """
+    for text in texts:
+        match = _RESULT_COUNT.search(text)
+        if match:
+            return int(match.group(1).replace('.', ''))
+    return None
+
+
+def parse_last_page(html):
+    """Sayfalama linklerinden son sayfa numarasını bul (link yoksa 1)"""
+    parser = get_parser()
+    return last_page_from_links(parser.pagination_links(parser.document(html)))
+
+
+def parse_result_count(html):
+    """Sayfadaki toplam sonuç sayısı (bulunamazsa None)"""
+    parser = get_parser()
+    return result_count_from_texts(parser.result_count_texts(parser.document(html)))
+
+
+def make_book(title, author, price_text, book_url, description, sahaf_name, sahaf_url):
+    """Ayrıştırıcıların ortak çıktı sözlüğü"""
+    if sahaf_url and not sahaf_url.startswith("http"):
+        sahaf_url = f"{SITE_URL}{sahaf_url}"
+    return {
+        "kitap_adi": title,
+        "yazar": author,
+        "fiyat": price_text,
+        "fiyat_numeric": parse_price(price_text) if price_text else 0,
+        "site_url": book_url,
+        "aciklama": description,
+        "sahaf_adi": sahaf_name,
+        "sahaf_url": sahaf_url
+    }
+
+
+class BaseParser:
+    """Ayrıştırıcıların ortak arayüzü"""
+
+    name = None
+
+    def document(self, html):
+        """HTML'i arka ucun ağacına ayrıştır"""
+        raise NotImplementedError
+
+    def books(self, document):
+        """Ağaçtaki tüm kitaplar"""
+        raise NotImplementedError
+
+    def pagination_links(self, document):
+        """Sayfalama bloklarındaki linklerin href'leri (iç içe bloklar dahil)"""
+        raise NotImplementedError
+
+    def result_count_texts(self, document):
+        """Sonuç sayısı öğelerinin metinleri"""
+        raise NotImplementedError
+
+    def parse_page(self, html):
+        """Sonuç sayfasındaki tüm kitapları çıkar"""
+        return self.books(self.document(html))
+
+    def parse_listing(self, html):
+        """Kitaplar ve sayfalama bilgisi (Listing); sayfa bir kez ayrıştırılır"""
+        document = self.document(html)
+        return Listing(self.books(document),
+                       last_page_from_links(self.pagination_links(document)),
+                       result_count_from_texts(self.result_count_texts(document)))
+
+
+class BeautifulSoupParser(BaseParser):
+    """Referans ayrıştırıcı (saf Python html.parser)"""
+
+    name = "bs4"
+
+    def document(self, html):
+        return BeautifulSoup(html or '', 'html.parser')
+
+    def books(self, soup):
+        # Kitap konteynerini bul
+        books_container = soup.find("div", class_="list-cell")
+        if not books_container:
+            return []
+
+        product_list = books_container.find("ul", class_="product-list")
+        if not product_list:
+            return []
+
+        books = []
+        for li in product_list.find_all("li"):
+            book_data = self.extract_book_data(li)
+            if book_data:
+                books.append(book_data)
+        return books
+
+    def pagination_links(self, soup):
+        return [link['href'] for block in soup.find_all(PAGINATION_TAGS, class_="pagination")
+                for link in block.find_all("a", href=True)]
+
+    def result_count_texts(self, soup):
+        return [element.get_text() for element in soup.find_all(class_="result-count")]
+
+    def extract_book_data(self, li):
+        """Bir li elementinden kitap verilerini çıkarır"""
+        try:
+            # Kitap başlığı
+            title_tag = li.find("h4", class_="break-work")
+            if not title_tag:
+                return None
+
+            title_link = title_tag.find("a")
+            if not title_link:
+                return None
+
+            title = title_link.find("span").text.strip() if title_link.find("span") else title_link.text.strip()
+            book_url = title_link.get("href", "")
+
+            # Yazar - h4'ün parent div'inden sonraki p tag'ı
+            author = ""
+            title_parent = title_tag.parent
+            if title_parent:
+                p_tag = title_parent.find("p")
+                if p_tag:
+                    author = p_tag.text.strip()
+
+            # Fiyat - product-list-price sınıfındaki div'den al
+            price_text = ""
+            price_div = li.find("div", class_="product-list-price")
+            if price_div:
+                price_text = price_div.text.strip()
+
+            # Açıklama - Yayınevi bilgisini al
+            description = ""
+            yayin_li = None
+            for ul in li.find_all("ul", class_="product-list-bottom"):
+                for li_item in ul.find_all("li"):
+                    if "Yayınevi" in li_item.text:
+                        yayin_li = li_item
+                        break
+                if yayin_li:
+                    break
+
+            if yayin_li:
+                yayin_span = yayin_li.find("span", class_="col-md-9")
+                if yayin_span:
+                    description = yayin_span.text.strip().lstrip(": ").strip()
+
+            # Sahaf bilgilerini çıkar - seller-link sınıfındaki a tag'ından al
+            sahaf_name = ""
+            sahaf_url = ""
+            seller_link = li.find("a", class_="seller-link")
+            if seller_link:
+                sahaf_name = seller_link.text.strip()
+                sahaf_url = seller_link.get("href", "")
+
+            return make_book(title, author, price_text, book_url, description, sahaf_name, sahaf_url)
+
+        except Exception as e:
+            return None
+
+
+def _has_class(tag, class_name):
+    """XPath: etiketin class listesinde class_name var mı"""
+    return f"{tag}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+
+
+class LxmlParser(BaseParser):
+    """lxml tabanlı hızlı ayrıştırıcı, BeautifulSoupParser ile aynı çıktıyı üretir"""
+
+    name = "lxml"
+
+    def __init__(self):
+        if not LXML_AVAILABLE:
+            raise ImportError("lxml kurulu değil")
+        # Seçiciler bir kez derlenir, her li için C tarafında çalışır
+        self._items = etree.XPath(
+            f"((//{_has_class('div', 'list-cell')})[1]//{_has_class('ul', 'product-list')})[1]"
+            f"//li[.//{_has_class('h4', 'break-work')}]"
+        )
+        self._title_tag = etree.XPath(f"(.//{_has_class('h4', 'break-work')})[1]")
+        self._first_link = etree.XPath("(.//a)[1]")
+        self._first_span = etree.XPath("(.//span)[1]")
+        self._first_p = etree.XPath("(.//p)[1]")
+        self._price_div = etree.XPath(f"(.//{_has_class('div', 'product-list-price')})[1]")
+        self._bottom_items = etree.XPath(f".//{_has_class('ul', 'product-list-bottom')}//li")
+        self._col9_span = etree.XPath(f"(.//{_has_class('span', 'col-md-9')})[1]")
+        self._seller_link = etree.XPath(f"(.//{_has_class('a', 'seller-link')})[1]")
+        blocks = " or ".join(f"self::{tag}" for tag in PAGINATION_TAGS)
+        self._pagination_links = etree.XPath(f"//{_has_class('*', 'pagination')}[{blocks}]//a/@href")
+        self._result_counts = etree.XPath(f"//{_has_class('*', 'result-count')}")
+
+    def document(self, html):
+        """lxml belgesi; boş veya ayrıştırılamayan sayfada None"""
+        if not html or not html.strip():
+            return None
+        try:
+            return lxml.html.document_fromstring(html)
+        except (etree.ParserError, ValueError):
+            return None
+
+    def pagination_links(self, document):
+        return [str(href) for href in self._pagination_links(document)] if document is not None else []
+
+    def result_count_texts(self, document):
+        return [element.text_content() for element in self._result_counts(document)] if document is not None else []
+
+    def books(self, document):
+        if document is None:
+            return []
+
+        books = []
+        for li in self._items(document):
+            book_data = self.extract_book_data(li)
+            if book_data:
+                books.append(book_data)
+        return books
+
+    def extract_book_data(self, li):
+        """Bir li elementinden kitap verilerini çıkarır"""
+        try:
+            title_tags = self._title_tag(li)
+            if not title_tags:
+                return None
+            title_tag = title_tags[0]
+
+            links = self._first_link(title_tag)
+            if not links:
+                return None
+            title_link = links[0]
+
+            spans = self._first_span(title_link)
+            title = (spans[0] if spans else title_link).text_content().strip()
+            book_url = title_link.get("href", "")
+
+            author = ""
+            title_parent = title_tag.getparent()
+            if title_parent is not None:
+                p_tags = self._first_p(title_parent)
+                if p_tags:
+                    author = p_tags[0].text_content().strip()
+
+            price_text = ""
+            price_divs = self._price_div(li)
+            if price_divs:
+                price_text = price_divs[0].text_content().strip()
+
+            description = ""
+            for li_item in self._bottom_items(li):
+                if "Yayınevi" in li_item.text_content():
+                    yayin_spans = self._col9_span(li_item)
+                    if yayin_spans:
+                        description = yayin_spans[0].text_content().strip().lstrip(": ").strip()
+                    break
+
+            sahaf_name = ""
+            sahaf_url = ""
+            seller_links = self._seller_link(li)
+            if seller_links:
+                sahaf_name = seller_links[0].text_content().strip()
+                sahaf_url = seller_links[0].get("href", "")
+
+            return make_book(title, author, price_text, book_url, description, sahaf_name, sahaf_url)
+
+        except Exception as e:
+            return None
+
+
+PARSERS = {
+    BeautifulSoupParser.name: BeautifulSoupParser,
+    LxmlParser.name: LxmlParser,
+}
+DEFAULT_PARSER = LxmlParser.name if LXML_AVAILABLE else BeautifulSoupParser.name
+
+_parser_cache = {}
+
+
+def get_parser(name=None):
+    """İsme göre ayrıştırıcı örneğini döndür (lxml yoksa bs4'e düşer)"""
+    name = name or DEFAULT_PARSER
+    if name == LxmlParser.name and not LXML_AVAILABLE:
+        name = BeautifulSoupParser.name
+    if name not in _parser_cache:
+        if name not in PARSERS:
+            raise ValueError(f"Bilinmeyen ayrıştırıcı: {name}")
+        _parser_cache[name] = PARSERS[name]()
+    return _parser_cache[name]
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Genel aramayı fiyat veya yıl aralıklarına bölme
+
+kitapara.php fiyat1/fiyat2 ve tarih1/tarih2 parametrelerini destekler. Sorgu
+ayrık aralıklara bölünür, aralıklar eşzamanlı taranır; hâlâ çok sayfa dönen
+aralıklar ikiye bölünerek tekrar denenir.
+"""
+
+# Başlangıç aralıkları (üst sınırı None olan aralık açık uçludur)
+PRICE_BOUNDS = (0, 10, 25, 50, 100, 250, 1000, None)
+YEAR_BOUNDS = (1000, 1900, 1940, 1960, 1980, 2000, 2010, None)
+
+PARTITION_FIELDS = {
+    'fiyat': ('fiyat1', 'fiyat2', 'Fiyat', PRICE_BOUNDS),
+    'tarih': ('tarih1', 'tarih2', 'Yıl', YEAR_BOUNDS),
+}
+
+
+class Partition:
+    """Tek bir fiyat veya yıl aralığı [lo, hi]"""
+
+    def __init__(self, field, lo, hi=None):
+        if field not in PARTITION_FIELDS:
+            raise ValueError(f"Bilinmeyen bölümleme alanı: {field}")
+        self.field = field
+        self.lo = lo
+        self.hi = hi
+
+    @property
+    def label(self):
+        name = PARTITION_FIELDS[self.field][2]
+        return f"{name} {self.lo}+" if self.hi is None else f"{name} {self.lo}-{self.hi}"
+
+    def apply(self, search_params):
+        """Aralık filtresini eklenmiş arama parametreleri"""
+        lo_key, hi_key = PARTITION_FIELDS[self.field][:2]
+        params = dict(search_params)
+        params[lo_key] = self.lo
+        params[hi_key] = '' if self.hi is None else self.hi
+        if self.field == 'tarih' and self.hi is None:
+            params[hi_key] = 0  # tarih2=0: üst sınır yok
+        return params
+
+    def can_split(self):
+        return self.hi is None or self.hi - self.lo >= 2
+
+    def split(self):
+        """Aralığı ikiye böl; açık uçlu aralıkta sınır ikiye katlanır"""
+        if self.hi is None:
+            mid = max(self.lo * 2, self.lo + 2)
+            return [Partition(self.field, self.lo, mid), Partition(self.field, mid, None)]
+        mid = (self.lo + self.hi) // 2
+        return [Partition(self.field, self.lo, mid), Partition(self.field, mid, self.hi)]
+
+    def __repr__(self):
+        return f"Partition({self.label})"
+
+
+def initial_partitions(field):
+    """Alan için başlangıç aralıklarını oluştur"""
+    bounds = PARTITION_FIELDS[field][3]
+    return [Partition(field, lo, hi) for lo, hi in zip(bounds, bounds[1:])]
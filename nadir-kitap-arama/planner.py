@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Şehir taraması için iş planı ve kalan süre tahmini
+"""
+
+import math
+import threading
+import time
+
+from crawl_defaults import PAGE_SIZE, MAX_QUERY_PAGES
+from utils import extract_sahaf_id
+
+
+# Bu alanlardan biri doluysa sahafın envanterinin yalnızca küçük bir kısmı döner
+FILTER_FIELDS = ('kitap_adi', 'yazar', 'kategori', 'kategori2')
+
+
+def inventory_size(sahaf):
+    """sahaflar.json'daki kitap sayısı ('3002' gibi metin de olabilir)"""
+    try:
+        return int(str(sahaf.get('kitap_sayisi') or 0).replace('.', ''))
+    except ValueError:
+        return 0
+
+
+def estimate_pages(sahaf, search_params):
+    """Sahaf için beklenen sonuç sayfası sayısı
+
+    Filtresiz aramada envanterin tamamı döner. Filtreli aramada kaç kitabın
+    eşleşeceği bilinemediği için bir sayfa varsayılır; gerçek sayı 1.
+    sayfanın sayfalama bilgisiyle düzeltilir.
+    """
+    if any(search_params.get(field) for field in FILTER_FIELDS):
+        return 1
+    pages = max(1, math.ceil(inventory_size(sahaf) / PAGE_SIZE))
+    if pages > MAX_QUERY_PAGES:
+        # Aralıklara bölünen sahaflarda her aralığın 1. sayfası ayrıca çekilir
+        pages += pages // MAX_QUERY_PAGES
+    return pages
+
+
+class CrawlPlan:
+    """Sahaf başına tahmini sayfa sayıları, tamamlanan sayfalar ve ETA
+
+    Sahaflar büyükten küçüğe sıralanır; en büyük sahaf en sona kalıp taramayı
+    tek başına uzatmasın diye. on_progress(tamamlanan, toplam, kalan_saniye)
+    en fazla min_interval saniyede bir çağrılır.
+    """
+
+    def __init__(self, sahaflar, search_params, on_progress=None, min_interval=0.25):
+        self.estimates = {}
+        for sahaf in sahaflar:
+            sahaf_id = extract_sahaf_id(sahaf.get('seller_url'))
+            if sahaf_id:
+                self.estimates[sahaf_id] = estimate_pages(sahaf, search_params)
+        self.order = sorted(
+            (sahaf for sahaf in sahaflar if extract_sahaf_id(sahaf.get('seller_url')) in self.estimates),
+            key=lambda sahaf: (self.estimates[extract_sahaf_id(sahaf.get('seller_url'))], inventory_size(sahaf)),
+            reverse=True
+        )
+        self.done_pages = 0
+        self.on_progress = on_progress
+        self.min_interval = min_interval
+        self._started = time.monotonic()
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def total_pages(self):
+        return sum(self.estimates.values())
+
+    def set_pages(self, sahaf_id, pages):
+        """Tahmini, sahafın 1. sayfasından okunan gerçek sayfa sayısıyla değiştir"""
+        with self._lock:
+            if sahaf_id in self.estimates:
+                self.estimates[sahaf_id] = max(1, pages)
+        self._report()
+
+    def finish(self, sahaf_id, pages_done):
+        """Sahaf bittiğinde (boş, park edilmiş ya da eksik) kalan tahmini düş"""
+        with self._lock:
+            if sahaf_id in self.estimates:
+                self.estimates[sahaf_id] = pages_done
+        self._report(force=True)
+
+    def page_done(self):
+        with self._lock:
+            self.done_pages += 1
+        self._report()
+
+    def eta(self):
+        """Şimdiye kadarki hızla kalan sayfaların süresi (saniye, bilinmiyorsa None)"""
+        with self._lock:
+            done = self.done_pages
+            remaining = max(0, self.total_pages - done)
+        elapsed = time.monotonic() - self._started
+        if not done or elapsed <= 0:
+            return None
+        return remaining / (done / elapsed)
+
+    def _report(self, force=False):
+        if not self.on_progress:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_report < self.min_interval:
+            return
+        self._last_report = now
+        eta = self.eta()
+        total = self.total_pages
+        self.on_progress(min(self.done_pages, total), total, -1.0 if eta is None else eta)
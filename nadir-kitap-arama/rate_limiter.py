@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Sunucu yanıtlarına uyum sağlayan paylaşımlı hız sınırlayıcı
+"""
+
+import threading
+import time
+
+
+class AdaptiveRateLimiter:
+    """AIMD ayarlı token bucket
+
+    Hızlı ve 200 dönen yanıtlarda hız yavaşça artar (additive increase),
+    429/503 veya zaman aşımında yarıya iner (multiplicative decrease).
+    Aynı anda uçuşta olan isteklerin hepsi hata aldığında hızın bir anda
+    tabana çökmemesi için azaltmalar arasında bekleme süresi vardır.
+    """
+
+    def __init__(self, rate=5.0, min_rate=0.5, max_rate=40.0, increase=1.0,
+                 decrease=0.5, slow_threshold=3.0, cooldown=2.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_threshold = slow_threshold
+        self.cooldown = cooldown
+        self.throttle_count = 0
+        self._tokens = 1.0
+        self._last_refill = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        # Kova kapasitesi yaklaşık bir saniyelik istek kadar
+        capacity = max(1.0, self.rate)
+        self._tokens = min(capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    def acquire(self):
+        """Bir istek hakkı alınana kadar bekle (bloklayan, fetch thread'lerinde çağrılır)"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def record_response(self, status_code, elapsed):
+        """Yanıt durumuna ve süresine göre hızı ayarla"""
+        if status_code in (429, 503):
+            self.record_failure()
+            return
+        if status_code == 200 and elapsed < self.slow_threshold:
+            with self._lock:
+                # Saniyede yaklaşık `increase` kadar artış
+                self.rate = min(self.max_rate, self.rate + self.increase / max(self.rate, 1.0))
+
+    def record_failure(self):
+        """Zaman aşımı, bağlantı hatası veya sunucu yavaşlatması"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown:
+                return
+            self._last_decrease = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 1.0)
+            self.throttle_count += 1
+
+    @property
+    def current_rate(self):
+        with self._lock:
+            return self.rate
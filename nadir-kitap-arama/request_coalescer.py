@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+Aynı anda istenen aynı sayfalar için tek indirme ve tek ayrıştırma
+
+Toplu, kategori ve etkileşimli aramalar aynı kitapara.php sayfasını birkaç
+saniye arayla isteyebilir. Normalize edilmiş URL'i o anda indirilmekte olan
+bir istek, önceki isteğin sonucunu bekler; ağa ikinci kez gidilmez. Motorlar
+farklı thread ve event loop'larda çalıştığından bekleme
+concurrent.futures.Future üzerinden yapılır.
+"""
+
+import asyncio
+import threading
+import concurrent.futures
+
+from page_cache import normalize_url
+from parsers import Listing
+
+
+def _copy_listing(listing):
+    # Motorlar kitap sözlüklerine kendi kategori/şehir etiketlerini yazar; her bekleyene ayrı kopya
+    if listing is None:
+        return None
+    return Listing([dict(book_data) for book_data in listing.books], listing.last_page, listing.total)
+
+
+class RequestCoalescer:
+    """Uçuştaki (in-flight) aynı istekleri birleştirir
+
+    requests: gelen istek sayısı, deduplicated: başka bir isteğin sonucunu
+    paylaşan (ağa gitmeyen) istek sayısı.
+    """
+
+    def __init__(self):
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.deduplicated = 0
+
+    async def fetch(self, url, fetch_coro, cache_max_age=0):
+        """fetch_coro() ile sayfayı getir; aynı URL zaten getiriliyorsa onun sonucunu bekle
+
+        cache_max_age: isteğin kabul ettiği en eski önbellek kaydı (saniye), 0 ise
+        yalnızca ağ. İstekler yalnızca aynı önbellek kuralına sahip isteklerle
+        birleşir; kısa ömürlü önbellek isteyen bir arama başka motorun eski
+        önbellek sayfasını almaz.
+        """
+        key = (normalize_url(url), cache_max_age)
+        with self._lock:
+            self.requests += 1
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = concurrent.futures.Future()
+                self._inflight[key] = future
+            else:
+                self.deduplicated += 1
+
+        if not leader:
+            listing = await asyncio.wrap_future(future)
+            if listing is None:
+                # Sayfa yok ya da önceki istek durdurulan aramaya aitti; emin olmak için kendisi ister
+                with self._lock:
+                    self.deduplicated -= 1
+                return await fetch_coro()
+            return _copy_listing(listing)
+
+        try:
+            listing = await fetch_coro()
+        except asyncio.CancelledError:
+            # İstek durdurulan aramaya aitti; bekleyenler kendi yeniden deneme kurallarıyla tekrar ister
+            future.set_exception(ConnectionError("Paylaşılan istek iptal edildi"))
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(listing)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+        return _copy_listing(listing)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'deduplicated': self.deduplicated,
+                'inflight': len(self._inflight),
+            }
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Yeniden deneme politikası ve sahaf bazlı devre kesici
+"""
+
+import random
+import threading
+import time
+
+from requests import RequestException
+
+
+# Bu durum kodları geçici kabul edilir ve yeniden denenir
+RETRYABLE_STATUS = (403, 408, 429, 500, 502, 503, 504)
+
+
+class TransientFetchError(Exception):
+    """Yeniden denenebilir HTTP hatası"""
+
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+# Yalnızca ağ hataları (bağlantı, zaman aşımı) ve geçici HTTP durumları yeniden denenir;
+# ayrıştırma hataları ve programlama hataları hemen yükselir
+RETRYABLE_ERRORS = (TransientFetchError, RequestException, ConnectionError, TimeoutError)
+
+
+class RetryPolicy:
+    """Sınırlı sayıda, jitter'lı üstel geri çekilmeyle yeniden deneme"""
+
+    def __init__(self, max_attempts=4, base_delay=0.5, max_delay=15.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt):
+        """attempt. başarısız denemeden sonra beklenecek süre (full jitter)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Anahtar (sahaf) başına ardışık hata sayacı
+
+    failure_threshold ardışık hatadan sonra devre açılır; açık devredeki
+    sahaf park edilir ve reset_timeout geçtikten sonra tekrar denenebilir.
+    """
+
+    def __init__(self, failure_threshold=2, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = {}
+        self._opened_at = {}
+        self._lock = threading.Lock()
+
+    def record_success(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+            self._opened_at.pop(key, None)
+
+    def record_failure(self, key):
+        with self._lock:
+            self._failures[key] = self._failures.get(key, 0) + 1
+            if self._failures[key] >= self.failure_threshold:
+                self._opened_at[key] = time.monotonic()
+
+    def is_open(self, key):
+        with self._lock:
+            return key in self._opened_at
+
+    def remaining(self, key):
+        """Devrenin yarı açık denemeye hazır olmasına kalan süre"""
+        with self._lock:
+            opened_at = self._opened_at.get(key)
+            if opened_at is None:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - opened_at))
+
+    def half_open(self, key):
+        """Tek bir deneme hakkı ver: sonraki hata devreyi hemen tekrar açar"""
+        with self._lock:
+            self._opened_at.pop(key, None)
+            self._failures[key] = self.failure_threshold - 1
+
+    def open_keys(self):
+        with self._lock:
+            return list(self._opened_at)
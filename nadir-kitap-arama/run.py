@@ -13,12 +13,14 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-from PyQt6.QtWidgets import QApplication
-from main_window import MainApplication
-
 
 def main():
     """Uygulamayı başlat"""
+    # Qt ve pencere modülleri burada yüklenir: ayrıştırma süreçleri (spawn) bu dosyayı
+    # __mp_main__ olarak yeniden çalıştırır, GUI yığınını yüklememeleri gerekir
+    from PyQt6.QtWidgets import QApplication
+    from main_window import MainApplication
+
     app = QApplication(sys.argv)
     
     # Uygulama ikonunu ayarla (varsa)
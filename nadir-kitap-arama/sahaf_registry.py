@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+sahaflar.json için indeksli, bir kez yüklenen sahaf kaydı
+"""
+
+import json
+import threading
+
+from utils import extract_sahaf_id
+
+
+class SahafRegistry:
+    """Sahaf listesi ve ID / ad / şehir indeksleri
+
+    sahaflar.json uygulama boyunca bir kez ayrıştırılır; sahaf, ad ve şehir
+    aramaları dosyayı yeniden okumadan sözlüklerden yapılır.
+    """
+
+    def __init__(self, path="sahaflar.json"):
+        self.path = path
+        self.sahaflar = []
+        self._by_id = {}
+        self._by_name = {}
+        self._by_city = {}
+        self.load()
+
+    def load(self):
+        """sahaflar.json'u yükle ve indeksleri kur"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.sahaflar = json.load(f)
+        except Exception as e:
+            print(f"Sahaflar dosyası yüklenemedi: {e}")
+            self.sahaflar = []
+            return
+        self._build_indexes([extract_sahaf_id(sahaf.get('seller_url')) for sahaf in self.sahaflar])
+
+    def _build_indexes(self, ids):
+        """ids: sahaflar listesiyle aynı sıradaki sahaf ID'leri (URL'den çıkarılamadıysa None)"""
+        # Aynı sahaf listede iki kez geçebilir; ilk kayıt esas alınır
+        self._by_id = {}
+        self._by_name = {}
+        self._by_city = {}
+        for sahaf, sahaf_id in zip(self.sahaflar, ids):
+            if sahaf_id:
+                if sahaf_id in self._by_id:
+                    continue
+                self._by_id[sahaf_id] = sahaf
+            self._by_name.setdefault(sahaf.get('name'), sahaf)
+            city = sahaf.get('city')
+            if city:
+                self._by_city.setdefault(city, []).append(sahaf)
+
+    def by_id(self, sahaf_id):
+        return self._by_id.get(str(sahaf_id)) if sahaf_id else None
+
+    def by_url(self, seller_url):
+        """Sahaf sayfası URL'inden (…-sahafNNN.html) sahafı bul"""
+        return self.by_id(extract_sahaf_id(seller_url))
+
+    def by_name(self, name):
+        return self._by_name.get(name)
+
+    def by_city(self, city):
+        return list(self._by_city.get(city, []))
+
+    def cities(self):
+        return list(self._by_city)
+
+    def city_of(self, book_data):
+        """Kitabın sahaf bağlantısından şehrini bul (bulunamazsa '')"""
+        sahaf = self.by_url(book_data.get('sahaf_url')) or self.by_name(book_data.get('sahaf_adi'))
+        return sahaf.get('city', '') if sahaf else ''
+
+    def __len__(self):
+        return len(self.sahaflar)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_sahaf_registry():
+    """Uygulama boyunca paylaşılan sahaf kaydı (ilk çağrıda yüklenir)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SahafRegistry()
+        return _registry
@@ -0,0 +1,465 @@
+# -*- coding: utf-8 -*-
+"""
+Arama hattı: tarama, ayrıştırma ve kaydetme (Qt'siz)
+
+BookSearchWorker (GUI) ve cli.py (komut satırı) aynı hattı kullanır; ilerleme
+ve sonuçlar geri çağırımlarla bildirilir, bu modül PyQt import etmez.
+"""
+
+import time
+import threading
+
+from turkish_text import to_ascii
+from crawler import CrawlEngine, DEFAULT_CONCURRENCY, BASE_URL, extract_sahaf_id
+from session_pool import SessionPool
+from parse_pool import ParsePool
+from page_cache import PageCache
+from rate_limiter import AdaptiveRateLimiter
+from clearance_store import ClearanceStore
+from sahaf_registry import get_sahaf_registry
+from planner import CrawlPlan
+from request_coalescer import RequestCoalescer
+from category_sweep import CategorySweep, category_targets, DEFAULT_PARALLEL_CATEGORIES
+from wishlist import WishlistSearch, item_label, DEFAULT_PARALLEL_QUERIES, DEFAULT_MAX_PAGES
+
+
+# Tüm aramalar tarafından paylaşılan HTTP oturum ve ayrıştırıcı havuzları
+_session_pool = None
+_session_pool_lock = threading.Lock()
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+_page_cache = None
+_page_cache_lock = threading.Lock()
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+_request_coalescer = None
+_request_coalescer_lock = threading.Lock()
+
+
+def get_session_pool():
+    """Worker katmanının paylaşılan oturum havuzunu döndür"""
+    global _session_pool
+    with _session_pool_lock:
+        if _session_pool is None:
+            # Çözülmüş Cloudflare çerezleri uygulama yeniden başlasa da kullanılır
+            _session_pool = SessionPool(size=64, warm_url=BASE_URL, clearance_store=ClearanceStore())
+        return _session_pool
+
+
+def get_parse_pool():
+    """Ayrıştırmayı GUI sürecinin GIL'inden çıkaran paylaşılan süreç havuzu"""
+    global _parse_pool
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            _parse_pool = ParsePool()
+        return _parse_pool
+
+
+def get_page_cache():
+    """Aramalar arasında paylaşılan disk sayfa önbelleği"""
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache()
+        return _page_cache
+
+
+def get_rate_limiter():
+    """Tüm tarama yollarının paylaştığı uyarlanabilir hız sınırlayıcı"""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = AdaptiveRateLimiter()
+        return _rate_limiter
+
+
+def get_request_coalescer():
+    """Eşzamanlı aramaların aynı sayfa isteklerini birleştiren paylaşılan katman"""
+    global _request_coalescer
+    with _request_coalescer_lock:
+        if _request_coalescer is None:
+            _request_coalescer = RequestCoalescer()
+        return _request_coalescer
+
+
+class SearchPipeline:
+    """Tek bir aramanın tarama, ayrıştırma ve kaydetme adımları
+
+    progress_callback(mesaj), progress_changed(tamamlanan sayfa, tahmini toplam,
+    kalan saniye) ve results_callback(kitaplar) isteğe bağlıdır.
+    """
+    
+    def __init__(self, search_params, db_manager=None, auto_save=False, resume_checkpoint=None,
+                 progress_callback=None, progress_changed=None, results_callback=None,
+                 session_pool=None, parse_pool=None, page_cache=None, rate_limiter=None,
+                 coalescer=None, base_url=BASE_URL):
+        self.search_params = search_params
+        self.db_manager = db_manager
+        self.auto_save = auto_save
+        self.progress_callback = progress_callback
+        self.progress_changed = progress_changed
+        self.results_callback = results_callback
+        self._stop_requested = False
+        
+        # Şehir taramasının kontrol noktası (resume_checkpoint verilirse o tarama sürdürülür)
+        self.checkpoint_id = resume_checkpoint
+        self.resuming = resume_checkpoint is not None
+        self._paged_sahaflar = set()
+        
+        # Kategori taraması (category_sweep) veya istek listesi araması (wishlist) çalışırken
+        self.sweep = None
+        self.wishlist = None
+        
+        # Sahaf kaydı uygulama boyunca bir kez yüklenir
+        self.sahaf_registry = get_sahaf_registry()
+        
+        # Başka bir adrese (ör. yerel taklit sunucu) yapılan taramada nadirkitap oturumu ısıtılmaz
+        if session_pool is None and base_url != BASE_URL:
+            session_pool = SessionPool(size=search_params.get('concurrency', DEFAULT_CONCURRENCY))
+        
+        # Tüm sahaf ve sayfalar için ortak eşzamanlılık sınırı
+        self.engine = CrawlEngine(
+            search_params,
+            concurrency=search_params.get('concurrency', DEFAULT_CONCURRENCY),
+            base_url=base_url,
+            session_pool=session_pool or get_session_pool(),
+            parser=search_params.get('parser'),
+            parse_pool=parse_pool or get_parse_pool(),
+            # Önbellek kapalıyken sayfa_cache.db açılmaz (oluşturulmaz)
+            page_cache=page_cache or (get_page_cache() if search_params.get('cache_max_age') else None),
+            cache_max_age=search_params.get('cache_max_age', 0),
+            rate_limiter=rate_limiter or get_rate_limiter(),
+            coalescer=coalescer or get_request_coalescer(),
+            sahaf_registry=self.sahaf_registry,
+            sync_store=db_manager,
+            progress_callback=self._emit
+        )
+    
+    @property
+    def stopped(self):
+        return self._stop_requested
+    
+    def _emit(self, message):
+        if self.progress_callback:
+            self.progress_callback(message)
+    
+    def _publish(self, books):
+        if self.results_callback:
+            self.results_callback(books)
+    
+    def stop_search(self):
+        """Arama işlemini durdur"""
+        self._stop_requested = True
+        self.engine.request_stop()
+        if self.sweep:
+            self.sweep.request_stop()
+        if self.wishlist:
+            self.wishlist.request_stop()
+        self._emit("Arama durduruluyor...")
+    
+    def get_sahaf_info(self, sahaf_name):
+        """Sahaf adından sahaf bilgilerini al"""
+        return self.sahaf_registry.by_name(sahaf_name)
+        
+    def run(self):
+        """Aramayı çalıştır ve bulunan kitapları döndür (durdurulursa boş liste)
+
+        Hatalar çağırana bırakılır; GUI worker'ı ve komut satırı kendi biçiminde raporlar.
+        """
+        self._emit("Arama başlatılıyor...")
+        
+        if self._stop_requested:
+            self._emit("Arama durduruldu.")
+            self._publish([])
+            return []
+        
+        # Isıtılmış oturumları hazırla (Cloudflare çözümü arama başında bir kez yapılır)
+        self.engine.session_pool.warm(self.engine.concurrency)
+        if self.engine.parse_pool:
+            self.engine.parse_pool.warm()
+        
+        # Şehir seçilmişse o şehirdeki sahaflar için arama yap
+        selected_city = self.search_params.get('selected_city')
+        sweep = bool(self.search_params.get('category_sweep'))
+        wishlist = bool(self.search_params.get('wishlist'))
+        if wishlist:
+            all_books = self.search_wishlist()
+        elif selected_city and selected_city != "Tüm Şehirler":
+            all_books = self.search_by_city()
+        elif sweep:
+            all_books = self.search_categories()
+        else:
+            all_books = self.search_general()
+        
+        if self._stop_requested:
+            self._emit("Arama durduruldu.")
+            self._publish([])
+            return []
+        
+        if self.engine.incremental:
+            self.save_sync_state(len(all_books))
+        
+        if self.engine.skip_unchanged:
+            self._emit(
+                f"Değişmeyen {len(self.engine.skipped)} sahaf veritabanından getirildi, "
+                f"{len(self.engine.recrawled)} sahaf yeniden tarandı"
+            )
+            # Parmak izi yalnızca kitaplar kaydediliyorsa saklanır (atlanan sahaf veritabanından okunur)
+            if self.auto_save and self.engine.fingerprints:
+                self.db_manager.set_fingerprints(self.engine.query_key, self.engine.fingerprints)
+        
+        # Tüm denemelere rağmen tamamlanamayan sahafları listele
+        if self.engine.incomplete:
+            details = ", ".join(
+                f"{name} (sayfa {page}'den itibaren: {reason})"
+                for name, page, reason in self.engine.incomplete
+            )
+            self._emit(f"⚠️ Eksik kalan {len(self.engine.incomplete)} sahaf: {details}")
+        
+        stats = self.engine.session_pool.stats()
+        self._emit(
+            f"Oturum havuzu: {stats['hits']} isabet, {stats['misses']} ıskalama, "
+            f"{stats['recycled']} yenilenen oturum"
+        )
+        if self.engine.coalescer:
+            coalescer_stats = self.engine.coalescer.stats()
+            self._emit(
+                f"İstek birleştirme (tüm aramalar): {coalescer_stats['deduplicated']}/{coalescer_stats['requests']} "
+                f"sayfa isteği başka bir aramanın indirmesini paylaştı"
+            )
+        if self.engine.page_cache:
+            cache_stats = self.engine.page_cache.stats()
+            self._emit(
+                f"Önbellek: {cache_stats['hits']} isabet (%{cache_stats['hit_rate'] * 100:.0f}), "
+                f"{cache_stats['bytes_saved'] // 1024} KB indirme tasarrufu"
+            )
+        
+        # Sonuçları yayınla
+        self._publish(all_books)
+        
+        # Otomatik kaydetme aktifse ve şehir bazlı arama, kategori taraması veya istek listesi değilse (çünkü zaten kaydedildi)
+        if self.auto_save and self.db_manager and all_books and not selected_city and not sweep and not wishlist:
+            self._emit(f"Veritabanına {len(all_books)} kitap kaydediliyor...")
+            
+            # RAM dostu parçalı kaydetme
+            batch_size = 50
+            for i in range(0, len(all_books), batch_size):
+                batch = all_books[i:i + batch_size]
+                self.db_manager.save_books_async(batch)
+                
+                # Progress güncelle
+                progress = min(100, int((i + batch_size) / len(all_books) * 100))
+                self._emit(f"Veritabanına kaydediliyor... %{progress}")
+                
+                # RAM'i rahatlatmak için kısa bekle
+                time.sleep(0.05)
+            
+            self._emit(f"Kaydetme tamamlandı. {len(all_books)} kitap veritabanına eklendi.")
+        
+        return all_books
+    
+    def save_sync_state(self, new_count):
+        """Sonuna kadar taranan sahafların senkron zamanını kaydet"""
+        previous = self.db_manager.get_last_sync(self.engine.query_key, "0")
+        for sahaf_id, newest_url in self.engine.synced.items():
+            self.db_manager.set_last_sync(self.engine.query_key, sahaf_id, newest_url)
+        since = f" (önceki genel senkron: {time.strftime('%d.%m.%Y %H:%M', time.localtime(previous))})" if previous else ""
+        self._emit(
+            f"Artımlı arama: {new_count} yeni ilan, {len(self.engine.synced)} kaynak senkronlandı{since}"
+        )
+    
+    def search_by_city(self):
+        """Şehirdeki sahafları asyncio tarama motoruyla eşzamanlı ara"""
+        selected_city = self.search_params['selected_city']
+        self._emit(f"{selected_city} şehrindeki sahaflar aranıyor...")
+        
+        if not len(self.sahaf_registry):
+            self._emit("Sahaflar dosyası bulunamadı!")
+            return []
+        
+        # Seçilen şehirdeki sahafları bul
+        city_sahaflar = self.sahaf_registry.by_city(selected_city)
+        
+        if not city_sahaflar:
+            self._emit(f"{selected_city} şehrinde sahaf bulunamadı!")
+            return []
+        
+        # Kontrol noktası: tamamlanan sahaflar ve sayfalar kitapları kaydedildikçe işaretlenir
+        start_pages = {}
+        restored_books = []
+        if self.resuming:
+            done, start_pages, urls = self.db_manager.load_checkpoint(self.checkpoint_id)
+            restored_books = self.db_manager.books_by_urls(urls)
+            city_sahaflar = [sahaf for sahaf in city_sahaflar
+                             if extract_sahaf_id(sahaf.get('seller_url')) not in done]
+            self._emit(
+                f"Kaldığı yerden devam: {len(done)} sahaf tamamlanmış, "
+                f"{len(restored_books)} kitap veritabanından yüklendi."
+            )
+        elif self.auto_save and self.db_manager:
+            self.checkpoint_id = self.db_manager.create_checkpoint(self.engine.query_key, self.search_params)
+        if self.checkpoint_id is not None:
+            self.engine.page_callback = self.on_page_done
+        
+        # Büyük sahaflar önce başlatılır, ilerleme sayfa bazında raporlanır
+        plan = CrawlPlan(city_sahaflar, self.search_params, on_progress=self.progress_changed)
+        self._emit(
+            f"{selected_city} şehrinde {len(city_sahaflar)} sahaf taranacak, "
+            f"tahmini {plan.total_pages} sayfa (eşzamanlı istek: {self.engine.concurrency})."
+        )
+        
+        all_books = restored_books + self.engine.run(
+            self.engine.crawl_city(city_sahaflar, self.on_sahaf_done, plan=plan, start_pages=start_pages)
+        )
+        
+        if self.checkpoint_id is not None:
+            finished = not self._stop_requested and not self.engine.incomplete
+            self.db_manager.finish_checkpoint(self.checkpoint_id, 'done' if finished else 'stopped')
+        
+        if self._stop_requested:
+            self._emit("Arama durduruldu. Kaldığı yerden devam ettirilebilir.")
+            return all_books
+        
+        self._emit(f"Tüm sahaflar tarandı. Toplam {len(all_books)} kitap bulundu.")
+        return all_books
+    
+    def on_page_done(self, sahaf_id, page, page_books):
+        """Sayfa kitaplarını kaydet, kaydedildikten sonra sayfayı tamamlandı işaretle"""
+        self._paged_sahaflar.add(sahaf_id)
+        self.db_manager.checkpoint_page_async(self.checkpoint_id, sahaf_id, page, page_books)
+    
+    def on_sahaf_done(self, completed, total, sahaf, sahaf_books, total_books):
+        """Bir sahafın taraması bittiğinde ilerlemeyi bildir ve kaydet"""
+        self._emit(
+            f"Sahaf {completed}/{total}: {sahaf['name']} - "
+            f"{len(sahaf_books)} kitap bulundu (Toplam: {total_books})"
+        )
+        
+        sahaf_id = extract_sahaf_id(sahaf.get('seller_url'))
+        
+        # Otomatik kaydetme aktifse kitapları toplu kaydet (sayfa sayfa kaydedilmediyse)
+        if self.auto_save and self.db_manager and sahaf_books and sahaf_id not in self._paged_sahaflar:
+            # save_books_async listeyi kendi batch boyutunda parçalar
+            self.db_manager.save_books_async(sahaf_books)
+        
+        # Park edilen, eksik kalan veya durdurulan sahaf devam ederken tekrar taranır
+        if (self.checkpoint_id is not None and not self._stop_requested
+                and sahaf_id not in self.engine.parked and not self.engine.has_incomplete(sahaf.get('name', ''))):
+            self.db_manager.checkpoint_sahaf_async(self.checkpoint_id, sahaf_id, sahaf_books)
+        
+        if self.auto_save and self.db_manager and sahaf_books:
+            # Her 5 sahafta bir bellek temizliği
+            if completed % 5 == 0:
+                self.db_manager.cleanup_memory()
+    
+    def search_categories(self):
+        """kategoriler.json'daki alt kategorileri (seçili ana kategorinin alt ağacını) paralel tara"""
+        targets = category_targets(
+            ana=self.search_params.get('kategori2') or None,
+            alt=self.search_params.get('kategori') or None
+        )
+        if not targets:
+            self._emit("Taranacak kategori bulunamadı!")
+            return []
+        
+        self.sweep = CategorySweep(
+            self.search_params, targets,
+            db_manager=self.db_manager,
+            auto_save=self.auto_save,
+            concurrency=self.engine.concurrency,
+            parallel_categories=self.search_params.get('parallel_categories', DEFAULT_PARALLEL_CATEGORIES),
+            session_pool=self.engine.session_pool,
+            parse_pool=self.engine.parse_pool,
+            page_cache=self.engine.page_cache,
+            rate_limiter=self.engine.rate_limiter,
+            coalescer=self.engine.coalescer,
+            sahaf_registry=self.sahaf_registry,
+            base_url=self.engine.base_url,
+            sweep_id=self.search_params.get('sweep_id'),
+            progress_callback=self._emit,
+            category_callback=lambda done, total, target, stats: self._report_progress(done, total)
+        )
+        if self._stop_requested:
+            return []
+        all_books = self.sweep.run()
+        # Motorun eksik listesi arama sonunda raporlanır
+        self.engine.incomplete.extend(self.sweep.incomplete)
+        self.engine.request_count += self.sweep.request_count
+        
+        if not self._stop_requested:
+            self._emit(f"{len(targets)} kategori tarandı. Toplam {len(all_books)} tekil ilan bulundu.")
+        return all_books
+    
+    def search_wishlist(self):
+        """İstek listesindeki kitapları birleştirilmiş sorgularla toplu ara, en ucuz teklifleri özetle"""
+        self.wishlist = WishlistSearch(
+            self.search_params['wishlist'],
+            search_params={key: value for key, value in self.search_params.items() if key != 'wishlist'},
+            db_manager=self.db_manager,
+            auto_save=self.auto_save,
+            wishlist_name=self.search_params.get('wishlist_name', 'istek_listesi'),
+            concurrency=self.engine.concurrency,
+            parallel_queries=self.search_params.get('parallel_queries', DEFAULT_PARALLEL_QUERIES),
+            max_pages=self.search_params.get('wishlist_max_pages', DEFAULT_MAX_PAGES),
+            session_pool=self.engine.session_pool,
+            parse_pool=self.engine.parse_pool,
+            page_cache=self.engine.page_cache,
+            rate_limiter=self.engine.rate_limiter,
+            coalescer=self.engine.coalescer,
+            sahaf_registry=self.sahaf_registry,
+            base_url=self.engine.base_url,
+            progress_callback=self._emit,
+            query_callback=self._report_progress
+        )
+        if self._stop_requested:
+            return []
+        all_books = self.wishlist.run()
+        self.engine.incomplete.extend(self.wishlist.incomplete)
+        self.engine.request_count += self.wishlist.request_count
+        
+        if not self._stop_requested:
+            found = [item for item in self.wishlist.summary if item['matches']]
+            self._emit(
+                f"İstek listesi tamamlandı: {len(found)}/{len(self.wishlist.summary)} kalem bulundu, "
+                f"{len(all_books)} tekil ilan"
+            )
+            for item in self.wishlist.summary:
+                if item['cheapest_text']:
+                    self._emit(f"  {item_label(item)}: en ucuz {item['cheapest_text']} - {item['cheapest_sahaf']} "
+                               f"({item['matches']} ilan)")
+                else:
+                    self._emit(f"  {item_label(item)}: bulunamadı")
+        return all_books
+    
+    def _report_progress(self, done, total):
+        if self.progress_changed:
+            self.progress_changed(done, total, -1.0)
+    
+    def search_general(self):
+        """Genel arama yap (şehir seçilmemişse)"""
+        kitap_adi_raw = self.search_params['kitap_adi']
+        yazar_raw = self.search_params['yazar']
+        kitap_adi_converted = to_ascii(kitap_adi_raw)
+        yazar_converted = to_ascii(yazar_raw)
+        
+        # Debug bilgisi göster
+        if kitap_adi_raw != kitap_adi_converted:
+            self._emit(f"Kitap adı dönüştürüldü: '{kitap_adi_raw}' → '{kitap_adi_converted}'")
+        if yazar_raw != yazar_converted:
+            self._emit(f"Yazar adı dönüştürüldü: '{yazar_raw}' → '{yazar_converted}'")
+        
+        def on_page_done(page, page_books, total_books):
+            self._emit(f"Sayfa {page} tamamlandı - {len(page_books)} kitap bulundu (Toplam: {total_books})")
+        
+        partition_by = self.search_params.get('partition_by')
+        if self.engine.incremental:
+            self._emit("Artımlı arama: yalnızca son senkrondan beri eklenen ilanlar taranıyor...")
+            all_books = self.engine.run(self.engine.crawl_general_incremental(on_page_done=on_page_done))
+        elif partition_by:
+            self._emit(f"Arama {'fiyat' if partition_by == 'fiyat' else 'yıl'} aralıklarına bölünerek taranıyor...")
+            all_books = self.engine.run(self.engine.crawl_partitioned(partition_by, on_page_done=on_page_done))
+        else:
+            all_books = self.engine.run(self.engine.crawl_general(on_page_done=on_page_done))
+        if self._stop_requested:
+            self._emit("Arama durduruldu.")
+        return all_books
@@ -4,20 +4,26 @@ Kitap arama sekmesi
 """
 
 import json
+import os
 import webbrowser
-import locale
 import logging
 import traceback
 import re
+import time
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QComboBox, QPushButton,
-    QScrollArea, QFrame, QProgressBar, QGroupBox, QCheckBox, QMessageBox
+    QScrollArea, QFrame, QProgressBar, QGroupBox, QCheckBox, QMessageBox, QSpinBox, QFileDialog
 )
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QFont
 from PyQt6.QtWidgets import QApplication
 
 from workers import BookSearchWorker
+from crawler import DEFAULT_CONCURRENCY
+from database import RELEVANCE_SORT
+from sahaf_registry import get_sahaf_registry
+from turkish_text import fold, sort_key
+from wishlist import load_wishlist
 from widgets import ClickableLabel
 
 # Loglama ayarları
@@ -40,6 +46,7 @@ class BookSearchTab(QWidget):
         self.sahaflar = []
         self.cities = []
         self.search_worker = None
+        self.progress_unit = "sayfa"
         self.current_results = []
         
         self.init_data()
@@ -51,19 +58,11 @@ class BookSearchTab(QWidget):
             with open("kategoriler.json", "r", encoding="utf-8") as f:
                 self.kategoriler = json.load(f)
             
-            with open("sahaflar.json", "r", encoding="utf-8") as f:
-                self.sahaflar = json.load(f)
+            registry = get_sahaf_registry()
+            self.sahaflar = registry.sahaflar
                 
-            # Şehirleri çıkar ve Türkçe sıralama ile sırala
-            unique_cities = list(set([sahaf.get('city', '') for sahaf in self.sahaflar if sahaf.get('city')]))
-            # Türkçe karakterleri dikkate alarak sıralama
-            try:
-                locale.setlocale(locale.LC_COLLATE, 'Turkish_Turkey.1254')
-                self.cities = sorted(unique_cities, key=locale.strxfrm)
-            except:
-                # Locale ayarlanamadıysa manuel Türkçe sıralama
-                turkish_sort_key = lambda s: s.replace('ç','c1').replace('ğ','g1').replace('ı','i1').replace('ö','o1').replace('ş','s1').replace('ü','u1').replace('Ç','C1').replace('Ğ','G1').replace('İ','I1').replace('Ö','O1').replace('Ş','S1').replace('Ü','U1')
-                self.cities = sorted(unique_cities, key=turkish_sort_key)
+            # Şehirleri çıkar ve Türk alfabesi sırasıyla sırala (işletim sistemi yereline bağlı değil)
+            self.cities = sorted(registry.cities(), key=sort_key)
                 
         except Exception as e:
             print(f"Veri yükleme hatası: {e}")
@@ -161,7 +160,9 @@ class BookSearchTab(QWidget):
         self.arama_yontemi_combo = QComboBox()
         self.arama_yontemi_combo.addItem("🌐 Canlı Arama (Websitelerinden)", "canli")
         self.arama_yontemi_combo.addItem("💾 Yerel Arama (Veritabanından)", "yerel")
-        self.arama_yontemi_combo.setToolTip("Canlı Arama: Websitelerinden güncel veri çeker (yavaş)\nYerel Arama: Mevcut veritabanından arar (hızlı)")
+        self.arama_yontemi_combo.addItem("🔤 Bulanık Yerel Arama (Yazım Hatalarına Toleranslı)", "bulanik")
+        self.arama_yontemi_combo.setToolTip("Canlı Arama: Websitelerinden güncel veri çeker (yavaş)\nYerel Arama: Mevcut veritabanından arar (hızlı)\n"
+                                            "Bulanık Yerel Arama: Farklı yazımları da bulur (Nutuk, NUTUK 1. cilt, Nütuk), benzerliğe göre sıralar")
         self.arama_yontemi_combo.currentTextChanged.connect(self.on_arama_yontemi_changed)
         arama_yontemi_layout.addWidget(self.arama_yontemi_combo)
         arama_yontemi_group.setLayout(arama_yontemi_layout)
@@ -179,6 +180,61 @@ class BookSearchTab(QWidget):
         siralama_group.setLayout(siralama_layout)
         layout.addWidget(siralama_group)
         
+        # Tarama ayarları
+        tarama_group = QGroupBox("Tarama Ayarları")
+        tarama_layout = QVBoxLayout()
+        
+        concurrency_layout = QHBoxLayout()
+        concurrency_layout.addWidget(QLabel("Eşzamanlı istek:"))
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, 64)
+        self.concurrency_spin.setValue(DEFAULT_CONCURRENCY)
+        self.concurrency_spin.setToolTip("Tüm sahaf ve sayfalar için aynı anda yapılabilecek en fazla istek sayısı")
+        concurrency_layout.addWidget(self.concurrency_spin)
+        tarama_layout.addLayout(concurrency_layout)
+        
+        cache_layout = QHBoxLayout()
+        cache_layout.addWidget(QLabel("Önbellek (en fazla yaş):"))
+        self.cache_age_combo = QComboBox()
+        self.cache_age_combo.addItem("Kapalı", 0)
+        self.cache_age_combo.addItem("15 dakika", 15 * 60)
+        self.cache_age_combo.addItem("1 saat", 60 * 60)
+        self.cache_age_combo.addItem("1 gün", 24 * 60 * 60)
+        self.cache_age_combo.setCurrentIndex(0)  # Varsayılan kapalı: güncel fiyat ve stok için sayfalar her aramada indirilir
+        self.cache_age_combo.setToolTip("Bu süreden yeni sonuç sayfaları tekrar indirilmez, diskten okunur")
+        cache_layout.addWidget(self.cache_age_combo)
+        tarama_layout.addLayout(cache_layout)
+        
+        partition_layout = QHBoxLayout()
+        partition_layout.addWidget(QLabel("Tüm Şehirler bölümleme:"))
+        self.partition_combo = QComboBox()
+        self.partition_combo.addItem("Yok (sıralı)", "")
+        self.partition_combo.addItem("Fiyat aralıkları", "fiyat")
+        self.partition_combo.addItem("Baskı yılı aralıkları", "tarih")
+        self.partition_combo.setCurrentIndex(1)
+        self.partition_combo.setToolTip("Şehir seçilmediğinde arama fiyat veya yıl aralıklarına bölünüp eşzamanlı taranır.\n"
+                                        "Yıl aralıkları baskı yılı girilmemiş ilanları kapsamaz.")
+        partition_layout.addWidget(self.partition_combo)
+        tarama_layout.addLayout(partition_layout)
+        
+        self.incremental_checkbox = QCheckBox("Sadece yeni ilanlar (artımlı)")
+        self.incremental_checkbox.setToolTip("Sonuçlar en yeniden eskiye taranır, veritabanında zaten bulunan ilanlara gelince durulur.\n"
+                                             "Otomatik kaydet açık olmalıdır; bulunan yeni ilanlar kaydedilir.")
+        tarama_layout.addWidget(self.incremental_checkbox)
+        
+        self.skip_unchanged_checkbox = QCheckBox("Değişmeyen sahafları atla")
+        self.skip_unchanged_checkbox.setToolTip("Her sahafın en yeni ilanlar sayfası kayıtlı parmak iziyle (ilan sayısı + en yeni ilanlar) karşılaştırılır.\n"
+                                                "Değişmeyen sahafların kitapları veritabanından gelir. Otomatik kaydet açık olmalıdır.")
+        tarama_layout.addWidget(self.skip_unchanged_checkbox)
+        
+        self.category_sweep_checkbox = QCheckBox("Tüm alt kategorileri tara")
+        self.category_sweep_checkbox.setToolTip("Şehir seçilmediğinde kategoriler.json'daki her alt kategori (ana kategori seçiliyse yalnızca onun alt kategorileri)\n"
+                                                "ayrı ayrı ve paralel taranır. Birden çok kategoride görünen ilanlar bir kez kaydedilir.")
+        tarama_layout.addWidget(self.category_sweep_checkbox)
+        
+        tarama_group.setLayout(tarama_layout)
+        layout.addWidget(tarama_group)
+        
         # Arama butonları
         buttons_layout = QHBoxLayout()
         
@@ -211,6 +267,22 @@ class BookSearchTab(QWidget):
         
         layout.addLayout(buttons_layout)
         
+        # Yarıda kalan şehir taramasını kaldığı yerden sürdür
+        self.resume_button = QPushButton("⏯️ KALDIĞI YERDEN DEVAM ET")
+        self.resume_button.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        self.resume_button.clicked.connect(self.resume_search)
+        layout.addWidget(self.resume_button)
+        self.refresh_resume_button()
+        
+        # CSV/JSON istek listesindeki tüm kitapları toplu ara
+        self.wishlist_button = QPushButton("📋 İSTEK LİSTESİNDEN ARA")
+        self.wishlist_button.setFont(QFont("Arial", 10, QFont.Weight.Bold))
+        self.wishlist_button.setToolTip("Kitap adı/yazar sütunlu CSV veya JSON listesi seçin.\n"
+                                        "Aynı kitaba giden kalemler tek sorguda aranır, sonuçlar kaleme bağlanarak kaydedilir\n"
+                                        "ve her kalem için en ucuz teklif durum satırında listelenir.")
+        self.wishlist_button.clicked.connect(self.search_wishlist)
+        layout.addWidget(self.wishlist_button)
+        
         # Kaydetme butonu
         self.save_button = QPushButton("💾 SONUÇLARI KAYDET")
         self.save_button.setFont(QFont("Arial", 11, QFont.Weight.Bold))
@@ -238,6 +310,7 @@ class BookSearchTab(QWidget):
         # Kuyruk durumunu güncelleme timer'ı
         self.queue_timer = QTimer()
         self.queue_timer.timeout.connect(self.update_queue_status)
+        self.queue_timer.timeout.connect(self.update_rate_status)
         self.queue_timer.start(2000)  # Her 2 saniyede güncelle (RAM tasarrufu)
         
         # Progress bar
@@ -250,6 +323,12 @@ class BookSearchTab(QWidget):
         self.status_label.setWordWrap(True)
         layout.addWidget(self.status_label)
         
+        # Anlık tarama hızı (uyarlanabilir hız sınırlayıcıdan)
+        self.rate_label = QLabel("")
+        self.rate_label.setFont(QFont("Arial", 9))
+        self.rate_label.setStyleSheet("color: #888;")
+        layout.addWidget(self.rate_label)
+        
         layout.addStretch()
         panel.setLayout(layout)
         
@@ -264,12 +343,13 @@ class BookSearchTab(QWidget):
     
     def filter_cities(self):
         """Şehirleri arama kriterine göre filtrele"""
-        search_text = self.sehir_search.text().lower()
+        # "izmir", "IZMIR" ve "İzmir" aynı şehri bulur
+        search_text = fold(self.sehir_search.text())
         self.sehir_combo.clear()
         self.sehir_combo.addItem("Tüm Şehirler", "")
         
         for city in self.cities:
-            if search_text in city.lower():
+            if search_text in fold(city):
                 self.sehir_combo.addItem(city, city)
     
     def on_ana_kategori_changed(self):
@@ -299,25 +379,33 @@ class BookSearchTab(QWidget):
         self.alt_kategori_combo.setEnabled(True)
         
         # Arama butonunun metnini güncelle
-        if arama_yontemi == "yerel":
-            self.search_button.setText("🔍 YEREL ARAMA")
+        # İlgi sıralaması yalnızca yerel aramada var (tam metin indeksinin bm25 puanı)
+        relevance_index = self.siralama_combo.findData(RELEVANCE_SORT)
+        # Bulanık arama sonuçları her zaman benzerliğe göre sıralıdır
+        self.siralama_combo.setEnabled(arama_yontemi != "bulanik")
+        if arama_yontemi in ("yerel", "bulanik"):
+            self.search_button.setText("🔍 BULANIK ARAMA" if arama_yontemi == "bulanik" else "🔍 YEREL ARAMA")
             self.search_button.setToolTip("Mevcut veritabanından hızlı arama yapar")
+            if relevance_index < 0:
+                self.siralama_combo.addItem("İlgi (kitap adı/yazar eşleşmesi)", RELEVANCE_SORT)
         else:
             self.search_button.setText("🔍 CANLI ARAMA")
             self.search_button.setToolTip("Websitelerinden güncel veri çekerek arama yapar")
+            if relevance_index >= 0:
+                self.siralama_combo.removeItem(relevance_index)
     
     def search_books(self):
         """Kitap arama işlemini başlat"""
         # Arama yöntemi kontrolü
         arama_yontemi = self.arama_yontemi_combo.currentData()
         
-        if arama_yontemi == "yerel":
-            self.search_local_database()
+        if arama_yontemi in ("yerel", "bulanik"):
+            self.search_local_database(fuzzy=arama_yontemi == "bulanik")
         else:
             self.search_online()
     
-    def search_local_database(self):
-        """Yerel veritabanından arama yap"""
+    def search_local_database(self, fuzzy=False):
+        """Yerel veritabanından arama yap (fuzzy=True: trigram indeksiyle bulanık arama)"""
         logger.info("Yerel veritabanı araması başlatılıyor...")
         
         # Arama parametrelerini topla
@@ -334,6 +422,9 @@ class BookSearchTab(QWidget):
             logger.warning("Hiç arama kriteri girilmedi")
             QMessageBox.warning(self, "Uyarı", "Lütfen en az bir arama kriteri girin!")
             return
+        if fuzzy and not yazar and not kitap_adi:
+            QMessageBox.warning(self, "Uyarı", "Bulanık arama için kitap adı veya yazar girin!")
+            return
         
         # UI'yi güncelle
         self.search_button.setEnabled(False)
@@ -348,77 +439,28 @@ class BookSearchTab(QWidget):
             self.progress_bar.setValue(20)
             logger.info("Veritabanı sorgusu hazırlanıyor...")
             
-            # Önce toplam sayıyı al (sayfalama için)
-            count_query = "SELECT COUNT(*) FROM kitaplar WHERE 1=1"
-            query = "SELECT * FROM kitaplar WHERE 1=1"
-            params = []
-            
-            if yazar:
-                filter_clause = " AND yazar LIKE ?"
-                query += filter_clause
-                count_query += filter_clause
-                params.append(f"%{yazar}%")
-                logger.debug(f"Yazar filtresi eklendi: {yazar}")
-            
-            if kitap_adi:
-                filter_clause = " AND baslik LIKE ?"
-                query += filter_clause
-                count_query += filter_clause
-                params.append(f"%{kitap_adi}%")
-                logger.debug(f"Kitap adı filtresi eklendi: {kitap_adi}")
-            
-            # Kategori filtrelemesi
-            if alt_kategori_adi:
-                filter_clause = " AND alt_kategori LIKE ?"
-                query += filter_clause
-                count_query += filter_clause
-                params.append(f"%{alt_kategori_adi}%")
-                logger.debug(f"Alt kategori filtresi eklendi: {alt_kategori_adi}")
-            elif ana_kategori_adi:
-                filter_clause = " AND kategori LIKE ?"
-                query += filter_clause
-                count_query += filter_clause
-                params.append(f"%{ana_kategori_adi}%")
-                logger.debug(f"Ana kategori filtresi eklendi: {ana_kategori_adi}")
-            
-            if secili_sehir and secili_sehir != "Tüm Şehirler":
-                filter_clause = " AND sehir = ?"
-                query += filter_clause
-                count_query += filter_clause
-                params.append(secili_sehir)
-                logger.debug(f"Şehir filtresi eklendi: {secili_sehir}")
-            
-            # Sıralama ekle
+            # Kitap adı ve yazar FTS5 indeksiyle, kategori ve şehir eşitlikle aranır
+            # (kategori adları listeden seçildiği için tam eşleşme, indeksten okunur)
             siralama = self.siralama_combo.currentData()
-            if siralama == "fiyatartan.":
-                query += " ORDER BY CAST(fiyat AS REAL) ASC"
-            elif siralama == "fiyatazalan.":
-                query += " ORDER BY CAST(fiyat AS REAL) DESC"
-            elif siralama == "tarihyeni.":
-                query += " ORDER BY tarih DESC"
-            elif siralama == "tariheski.":
-                query += " ORDER BY tarih ASC"
-            
-            # Sayfalama ekle - maksimum 1000 sonuç
-            query += " LIMIT 1000"
-            
-            logger.debug(f"Count sorgu: {count_query}")
-            logger.debug(f"Final sorgu: {query}")
-            logger.debug(f"Parametreler: {params}")
+            logger.debug(f"Yerel arama: kitap={kitap_adi!r}, yazar={yazar!r}, kategori={ana_kategori_adi!r}/"
+                         f"{alt_kategori_adi!r}, şehir={secili_sehir!r}, sıralama={siralama}")
             
             self.progress_bar.setValue(40)
             
-            # Önce toplam sayıyı al
-            total_count = self.db_manager.execute_query(count_query, params)
-            total_results = total_count[0][0] if total_count and len(total_count) > 0 else 0
-            logger.info(f"Toplam {total_results} sonuç mevcut")
-            
-            self.progress_bar.setValue(60)
-            
-            # Ana sorguyu çalıştır
             logger.info("Veritabanı sorgusu çalıştırılıyor...")
-            results = self.db_manager.execute_query(query, params)
-            logger.info(f"Sorgu tamamlandı. {len(results)} sonuç alındı.")
+            filters = {
+                'kitap_adi': kitap_adi,
+                'yazar': yazar,
+                'kategori': "" if alt_kategori_adi else ana_kategori_adi,
+                'alt_kategori': alt_kategori_adi,
+                'sehir': secili_sehir if secili_sehir != "Tüm Şehirler" else "",
+            }
+            if fuzzy:
+                # Trigram indeksinden gelen adaylar benzerlik puanına göre sıralı döner
+                total_results, results = self.db_manager.fuzzy_search_books(**filters, limit=1000)
+            else:
+                total_results, results = self.db_manager.search_books(**filters, siralama=siralama, limit=1000)
+            logger.info(f"Sorgu tamamlandı. Toplam {total_results} sonuç, {len(results)} sonuç alındı.")
             self.progress_bar.setValue(80)
             
             # Sonuçları formatla - DOĞRU MAPPING
@@ -457,7 +499,7 @@ class BookSearchTab(QWidget):
             if total_results > 1000:
                 status_msg = f"✅ {len(formatted_results)} sonuç gösteriliyor (Toplam: {total_results} - İlk 1000 sonuç)"
             else:
-                status_msg = f"✅ {len(formatted_results)} sonuç bulundu (Yerel Arama)"
+                status_msg = f"✅ {len(formatted_results)} sonuç bulundu ({'Bulanık Arama' if fuzzy else 'Yerel Arama'})"
             
             self.update_status(status_msg)
             logger.info(f"Yerel arama tamamlandı. {len(formatted_results)} sonuç gösteriliyor.")
@@ -482,6 +524,11 @@ class BookSearchTab(QWidget):
         if self.search_worker and self.search_worker.isRunning():
             return
         
+        # Artımlı arama veritabanındaki ilanlara gelince durur; yeni ilanlar kaydedilmezse sonraki arama onları tekrar bulur
+        if self.incremental_checkbox.isChecked() and not self.auto_save_checkbox.isChecked():
+            QMessageBox.warning(self, "Uyarı", "Artımlı arama için Otomatik Kaydet'i açın!")
+            return
+        
         # Arama parametrelerini topla
         ana_kategori_id = self.ana_kategori_combo.currentData()
         alt_kategori_id = self.alt_kategori_combo.currentData()
@@ -500,25 +547,98 @@ class BookSearchTab(QWidget):
             'alt_kategori_adi': alt_kategori_adi,
             'selected_city': self.sehir_combo.currentData(),
             'secili_sehir': secili_sehir,
-            'siralama': self.siralama_combo.currentData()
+            'siralama': self.siralama_combo.currentData(),
+            'concurrency': self.concurrency_spin.value(),
+            'cache_max_age': self.cache_age_combo.currentData(),
+            'partition_by': self.partition_combo.currentData(),
+            'incremental': self.incremental_checkbox.isChecked(),
+            'skip_unchanged': self.skip_unchanged_checkbox.isChecked(),
+            'category_sweep': self.category_sweep_checkbox.isChecked()
         }
         
+        self.start_worker(search_params, self.auto_save_checkbox.isChecked())
+    
+    def search_wishlist(self):
+        """İstek listesi dosyasını seç ve toplu aramayı başlat"""
+        if self.search_worker and self.search_worker.isRunning():
+            return
+        path, _ = QFileDialog.getOpenFileName(self, "İstek Listesi Seç", "", "İstek listesi (*.csv *.json)")
+        if not path:
+            return
+        try:
+            items = load_wishlist(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Hata", f"İstek listesi okunamadı: {e}")
+            return
+        if not items:
+            QMessageBox.warning(self, "Uyarı", "İstek listesinde kitap adı veya yazar bulunamadı!")
+            return
+        
+        search_params = {
+            'wishlist': items,
+            'wishlist_name': os.path.splitext(os.path.basename(path))[0],
+            'siralama': 'fiyatartan.',  # En ucuz teklif ilk sayfada olsun
+            'concurrency': self.concurrency_spin.value(),
+            'cache_max_age': self.cache_age_combo.currentData()
+        }
+        # Sonuçlar kalemlere bağlanarak kaydedilir
+        self.start_worker(search_params, True)
+    
+    def resume_search(self):
+        """Yarıda kalan son şehir taramasını kaldığı yerden sürdür"""
+        if self.search_worker and self.search_worker.isRunning():
+            return
+        checkpoint = self.db_manager.get_resumable_checkpoint()
+        if not checkpoint:
+            self.refresh_resume_button()
+            return
+        checkpoint_id, search_params, _ = checkpoint
+        # Kontrol noktaları kaydedilen kitaplara dayandığı için devam eden tarama da kaydeder
+        self.start_worker(search_params, True, resume_checkpoint=checkpoint_id)
+    
+    def refresh_resume_button(self):
+        """Devam ettirilebilir tarama varsa butonu etkinleştir"""
+        checkpoint = self.db_manager.get_resumable_checkpoint() if hasattr(self.db_manager, 'get_resumable_checkpoint') else None
+        running = bool(self.search_worker and self.search_worker.isRunning())
+        self.resume_button.setEnabled(bool(checkpoint) and not running)
+        if checkpoint:
+            _, params, updated_at = checkpoint
+            self.resume_button.setToolTip(
+                f"{params.get('secili_sehir') or 'Tüm Şehirler'} taraması, "
+                f"son ilerleme: {time.strftime('%d.%m.%Y %H:%M', time.localtime(updated_at))}"
+            )
+        else:
+            self.resume_button.setToolTip("Yarıda kalan tarama yok")
+    
+    def start_worker(self, search_params, auto_save, resume_checkpoint=None):
+        """Arama worker'ını başlat ve UI'yi arama durumuna al"""
         # UI'yi güncelle
         self.search_button.setEnabled(False)
+        self.resume_button.setEnabled(False)
+        self.wishlist_button.setEnabled(False)
         self.stop_button.setEnabled(True)
         self.save_button.setEnabled(False)
         self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # Indeterminate progress
+        self.progress_bar.setRange(0, 0)  # Plan hazır olana kadar (ve genel aramada) belirsiz
+        self.progress_bar.setFormat("%p%")
+        # Kategori taraması ve istek listesi ilerlemesi sayfa yerine kategori/sorgu sayısıdır
+        if search_params.get('wishlist'):
+            self.progress_unit = "sorgu"
+        elif search_params.get('category_sweep') and not search_params.get('secili_sehir'):
+            self.progress_unit = "kategori"
+        else:
+            self.progress_unit = "sayfa"
         self.clear_results()
         
         # Worker thread başlat (otomatik kaydetme seçeneği ile)
-        auto_save = self.auto_save_checkbox.isChecked()
         self.search_worker = BookSearchWorker(
             search_params, 
-            self.db_manager if auto_save else None, 
-            auto_save
+            self.db_manager if auto_save or search_params.get('skip_unchanged') else None, 
+            auto_save,
+            resume_checkpoint=resume_checkpoint
         )
         self.search_worker.progress_updated.connect(self.update_status)
+        self.search_worker.progress_changed.connect(self.update_progress)
         self.search_worker.results_ready.connect(self.display_results)
         self.search_worker.finished.connect(self.search_finished)
         self.search_worker.start()
@@ -541,6 +661,17 @@ class BookSearchTab(QWidget):
             else:
                 self.queue_status_label.setStyleSheet("color: #888;")
     
+    def update_rate_status(self):
+        """Çalışan taramanın anlık istek hızını göster"""
+        if self.search_worker and self.search_worker.isRunning() and self.search_worker.engine.rate_limiter:
+            limiter = self.search_worker.engine.rate_limiter
+            text = f"Hız: {limiter.current_rate:.1f} istek/sn"
+            if limiter.throttle_count:
+                text += f" (sunucu yavaşlattı: {limiter.throttle_count} kez)"
+            self.rate_label.setText(text)
+        else:
+            self.rate_label.setText("")
+    
     def save_results(self):
         """Mevcut sonuçları veritabanına kaydet"""
         if not self.current_results:
@@ -549,6 +680,9 @@ class BookSearchTab(QWidget):
         
         try:
             saved_count = self.db_manager.save_books(self.current_results)
+            if saved_count is None:
+                QMessageBox.critical(self, "Hata", "Kaydetme sırasında veritabanı hatası oluştu.")
+                return
             total_count = len(self.current_results)
             duplicate_count = total_count - saved_count
             
@@ -565,16 +699,31 @@ class BookSearchTab(QWidget):
         """Status labelını güncelle"""
         self.status_label.setText(message)
     
+    def update_progress(self, done_pages, total_pages, eta_seconds):
+        """Şehir taramasında sayfa bazlı ilerleme ve kalan süreyi göster"""
+        if total_pages <= 0:
+            return
+        self.progress_bar.setRange(0, total_pages)
+        self.progress_bar.setValue(done_pages)
+        if eta_seconds < 0:
+            self.progress_bar.setFormat(f"%p% ({done_pages}/{total_pages} {self.progress_unit})")
+        else:
+            minutes, seconds = divmod(int(eta_seconds), 60)
+            self.progress_bar.setFormat(f"%p% ({done_pages}/{total_pages} {self.progress_unit}) - kalan ~{minutes} dk {seconds} sn")
+    
     def search_finished(self):
         """Arama tamamlandığında UI'yi güncelle"""
         self.search_button.setEnabled(True)
+        self.wishlist_button.setEnabled(True)
         self.stop_button.setEnabled(False)
         self.progress_bar.setVisible(False)
+        self.progress_bar.setFormat("%p%")
+        self.refresh_resume_button()
         if self.current_results:
             self.save_button.setEnabled(True)
         
         # Arama durumu kontrol et
-        if hasattr(self.search_worker, '_stop_requested') and self.search_worker._stop_requested:
+        if self.search_worker and self.search_worker.pipeline.stopped:
             result_count = len(self.current_results) if self.current_results else 0
             self.update_status(f"Arama durduruldu. {result_count} kitap bulundu.")
         else:
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Paylaşımlı HTTP oturum havuzu
+"""
+
+import threading
+import urllib.parse
+import concurrent.futures
+from collections import deque
+from contextlib import contextmanager
+
+import cloudscraper
+from requests.adapters import HTTPAdapter
+
+
+class SessionPool:
+    """Isıtılmış cloudscraper oturumlarını sahaf ve aramalar arasında paylaştırır
+
+    Oturumlar keep-alive bağlantılarını ve Cloudflare çerezlerini korur.
+    Bir oturum max_requests isteğe ulaştığında veya hata aldığında yenilenir.
+    clearance_store verilirse yeni oturumlar kayıtlı Cloudflare çerezleriyle
+    beslenir ve yeni çözülen çerezler depoya yazılır.
+    """
+
+    def __init__(self, size=16, max_requests=500, session_factory=None, warm_url=None,
+                 clearance_store=None, domain="www.nadirkitap.com"):
+        self.size = size
+        self.max_requests = max_requests
+        self.session_factory = session_factory or cloudscraper.create_scraper
+        self.warm_url = warm_url
+        self.clearance_store = clearance_store
+        self.domain = urllib.parse.urlparse(warm_url).hostname if warm_url else domain
+        self._idle = deque()
+        self._request_counts = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self.created = 0
+
+    def _create_session(self):
+        session = self.session_factory()
+        # Eşzamanlı istekler için bağlantı havuzunu büyüt
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if self.clearance_store:
+            self.clearance_store.apply(session, self.domain)
+        with self._lock:
+            self.created += 1
+            self._request_counts[id(session)] = 0
+        return session
+
+    def _warm_session(self):
+        session = self._create_session()
+        if self.warm_url:
+            try:
+                session.get(self.warm_url, timeout=10)
+                if self.clearance_store:
+                    self.clearance_store.capture(session, self.domain)
+            except Exception as e:
+                print(f"Oturum ısıtma hatası: {e}")
+        return session
+
+    def warm(self, count=None):
+        """Havuzda en az count adet hazır oturum olmasını sağla"""
+        with self._lock:
+            missing = min(count or self.size, self.size) - len(self._idle)
+        if missing <= 0:
+            return 0
+
+        sessions = []
+        if self.clearance_store and not self.clearance_store.get(self.domain):
+            # Challenge'ı tek oturumla çöz, diğerleri depodaki çerezle başlasın
+            sessions.append(self._warm_session())
+            missing -= 1
+
+        if missing > 0:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=missing) as executor:
+                sessions.extend(executor.map(lambda _: self._warm_session(), range(missing)))
+
+        with self._lock:
+            self._idle.extend(sessions)
+        return len(sessions)
+
+    def acquire(self):
+        """Boşta bir oturum ver, yoksa yenisini oluştur"""
+        with self._lock:
+            if self._idle:
+                self.hits += 1
+                return self._idle.popleft()
+            self.misses += 1
+        return self._create_session()
+
+    def release(self, session, error=False, blocked=False):
+        """Oturumu havuza geri koy; hatalı veya yıpranmış oturumları kapat
+
+        blocked: Cloudflare isteği reddetti, kayıtlı clearance artık geçersiz
+        """
+        if self.clearance_store:
+            if blocked:
+                self.clearance_store.invalidate(self.domain)
+            elif not error:
+                self.clearance_store.capture(session, self.domain)
+        with self._lock:
+            key = id(session)
+            self._request_counts[key] = self._request_counts.get(key, 0) + 1
+            worn_out = self._request_counts[key] >= self.max_requests
+            if not error and not worn_out and len(self._idle) < self.size:
+                self._idle.append(session)
+                return
+            self._request_counts.pop(key, None)
+            if error or worn_out:
+                self.recycled += 1
+        session.close()
+
+    @contextmanager
+    def session(self):
+        """with pool.session() as s: ... kullanımı için"""
+        session = self.acquire()
+        try:
+            yield session
+        except Exception:
+            self.release(session, error=True)
+            raise
+        else:
+            self.release(session)
+
+    def stats(self):
+        """Havuz isabet/ıskalama sayaçları"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'recycled': self.recycled,
+                'created': self.created,
+                'idle': len(self._idle),
+            }
+
+    def close(self):
+        """Boştaki tüm oturumları kapat"""
+        with self._lock:
+            sessions = list(self._idle)
+            self._idle.clear()
+            self._request_counts.clear()
+        for session in sessions:
+            session.close()
@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Testler modülleri proje klasöründen düz import eder (python run.py ile aynı)
+"""
+
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_DIR not in sys.path:
+    sys.path.insert(0, PROJECT_DIR)
+
+# Kaydedilmiş kitapara.php sonuç sayfaları
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sayfalar')
+
+
+def read_page(name):
+    with open(os.path.join(PAGES_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def make_sahaflar(inventory, city="Test"):
+    """mock_server envanteri ({sahaf_id: kitap sayısı}) için sahaflar.json kayıtları"""
+    return [
+        {'name': f"Sahaf {sahaf_id}", 'city': city, 'kitap_sayisi': str(count),
+         'seller_url': f"https://www.nadirkitap.com/sahaf-{sahaf_id}-sahaf{sahaf_id}.html"}
+        for sahaf_id, count in inventory.items()
+    ]
@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""
+Kategori taraması: hedef seçimi, birden çok kategoride listelenen ilanların
+bir kez kaydedilmesi ve yarıda kalan taramanın yalnızca eksik kategorilerle
+sürdürülmesi
+"""
+
+import json
+
+import pytest
+
+import crawler
+from category_sweep import CategorySweep, category_targets
+from database import DatabaseManager
+from mock_server import NadirKitapStandIn
+from resilience import RetryPolicy
+
+
+KATEGORILER = [
+    {'ana_kategori_id': "1", 'ana_kategori_adi': "Edebiyat", 'alt_kategoriler': [
+        {'kategori_id': "11", 'kategori_adi': "Türk Romanı"},
+        {'kategori_id': "12", 'kategori_adi': "Şiir"},
+    ]},
+    {'ana_kategori_id': "2", 'ana_kategori_adi': "Tarih", 'alt_kategoriler': [
+        {'kategori_id': "21", 'kategori_adi': "Osmanlı Tarihi"},
+    ]},
+    {'ana_kategori_id': "3", 'ana_kategori_adi': "Dergi", 'alt_kategoriler': []},
+]
+CATEGORIES = [("1", "11"), ("1", "12"), ("2", "21")]
+INVENTORY = {5000: 110}
+SEARCH_PARAMS = {'kitap_adi': '', 'yazar': ''}
+
+
+class CategoryFailingStandIn(NadirKitapStandIn):
+    """Şiir kategorisi hep 503 döner"""
+
+    def should_fail(self, query):
+        return query.get('kategori') == '12'
+
+
+@pytest.fixture
+def targets(tmp_path):
+    path = tmp_path / "kategoriler.json"
+    path.write_text(json.dumps(KATEGORILER, ensure_ascii=False), encoding='utf-8')
+    return category_targets(str(path), ana="1") + category_targets(str(path), ana="Tarih")
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "kitaplar.db"))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(crawler, 'RetryPolicy', lambda: RetryPolicy(max_attempts=2, base_delay=0))
+
+
+def test_targets_select_subtree_by_id_or_name(tmp_path, targets):
+    assert [(t['kategori2'], t['kategori']) for t in targets] == CATEGORIES
+    path = str(tmp_path / "kategoriler.json")
+    assert [t['alt_kategori_adi'] for t in category_targets(path, ana="edebiyat", alt="şiir")] == ["Şiir"]
+    # Alt kategorisi olmayan ana kategori kendisi hedeftir
+    assert category_targets(path, ana="3") == [
+        {'kategori2': "3", 'kategori': "", 'kategori_adi': "Dergi", 'alt_kategori_adi': ""}]
+    assert len(category_targets(path)) == 4
+
+
+def sweep(db_manager, stand_in, targets, sweep_id=None):
+    category_sweep = CategorySweep(SEARCH_PARAMS, targets, db_manager=db_manager, auto_save=True,
+                                   base_url=stand_in.base_url, sweep_id=sweep_id)
+    books = category_sweep.run()
+    db_manager.wait_for_save_completion()
+    return category_sweep, books
+
+
+def test_books_in_several_categories_are_saved_once(db_manager, targets):
+    with NadirKitapStandIn(INVENTORY, latency=0, categories=CATEGORIES) as stand_in:
+        category_sweep, books = sweep(db_manager, stand_in, targets)
+    stats = category_sweep.stats.values()
+    # Her 8. ilan iki kategoride listelenir
+    assert sum(item['books'] for item in stats) == 110 + len(range(0, 110, 8))
+    assert sum(item['duplicates'] for item in stats) == len(range(0, 110, 8))
+    assert len(books) == len({book_data['site_url'] for book_data in books}) == 110
+    assert db_manager.execute_query('SELECT COUNT(*) FROM kitaplar')[0][0] == 110
+    assert db_manager.get_resumable_sweep() is None
+
+
+def test_interrupted_sweep_resumes_with_unfinished_categories(db_manager, targets):
+    with CategoryFailingStandIn(INVENTORY, latency=0, categories=CATEGORIES) as stand_in:
+        first, _ = sweep(db_manager, stand_in, targets)
+    assert [label for label, _, _ in first.incomplete] == ["Edebiyat / Şiir"]
+    sweep_id = db_manager.get_resumable_sweep()[0]
+    assert sweep_id == first.sweep_id
+    statuses = {item['kategori']: item['status'] for item in db_manager.get_sweep_items(sweep_id)}
+    assert statuses == {"11": 'done', "12": 'incomplete', "21": 'done'}
+
+    with NadirKitapStandIn(INVENTORY, latency=0, categories=CATEGORIES) as stand_in:
+        second, books = sweep(db_manager, stand_in, targets, sweep_id=sweep_id)
+        poem_urls = {book['url'] for book in stand_in.search({'kategori2': "1", 'kategori': "12"})}
+        # Tamamlanan kategoriler tekrar taranmaz: yalnızca Şiir'in sayfaları çekilir
+        assert stand_in.request_count == -(-len(poem_urls) // 25)
+    assert list(second.stats) == ["Edebiyat / Şiir"]
+    assert {book_data['site_url'] for book_data in books} == poem_urls
+    assert db_manager.get_resumable_sweep() is None
+    assert db_manager.execute_query('SELECT COUNT(*) FROM kitaplar')[0][0] == 110
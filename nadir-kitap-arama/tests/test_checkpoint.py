@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Kaldığı yerden devam: kesilen şehir taramasında tamamlanan sahaflar ve
+sayfalar veritabanından gelir, yalnızca kalan sayfalar yeniden çekilir
+"""
+
+import json
+
+import pytest
+
+import sahaf_registry
+from conftest import make_sahaflar
+from database import DatabaseManager
+from mock_server import NadirKitapStandIn
+from rate_limiter import AdaptiveRateLimiter
+from resilience import RetryPolicy
+from sahaf_registry import SahafRegistry
+from search_pipeline import SearchPipeline
+
+
+SEARCH_PARAMS = {'kitap_adi': '', 'yazar': '', 'selected_city': 'Test'}
+# 4 sahaf x 3 sayfa
+INVENTORY = {3000 + number: 60 for number in range(4)}
+
+
+class PageFailingStandIn(NadirKitapStandIn):
+    """Sahaf 3001'in 3. sayfası hep 503 döner (tarama o sayfada kesilir)"""
+
+    def should_fail(self, query):
+        return query.get('satici') == '3001' and query.get('page') == '3'
+
+
+@pytest.fixture
+def db_manager(tmp_path, monkeypatch):
+    path = tmp_path / "sahaflar.json"
+    path.write_text(json.dumps(make_sahaflar(INVENTORY)), encoding='utf-8')
+    monkeypatch.setattr(sahaf_registry, '_registry', SahafRegistry(str(path)))
+    manager = DatabaseManager(str(tmp_path / "kitaplar.db"))
+    yield manager
+    manager.close()
+
+
+def run_search(db_manager, stand_in, resume_checkpoint=None):
+    pipeline = SearchPipeline(SEARCH_PARAMS, db_manager=db_manager, auto_save=True,
+                              resume_checkpoint=resume_checkpoint, base_url=stand_in.base_url,
+                              rate_limiter=AdaptiveRateLimiter(rate=1000, max_rate=1000))
+    pipeline.engine.retry_policy = RetryPolicy(max_attempts=2, base_delay=0)
+    books = pipeline.run()
+    db_manager.wait_for_save_completion()
+    return pipeline, books
+
+
+def test_interrupted_city_search_resumes_at_missing_page(db_manager):
+    with PageFailingStandIn(INVENTORY, latency=0) as stand_in:
+        first, books = run_search(db_manager, stand_in)
+    assert first.engine.incomplete == [("Sahaf 3001", 3, "HTTP 503")]
+    assert len(books) == 4 * 60 - 10
+    checkpoint_id, params, _ = db_manager.get_resumable_checkpoint()
+    assert checkpoint_id == first.checkpoint_id
+    assert params['selected_city'] == "Test"
+
+    with NadirKitapStandIn(INVENTORY, latency=0) as stand_in:
+        second, books = run_search(db_manager, stand_in, resume_checkpoint=checkpoint_id)
+        # Tamamlanan 3 sahaf ve Sahaf 3001'in ilk 2 sayfası tekrar çekilmez
+        assert stand_in.request_count == 1
+    assert second.engine.incomplete == []
+    assert len(books) == len({book_data['site_url'] for book_data in books}) == 4 * 60
+    assert db_manager.get_resumable_checkpoint() is None
+
+
+def test_checkpoint_skips_pages_fetched_out_of_order(db_manager):
+    checkpoint_id = db_manager.create_checkpoint("sorgu", SEARCH_PARAMS)
+    books = {page: [{'site_url': f"https://www.nadirkitap.com/kitap-{page}-kitap{page}.html"}] for page in (1, 2, 4)}
+    for page, page_books in books.items():
+        db_manager.checkpoint_page_async(checkpoint_id, "3001", page, page_books)
+    db_manager.checkpoint_sahaf_async(checkpoint_id, "3000", [])
+    db_manager.wait_for_save_completion()
+
+    done, next_pages, urls = db_manager.load_checkpoint(checkpoint_id)
+    assert done == {"3000"}
+    # 3. sayfa eksik: 4. sayfa sıranın ilerisinde kaldığı için yeniden çekilir
+    assert next_pages == {"3001": 3}
+    assert urls == [books[1][0]['site_url'], books[2][0]['site_url']]
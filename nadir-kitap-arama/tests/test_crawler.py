@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Tarama motoru yerel nadirkitap taklidine karşı: eksiksiz sonuç, her sayfa bir
+istek, eşzamanlılıktan gelen hız ve hatalı sayfaların retry_policy dışında
+tekrar çekilmemesi (ağ olmadan regresyon testi)
+"""
+
+import time
+
+from conftest import make_sahaflar
+from crawler import CrawlEngine
+from mock_server import NadirKitapStandIn
+from resilience import RetryPolicy
+
+
+SEARCH_PARAMS = {'kitap_adi': '', 'yazar': '', 'secili_sehir': 'Test'}
+# 8 sahaf x 3 sayfa (son sayfa eksik)
+INVENTORY = {3000 + number: 60 for number in range(8)}
+PAGES = 24
+
+
+def crawl_city(stand_in, concurrency):
+    engine = CrawlEngine(SEARCH_PARAMS, concurrency=concurrency, base_url=stand_in.base_url)
+    started = time.perf_counter()
+    books = engine.run(engine.crawl_city(make_sahaflar(INVENTORY)))
+    return engine, books, time.perf_counter() - started
+
+
+def test_city_crawl_returns_every_book_once():
+    with NadirKitapStandIn(INVENTORY, latency=0) as stand_in:
+        engine, books, _ = crawl_city(stand_in, concurrency=4)
+        assert stand_in.request_count == PAGES
+    assert engine.request_count == PAGES
+    assert engine.incomplete == []
+    assert len(books) == sum(INVENTORY.values())
+    assert len({book_data['site_url'] for book_data in books}) == len(books)
+    assert {book_data['sehir'] for book_data in books} == {'Test'}
+
+
+def test_pages_are_fetched_concurrently():
+    latency = 0.1
+    with NadirKitapStandIn(INVENTORY, latency=latency) as stand_in:
+        _, books, elapsed = crawl_city(stand_in, concurrency=8)
+        max_inflight = stand_in.max_inflight
+    assert len(books) == sum(INVENTORY.values())
+    # Eşzamanlılık sınırı dolduruluyor ama aşılmıyor
+    assert max_inflight == 8
+    # Sıralı tarama PAGES * latency = 2.4 sn sürer; 8 eşzamanlı istekle ~0.3 sn beklenir
+    assert elapsed < PAGES * latency / 2
+
+
+def test_failing_general_page_is_tried_only_by_retry_policy():
+    with NadirKitapStandIn(INVENTORY, latency=0, broken_sahaflar=("0",)) as stand_in:
+        engine = CrawlEngine(SEARCH_PARAMS, base_url=stand_in.base_url,
+                             retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+        books = engine.run(engine.crawl_general())
+        assert stand_in.request_count == 3
+    assert books == []
+    assert engine.incomplete == [("Genel arama", 1, "HTTP 503")]
+
+
+def test_failing_sahaf_is_parked_and_retried_once():
+    broken = 3000
+    with NadirKitapStandIn(INVENTORY, latency=0, broken_sahaflar=(broken,)) as stand_in:
+        engine = CrawlEngine(SEARCH_PARAMS, base_url=stand_in.base_url,
+                             retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+        books = engine.run(engine.crawl_city(make_sahaflar(INVENTORY)))
+        # Diğer sahafların sayfaları + bozuk sahafın ilk sayfası için iki kez retry_policy
+        assert stand_in.request_count == PAGES - 3 + 2 * 3
+    assert len(books) == sum(INVENTORY.values()) - INVENTORY[broken]
+    assert engine.incomplete == [(f"Sahaf {broken}", 1, "HTTP 503")]
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+Sık sorguların sorgu planları (hiçbiri kitaplar tablosunu baştan sona taramamalı),
+yerel metin aramasının sıralaması ve süresi, okuyucu bağlantı havuzu
+"""
+
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from database import MIGRATIONS, DatabaseManager
+
+
+CITIES = ("Adana", "Ankara", "İstanbul", "İzmir", "Çanakkale")
+CATEGORIES = (("Tarih", "Osmanlı Tarihi"), ("Edebiyat", "Türk Romanı"), ("Bilim ve Teknik", "Fizik"))
+
+
+def make_books(count):
+    books = []
+    for number in range(count):
+        kategori, alt_kategori = CATEGORIES[number % len(CATEGORIES)]
+        books.append({
+            'kitap_adi': f"Nutuk {number}" if number % 7 == 0 else f"Kitap {number}",
+            'yazar': f"Yazar {number % 40}",
+            'sahaf_name': f"Sahaf {number % 25}",
+            'fiyat': f"{number % 500},00 TL",
+            'fiyat_numeric': number % 500,
+            'site_url': f"https://www.nadirkitap.com/kitap-{number}-kitap{number}.html",
+            'aciklama': "Yapı Kredi Yayınları",
+            'kategori': kategori,
+            'alt_kategori': alt_kategori,
+            'sehir': CITIES[number % len(CITIES)],
+        })
+    return books
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "kitaplar.db"))
+    yield manager
+    manager.close()
+
+
+def test_migrations_applied(db_manager):
+    assert db_manager.schema_version() == MIGRATIONS[-1][0]
+
+
+def test_hot_queries_use_indexes_on_empty_database(db_manager):
+    assert db_manager.table_scans() == []
+
+
+def test_hot_queries_use_indexes_on_filled_database(db_manager):
+    assert db_manager.save_books(make_books(3000)) == 3000
+    db_manager.execute_query('ANALYZE')
+    assert db_manager.table_scans() == []
+
+
+def test_table_scans_reports_unindexed_query(db_manager):
+    query = ("açıklama", "SELECT * FROM kitaplar WHERE aciklama = ?", ('Yapı Kredi Yayınları',))
+    scans = db_manager.table_scans(queries=(query,))
+    assert [name for name, _ in scans] == ["açıklama"]
+
+
+def test_schema_runs_without_python_functions(db_manager, tmp_path):
+    # Python fonksiyonu kaydetmemiş bağlantılar (CrawlFrontier, sqlite3 kabuğu) da kitapları güncelleyebilmeli
+    db_manager.save_books(make_books(3))
+    with sqlite3.connect(str(tmp_path / "kitaplar.db")) as conn:
+        conn.execute("UPDATE kitaplar SET baslik = 'Yeni Başlık', yazar = 'Yeni Yazar'")
+        conn.execute("DELETE FROM kitaplar")
+
+
+def test_relevance_ranks_title_matches_first(db_manager):
+    books = make_books(70)
+    # Başlıkta geçmeyip yalnızca açıklamada (yayınevi) geçen eşleşmeler
+    for book in books[1:4]:
+        book['aciklama'] = "Nutuk Yayınları"
+    db_manager.save_books(books)
+    total, rows = db_manager.search_books(kitap_adi="nutuk", siralama='ilgi')
+    titles = [row[2] for row in rows]  # kitaplar.*: id, unique_id, baslik, ...
+    assert total == len(rows) == 13
+    assert all(title.startswith("Nutuk") for title in titles[:10])
+    assert not any(title.startswith("Nutuk") for title in titles[10:])
+
+
+@pytest.fixture(scope='module')
+def filled_db(tmp_path_factory):
+    manager = DatabaseManager(str(tmp_path_factory.mktemp("dolu") / "kitaplar.db"))
+    manager.save_books(make_books(20000))
+    manager.execute_query('ANALYZE')
+    yield manager
+    manager.close()
+
+
+@pytest.mark.parametrize('siralama', ['fiyatartan.', 'tarihyeni.', 'ilgi'])
+def test_text_search_time(filled_db, siralama):
+    # Kaba süre sınırı (yerel arama hedefi 50 ms); 20 bin satırda ~10-20 ms sürer.
+    # Planların ayrıntılı kontrolü HOT_QUERIES üzerinden table_scans testlerindedir
+    timings = []
+    for _ in range(5):
+        started = time.perf_counter()
+        total, rows = filled_db.search_books(kitap_adi="nutuk", siralama=siralama)
+        timings.append(time.perf_counter() - started)
+    assert total == 2858 and len(rows) == 1000
+    assert sorted(timings)[2] < 0.05
+
+
+def test_readers_are_read_only_and_pooled(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "kitaplar.db"), read_pool_size=2)
+    try:
+        with manager._read() as conn:
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            with pytest.raises(sqlite3.OperationalError):
+                conn.execute("DELETE FROM kitaplar")
+
+        # Aynı anda 8 okuma: havuz 2 bağlantıyı aşmaz
+        barrier = threading.Barrier(8)
+
+        def read():
+            barrier.wait()
+            manager.search_books(kitap_adi="nutuk")
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+        assert manager._reader_count == manager._readers.qsize() == 2
+    finally:
+        manager.close()
+
+
+def test_failed_reader_connect_releases_pool_slot(tmp_path, monkeypatch):
+    manager = DatabaseManager(str(tmp_path / "kitaplar.db"), read_pool_size=1)
+    try:
+        connect = manager._connect
+
+        def failing_connect(read_only=False):
+            if read_only:
+                raise sqlite3.OperationalError("unable to open database file")
+            return connect(read_only)
+
+        monkeypatch.setattr(manager, '_connect', failing_connect)
+        with pytest.raises(sqlite3.OperationalError):
+            with manager._read():
+                pass
+        assert manager._reader_count == 0
+
+        # Slot boşaldı: sonraki okuma yeni bağlantı açar (sızsaydı sonsuza kadar beklerdi)
+        monkeypatch.setattr(manager, '_connect', connect)
+        result = []
+        reader = threading.Thread(target=lambda: result.append(manager.execute_query('SELECT COUNT(*) FROM kitaplar')),
+                                  daemon=True)
+        reader.start()
+        reader.join(5)
+        assert result == [[(0,)]]
+    finally:
+        manager.close()
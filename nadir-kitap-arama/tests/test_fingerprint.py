@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Değişmeyen sahafları atlama: en yeni ilanlar sayfasının parmak izi aynıysa
+sahaf taranmaz, kitaplar veritabanından gelir; envanter değişince yeniden taranır
+"""
+
+import pytest
+
+from conftest import make_sahaflar
+from crawler import CrawlEngine
+from database import DatabaseManager
+from mock_server import NadirKitapStandIn
+
+
+SEARCH_PARAMS = {'kitap_adi': '', 'yazar': '', 'secili_sehir': 'Test', 'skip_unchanged': True}
+INVENTORY = {3000 + number: 60 for number in range(4)}
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "kitaplar.db"))
+    yield manager
+    manager.close()
+
+
+def crawl_and_save(db_manager, inventory):
+    """SearchPipeline gibi: tara, kitapları ve parmak izlerini kaydet"""
+    with NadirKitapStandIn(inventory, latency=0) as stand_in:
+        engine = CrawlEngine(SEARCH_PARAMS, base_url=stand_in.base_url, sync_store=db_manager)
+        books = engine.run(engine.crawl_city(make_sahaflar(inventory)))
+        requests = stand_in.request_count
+    db_manager.save_books(books)
+    db_manager.set_fingerprints(engine.query_key, engine.fingerprints)
+    return engine, books, requests
+
+
+def test_unchanged_sahafs_are_read_from_database(db_manager):
+    first, books, requests = crawl_and_save(db_manager, INVENTORY)
+    # Her sahaf için parmak izi sayfası + 3 sonuç sayfası
+    assert requests == 4 * 4
+    assert sorted(first.recrawled) == [f"Sahaf {sahaf_id}" for sahaf_id in INVENTORY]
+
+    second, cached_books, requests = crawl_and_save(db_manager, INVENTORY)
+    assert requests == 4
+    assert second.recrawled == []
+    assert len(second.skipped) == 4
+    assert sorted(book_data['site_url'] for book_data in cached_books) == sorted(
+        book_data['site_url'] for book_data in books)
+
+
+def test_changed_sahaf_is_crawled_again(db_manager):
+    crawl_and_save(db_manager, INVENTORY)
+    # Sahaf 3000'e yeni bir ilan geldi
+    engine, books, requests = crawl_and_save(db_manager, {**INVENTORY, 3000: 61})
+    assert engine.recrawled == ["Sahaf 3000"]
+    assert len(engine.skipped) == 3
+    assert requests == 4 + 3
+    assert len(books) == 4 * 60 + 1
+
+
+def test_sahaf_is_crawled_when_saved_books_are_missing(db_manager):
+    crawl_and_save(db_manager, INVENTORY)
+    db_manager.execute_query("DELETE FROM kitaplar WHERE sahaf_url LIKE '%sahaf3001.html'")
+    engine, books, _ = crawl_and_save(db_manager, INVENTORY)
+    assert engine.recrawled == ["Sahaf 3001"]
+    assert len(books) == 4 * 60
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Paylaşılan tarama kuyruğu: ayrı süreçlerdeki worker'lar taklit sunucuya karşı
+her görevi bir kez tamamlar, kirası dolan görevler yeniden alınır
+"""
+
+import multiprocessing
+import sqlite3
+import time
+
+import pytest
+
+from conftest import make_sahaflar
+from frontier import CrawlFrontier, run_frontier_worker
+from mock_server import NadirKitapStandIn
+
+
+SEARCH_PARAMS = {'kitap_adi': '', 'yazar': ''}
+# 6 sahaf x 4 sayfa (sayfa başına 25 kitap, son sayfa eksik), 2 sayfalık görevler -> 12 görev
+INVENTORY = {2000 + number: 90 for number in range(6)}
+SAHAFLAR = make_sahaflar(INVENTORY)
+
+
+@pytest.fixture
+def frontier(tmp_path):
+    frontier = CrawlFrontier(str(tmp_path / "kitaplar.db"), lease_seconds=30, max_attempts=2)
+    yield frontier
+    frontier.close()
+
+
+def expire_leases(frontier):
+    frontier._conn.execute("UPDATE crawl_frontier SET lease_expires = 0 WHERE status = 'leased'")
+
+
+def test_worker_processes_finish_every_task_once(frontier):
+    tasks = frontier.seed(SEARCH_PARAMS, SAHAFLAR, chunk_pages=2)
+    assert tasks == 12
+    # Çöken bir worker'ın kirası: süresi dolmuş, başka süreç yeniden almalı
+    crashed = frontier.claim("coken-worker")[0]
+    expire_leases(frontier)
+
+    with NadirKitapStandIn(INVENTORY, latency=0.01) as stand_in:
+        with multiprocessing.get_context("spawn").Pool(2) as pool:
+            workers = pool.starmap(run_frontier_worker,
+                                   [(frontier.db_path, stand_in.base_url, f"worker-{i}", 4) for i in range(2)])
+        requests = stand_in.request_count
+
+    assert frontier.stats() == {'done': {'tasks': 12, 'books': 540}}
+    assert sum(worker['tasks'] for worker in workers) == 12
+    assert sum(worker['failed'] for worker in workers) == 0
+    # Her sayfa bir kez indirildi, her kitap bir kez kaydedildi
+    assert requests == 24
+    with sqlite3.connect(frontier.db_path) as conn:
+        assert conn.execute('SELECT COUNT(*), COUNT(DISTINCT kitap_url) FROM kitaplar').fetchone() == (540, 540)
+        attempts = conn.execute('SELECT attempts FROM crawl_frontier WHERE id = ?', (crashed.id,)).fetchone()[0]
+    assert attempts == 1
+
+
+def test_expired_lease_is_reclaimed_until_attempts_run_out(frontier):
+    frontier.enqueue(SEARCH_PARAMS, "2000")
+    assert frontier.claim("worker-a")[0].attempts == 0
+    # Kirası geçerli görev başkasına verilmez
+    assert frontier.claim("worker-b") == []
+
+    expire_leases(frontier)
+    task = frontier.claim("worker-b")[0]
+    assert task.attempts == 1
+    assert not frontier.complete(task.id, "worker-a")
+
+    expire_leases(frontier)
+    assert frontier.claim("worker-c") == []
+    assert frontier.stats() == {'failed': {'tasks': 1, 'books': 0}}
+
+
+def test_heartbeat_keeps_lease(frontier):
+    frontier.enqueue(SEARCH_PARAMS, "2000")
+    frontier.claim("worker-a")
+    frontier._conn.execute("UPDATE crawl_frontier SET lease_expires = ?", (time.time() + 0.05,))
+    frontier.heartbeat("worker-a")
+    time.sleep(0.1)
+    assert frontier.claim("worker-b") == []
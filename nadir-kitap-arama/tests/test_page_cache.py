@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+Sayfa önbelleği: URL normalizasyonu, yaş sınırı, seyrek LRU güncellemesi ve
+önbellek kapalıyken dosya oluşturulmaması
+"""
+
+import time
+import zlib
+
+import pytest
+
+import page_cache
+from page_cache import PageCache, normalize_url
+
+
+URL = "https://www.nadirkitap.com/kitapara.php?kitap_Adi=nutuk&page=2&siralama=fiyatartan."
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = PageCache(str(tmp_path / "sayfa_cache.db"))
+    yield cache
+    cache.close()
+
+
+def test_normalize_url_ignores_parameter_order_and_host_case():
+    assert normalize_url(URL) == normalize_url(
+        "HTTPS://WWW.NadirKitap.com/kitapara.php?page=2&siralama=fiyatartan.&kitap_Adi=nutuk")
+
+
+def test_get_respects_max_age(cache):
+    cache.put(URL, "<html>Nutuk</html>")
+    assert cache.get(URL) == "<html>Nutuk</html>"
+    assert cache.get(URL, max_age=3600) == "<html>Nutuk</html>"
+    cache._conn.execute('UPDATE pages SET stored_at = stored_at - 7200')
+    assert cache.get(URL, max_age=3600) is None
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 1
+
+
+def test_hit_writes_only_when_access_time_is_stale(cache):
+    cache.put(URL, "<html>Nutuk</html>")
+    changes = cache._conn.total_changes
+    for _ in range(5):
+        cache.get(URL)
+    assert cache._conn.total_changes == changes
+
+    cache._conn.execute('UPDATE pages SET accessed_at = ?', (time.time() - page_cache.TOUCH_INTERVAL - 1,))
+    changes = cache._conn.total_changes
+    cache.get(URL)
+    assert cache._conn.total_changes == changes + 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    pages = {URL.replace("page=2", f"page={page}"): f"<html>Sayfa {page}</html>" for page in (1, 2, 3)}
+    size = max(len(zlib.compress(text.encode('utf-8'), 6)) for text in pages.values())
+    # İki sayfa sığar, üçüncüsü en eski erişileni çıkarır
+    cache = PageCache(str(tmp_path / "sayfa_cache.db"), max_bytes=size * 2.5)
+    try:
+        first, second, third = pages
+        cache.put(first, pages[first])
+        cache.put(second, pages[second])
+        cache._conn.execute('UPDATE pages SET accessed_at = 0 WHERE url = ?', (normalize_url(first),))
+        cache.put(third, pages[third])
+        assert cache.get(first) is None
+        assert cache.get(second) == pages[second]
+        assert cache.get(third) == pages[third]
+    finally:
+        cache.close()
+
+
+def test_pipeline_does_not_create_cache_file_when_disabled(tmp_path, monkeypatch):
+    from search_pipeline import SearchPipeline
+
+    monkeypatch.chdir(tmp_path)
+    pipeline = SearchPipeline({'kitap_adi': "nutuk", 'cache_max_age': 0}, base_url="http://127.0.0.1:9")
+    assert pipeline.engine.page_cache is None
+    assert not (tmp_path / "sayfa_cache.db").exists()
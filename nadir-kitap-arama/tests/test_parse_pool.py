@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""
+Ayrıştırma süreç havuzu: aramanın ayrıştırıcı seçimi süreçlere ulaşır, havuz
+bir kez ısıtılır, süreçler GUI yığınını yüklemez
+"""
+
+import asyncio
+import subprocess
+import sys
+
+import pytest
+
+from conftest import PROJECT_DIR, read_page
+from parse_pool import ParsePool
+from parsers import get_parser
+
+
+@pytest.fixture(scope='module')
+def pool():
+    pool = ParsePool(workers=1)
+    yield pool
+    pool.close()
+
+
+def test_parse_matches_in_process_parser(pool):
+    html = read_page('genel_arama.html')
+    listing = asyncio.run(pool.parse(html, 'bs4'))
+    reference = get_parser('bs4').parse_listing(html)
+    assert listing.books == reference.books
+    assert (listing.last_page, listing.total) == (reference.last_page, reference.total)
+
+
+def test_parser_choice_reaches_worker(pool):
+    with pytest.raises(ValueError):
+        pool.submit("<html></html>", 'olmayan-ayristirici').result()
+
+
+def test_warm_starts_workers_once(pool, monkeypatch):
+    pool.warm()
+    submitted = []
+    monkeypatch.setattr(pool._executor, 'submit', lambda *args: submitted.append(args))
+    pool.warm()
+    assert submitted == []
+
+
+def test_spawned_main_does_not_load_gui():
+    # Spawn edilen süreç run.py'yi __mp_main__ olarak çalıştırır
+    code = ("import runpy, sys; runpy.run_path('run.py', run_name='__mp_main__'); "
+            "print(sorted({'PyQt6', 'main_window'} & set(sys.modules)))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
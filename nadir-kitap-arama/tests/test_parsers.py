@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Ayrıştırıcı eşdeğerliği: her arka uç referans (bs4) ile birebir aynı sözlükleri üretmeli
+"""
+
+import os
+
+import pytest
+
+from conftest import PAGES_DIR, read_page
+from mock_server import generate_sahaf_books, render_page
+from parsers import LXML_AVAILABLE, PARSERS, get_parser, parse_last_page, parse_result_count
+
+
+SAVED_PAGES = sorted(name for name in os.listdir(PAGES_DIR) if name.endswith('.html'))
+BACKENDS = [name for name in PARSERS if name != 'bs4']
+
+needs_lxml = pytest.mark.skipif(not LXML_AVAILABLE, reason="lxml kurulu değil")
+
+
+@needs_lxml
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('name', SAVED_PAGES)
+def test_saved_pages_match_reference(name, backend):
+    html = read_page(name)
+    assert get_parser(backend).parse_page(html) == get_parser('bs4').parse_page(html)
+
+
+@needs_lxml
+@pytest.mark.parametrize('backend', BACKENDS)
+@pytest.mark.parametrize('sahaf_id', (7, 42, 1234))
+def test_generated_pages_match_reference(sahaf_id, backend):
+    html = render_page(generate_sahaf_books(sahaf_id, 25), 1, 25, {})
+    assert get_parser(backend).parse_page(html) == get_parser('bs4').parse_page(html)
+
+
+@pytest.mark.parametrize('html', ("", "   ", "<html><body><div class='list-cell'></div></body></html>"))
+@pytest.mark.parametrize('backend', PARSERS)
+def test_empty_pages(html, backend):
+    assert get_parser(backend).parse_page(html) == []
+
+
+def test_reference_reads_saved_pages():
+    # Eşdeğerlik boş listelerle sağlanmasın: sayfalardaki kitaplar gerçekten okunuyor
+    books = get_parser('bs4').parse_page(read_page('genel_arama.html'))
+    assert len(books) == 5
+    assert books[2] == {
+        'kitap_adi': "Söylev (Nutuk) - Bugünkü Dille",
+        'yazar': "",
+        'fiyat': "275,50 TL",
+        'fiyat_numeric': 275.5,
+        'site_url': "https://www.nadirkitap.com/soylev-kitap18990042.html",
+        'aciklama': "Türk Dil Kurumu Yayınları",
+        'sahaf_adi': "Ankara Sahaf",
+        'sahaf_url': "https://www.nadirkitap.com/sahaf-ankara-sahaf-sahaf77.html",
+    }
+    assert books[0]['sahaf_url'] == "https://www.nadirkitap.com/sahaf-cagdas-kitabevi-sahaf4021.html"
+    assert books[1]['kitap_adi'] == "NUTUK & VESİKALAR (Cilt I-II-III)"
+    assert books[4]['fiyat'] == ""
+    assert len(get_parser('bs4').parse_page(read_page('sahaf_tek_sayfa.html'))) == 3
+    assert get_parser('bs4').parse_page(read_page('sonuc_yok.html')) == []
+
+
+@pytest.mark.parametrize('name, last_page', (
+    ('genel_arama.html', 121),     # Menü ve blog linklerindeki page=3, page=12, page=250 sayılmaz
+    ('sahaf_tek_sayfa.html', 1),   # Sayfalama yok; haberler.php?page=2 sayılmaz
+    ('sonuc_yok.html', 1),
+    ('ic_ice_sayfalama.html', 49),  # İç içe div'lerdeki "Son" linki de sayfalama bloğunda
+))
+def test_last_page_from_pagination_only(name, last_page):
+    assert parse_last_page(read_page(name)) == last_page
+
+
+def test_last_page_on_generated_pages():
+    # 10'dan fazla sayfada sayfalama ilk 10 sayfa ve "Son" linkini gösterir
+    books = generate_sahaf_books(3, 25)
+    assert parse_last_page(render_page(books, 1, 25 * 37, {'page': '1'})) == 37
+    assert parse_last_page(render_page(books, 1, 25 * 4, {'page': '1'})) == 4
+    assert parse_last_page(render_page(books, 1, 25, {'page': '1'})) == 1
+
+
+@pytest.mark.parametrize('name, total', (
+    ('genel_arama.html', 3012),    # Kenar çubuğundaki "2.417 ürün" ve alt bilgideki "4.500.000 ürün" sayılmaz
+    ('sahaf_tek_sayfa.html', 3),   # Sahaf başlığındaki "14.230 ürün" sayılmaz
+    ('sonuc_yok.html', 0),
+    ('uc_durumlar.html', None),
+    ('ic_ice_sayfalama.html', 1204),  # Sayı iç içe span'de
+))
+def test_result_count_from_count_element_only(name, total):
+    assert parse_result_count(read_page(name)) == total
+
+
+def test_result_count_on_generated_pages():
+    books = generate_sahaf_books(3, 25)
+    assert parse_result_count(render_page(books, 1, 1234, {})) == 1234
+    assert parse_result_count("<p>1.234 sonuç</p>") is None
+
+
+@pytest.mark.parametrize('backend', PARSERS)
+def test_listing_uses_scoped_pagination_and_count(backend):
+    listing = get_parser(backend).parse_listing(read_page('genel_arama.html'))
+    assert (len(listing.books), listing.last_page, listing.total) == (5, 121, 3012)
+
+
+@pytest.mark.parametrize('backend', PARSERS)
+def test_listing_reads_nested_pagination(backend):
+    listing = get_parser(backend).parse_listing(read_page('ic_ice_sayfalama.html'))
+    assert (len(listing.books), listing.last_page, listing.total) == (2, 49, 1204)
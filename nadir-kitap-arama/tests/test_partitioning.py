@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+Sayfa sınırını aşan sorgular: aralıklar ikiye bölünür, birleşik sonuç
+tekilleştirilip sitenin sıralamasıyla dizilir, sahaf aralıklara bölünerek
+eksiksiz taranır, bölünemeyen aralıklar sessizce kırpılmaz
+"""
+
+import pytest
+
+import crawler
+from conftest import make_sahaflar
+from crawler import CrawlEngine, MERGE_SORT_KEYS
+from mock_server import NadirKitapStandIn
+from partitioning import Partition, initial_partitions
+
+
+SEARCH_PARAMS = {'kitap_adi': '', 'yazar': ''}
+
+
+def test_split_halves_closed_and_doubles_open_ranges():
+    assert [(part.lo, part.hi) for part in Partition('fiyat', 100, 250).split()] == [(100, 175), (175, 250)]
+    assert [(part.lo, part.hi) for part in Partition('fiyat', 1000).split()] == [(1000, 2000), (2000, None)]
+    assert [(part.lo, part.hi) for part in Partition('fiyat', 0).split()] == [(0, 2), (2, None)]
+    assert not Partition('tarih', 1960, 1961).can_split()
+    assert Partition('tarih', 2010).apply({'kitap_adi': "nutuk"}) == {'kitap_adi': "nutuk", 'tarih1': 2010, 'tarih2': 0}
+    with pytest.raises(ValueError):
+        Partition('sayfa', 1, 2)
+
+
+def test_initial_partitions_cover_the_range_without_gaps():
+    partitions = initial_partitions('fiyat')
+    assert (partitions[0].lo, partitions[-1].hi) == (0, None)
+    assert all(left.hi == right.lo for left, right in zip(partitions, partitions[1:]))
+
+
+@pytest.mark.parametrize('siralama', sorted(MERGE_SORT_KEYS))
+def test_partitioned_results_are_deduplicated_in_site_order(siralama):
+    with NadirKitapStandIn({4000: 290}, latency=0) as stand_in:
+        engine = CrawlEngine(dict(SEARCH_PARAMS, siralama=siralama), base_url=stand_in.base_url)
+        books = engine.run(engine.crawl_partitioned('fiyat', max_partition_pages=2))
+        site_order = [book['url'] for book in stand_in.search({'satici': '0', 'siralama': siralama})]
+    assert engine.incomplete == []
+    # Sınırdaki fiyatlar iki aralıkta da listelenir; birleşik liste bölünmemiş sorguyla aynı
+    assert [book_data['site_url'] for book_data in books] == site_order
+
+
+def test_sahaf_past_page_cap_is_partitioned_by_price():
+    inventory = {4000: 290}  # 12 sayfa
+    with NadirKitapStandIn(inventory, latency=0) as stand_in:
+        engine = CrawlEngine(SEARCH_PARAMS, base_url=stand_in.base_url)
+        sahaf = make_sahaflar(inventory)[0]
+        books = engine.run(engine.crawl_sahaf(sahaf, max_pages=3))
+    assert engine.incomplete == []
+    assert len(books) == 290
+    assert len({book_data['site_url'] for book_data in books}) == 290
+    assert {book_data['sahaf_name'] for book_data in books} == {"Sahaf 4000"}
+
+
+def test_unsplittable_partition_is_reported_as_incomplete(monkeypatch):
+    # Tek sorgu 1 sayfa ile sınırlı: yıl aralıkları 1 yıla inse de ~32 kitap (2 sayfa) döner
+    monkeypatch.setattr(crawler, 'MAX_QUERY_PAGES', 1)
+    with NadirKitapStandIn({4000: 2000}, latency=0) as stand_in:
+        engine = CrawlEngine(SEARCH_PARAMS, base_url=stand_in.base_url)
+        books = engine.run(engine.crawl_partitioned('tarih', max_partition_pages=1))
+    assert engine.incomplete
+    for label, page, reason in engine.incomplete:
+        lo, hi = map(int, label.split()[1].split('-'))
+        assert hi - lo == 1
+        assert page == 2 and reason == "aralık bölünemiyor, 1 sayfa alınamadı"
+    # Yalnızca her aralığın ilk sayfası alınabildi
+    assert len(books) == len({book_data['site_url'] for book_data in books}) < 2000
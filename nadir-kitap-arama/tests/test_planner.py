@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+İş planı: envanterden sayfa tahmini, büyükten küçüğe sıra, gerçek sayfa
+sayısıyla düzeltme ve tamamlanan sayfa hızından kalan süre
+"""
+
+import pytest
+
+import planner
+from conftest import make_sahaflar
+from crawler import CrawlEngine
+from mock_server import NadirKitapStandIn
+from planner import CrawlPlan, estimate_pages
+
+
+def sahaf(sahaf_id, kitap_sayisi):
+    return {'name': f"Sahaf {sahaf_id}", 'kitap_sayisi': kitap_sayisi,
+            'seller_url': f"https://www.nadirkitap.com/sahaf-{sahaf_id}-sahaf{sahaf_id}.html"}
+
+
+@pytest.mark.parametrize('kitap_sayisi, pages', (
+    ("60", 3),
+    ("3.002", 122),  # 121 sayfa + ikinci aralığın ilk sayfası
+    ("", 1),
+    ("bilinmiyor", 1),
+    (5000, 202),  # 200 sayfa, aralıklara bölünür: her 100 sayfa için bir ilk sayfa daha
+))
+def test_estimate_pages_from_inventory(kitap_sayisi, pages):
+    assert estimate_pages(sahaf(1, kitap_sayisi), {'kitap_adi': ''}) == pages
+
+
+def test_filtered_search_assumes_one_page():
+    assert estimate_pages(sahaf(1, "3.002"), {'yazar': "Yaşar Kemal"}) == 1
+
+
+def test_plan_orders_largest_first_and_skips_unknown_sahafs():
+    sahaflar = [sahaf(1, "60"), sahaf(2, "3.002"), {'name': "Linksiz", 'seller_url': ""}, sahaf(3, "250")]
+    plan = CrawlPlan(sahaflar, {})
+    assert [item['name'] for item in plan.order] == ["Sahaf 2", "Sahaf 3", "Sahaf 1"]
+    assert plan.total_pages == 122 + 10 + 3
+
+
+def test_eta_follows_page_rate(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(planner.time, 'monotonic', lambda: clock[0])
+    reports = []
+    plan = CrawlPlan([sahaf(1, "250"), sahaf(2, "250")], {},
+                     on_progress=lambda *report: reports.append(report), min_interval=0)
+    assert plan.eta() is None
+    clock[0] += 5.0
+    for _ in range(5):
+        plan.page_done()
+    # 5 sayfa 5 saniyede: kalan 15 sayfa 15 saniye
+    assert plan.eta() == pytest.approx(15.0)
+    assert reports[-1] == (5, 20, pytest.approx(15.0))
+
+    # Sahaf 2'nin gerçekte 1 sayfası var
+    plan.set_pages("2", 1)
+    assert plan.eta() == pytest.approx(6.0)
+    plan.finish("1", 4)
+    assert reports[-1] == (5, 5, 0.0)
+
+
+def test_city_crawl_corrects_estimates_to_real_pages():
+    inventory = {3000 + number: 60 for number in range(4)}
+    # sahaflar.json eski: sahaflar 150 kitap (6 sayfa) gösteriyor, sunucuda 60 (3 sayfa) var
+    sahaflar = [dict(item, kitap_sayisi="150") for item in make_sahaflar(inventory)]
+    reports = []
+    plan = CrawlPlan(sahaflar, {}, on_progress=lambda *report: reports.append(report))
+    assert plan.total_pages == 24
+    with NadirKitapStandIn(inventory, latency=0) as stand_in:
+        engine = CrawlEngine({'kitap_adi': '', 'yazar': ''}, base_url=stand_in.base_url)
+        engine.run(engine.crawl_city(sahaflar, plan=plan))
+    assert plan.total_pages == plan.done_pages == 12
+    assert reports[-1][:2] == (12, 12)
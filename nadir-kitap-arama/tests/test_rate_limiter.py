@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+Uyarlanır hız sınırlayıcı: hızlı yanıtlarda yavaş artış, yavaşlatmada yarıya
+inme, hata patlamasında tek azaltma ve token bucket hızında istek
+"""
+
+import time
+
+from rate_limiter import AdaptiveRateLimiter
+
+
+def test_fast_responses_increase_rate_up_to_max():
+    limiter = AdaptiveRateLimiter(rate=4.0, max_rate=6.0)
+    limiter.record_response(200, 0.1)
+    assert limiter.current_rate == 4.25
+    for _ in range(100):
+        limiter.record_response(200, 0.1)
+    assert limiter.current_rate == 6.0
+
+
+def test_slow_or_other_responses_keep_rate():
+    limiter = AdaptiveRateLimiter(rate=4.0, slow_threshold=3.0)
+    limiter.record_response(200, 5.0)
+    limiter.record_response(404, 0.1)
+    assert limiter.current_rate == 4.0
+    assert limiter.throttle_count == 0
+
+
+def test_throttling_halves_rate_once_per_cooldown():
+    limiter = AdaptiveRateLimiter(rate=8.0, min_rate=1.5, cooldown=0.2)
+    # Uçuştaki isteklerin hepsi aynı anda 429 alır: tek azaltma
+    for status_code in (429, 503, 429):
+        limiter.record_response(status_code, 0.1)
+    assert limiter.current_rate == 4.0
+    assert limiter.throttle_count == 1
+
+    time.sleep(0.25)
+    limiter.record_failure()
+    assert limiter.current_rate == 2.0
+    time.sleep(0.25)
+    limiter.record_failure()
+    assert limiter.current_rate == 1.5
+
+
+def test_acquire_paces_requests_at_rate():
+    limiter = AdaptiveRateLimiter(rate=20.0)
+    started = time.monotonic()
+    # Kovada bir token var, kalan 10 istek saniyede 20 hızla
+    for _ in range(11):
+        limiter.acquire()
+    elapsed = time.monotonic() - started
+    assert 0.45 <= elapsed < 1.0
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""
+Uçuştaki aynı istekler tek indirmeye iner, farklı önbellek kuralları birleşmez
+"""
+
+import asyncio
+
+from parsers import Listing
+from request_coalescer import RequestCoalescer
+
+
+URL = "https://www.nadirkitap.com/kitapara.php?ara=aramayap&kitap_Adi=nutuk&page=1"
+
+
+def run_together(coalescer, cache_ages):
+    calls = []
+
+    async def fetch_page():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return Listing([{'kitap_adi': "Nutuk"}], 1, 1)
+
+    async def search_all():
+        return await asyncio.gather(*(coalescer.fetch(URL, fetch_page, age) for age in cache_ages))
+
+    return asyncio.run(search_all()), calls
+
+
+def test_same_cache_policy_shares_one_fetch():
+    coalescer = RequestCoalescer()
+    listings, calls = run_together(coalescer, (3600, 3600, 3600))
+    assert len(calls) == 1
+    assert coalescer.stats() == {'requests': 3, 'deduplicated': 2, 'inflight': 0}
+    # Her bekleyen kendi kopyasını alır
+    listings[0].books[0]['sehir'] = "Ankara"
+    assert 'sehir' not in listings[1].books[0]
+
+
+def test_different_cache_policies_do_not_share():
+    coalescer = RequestCoalescer()
+    _, calls = run_together(coalescer, (0, 60, 3600))
+    assert len(calls) == 3
+    assert coalescer.stats()['deduplicated'] == 0
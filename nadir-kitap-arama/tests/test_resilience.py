@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""
+Yeniden deneme ve devre kesici: yalnızca geçici hatalar sınırlı sayıda
+denenir, ardışık hatalar devreyi açar, yarı açık deneme tek hak verir
+"""
+
+import time
+
+import pytest
+
+from crawler import CrawlEngine
+from parsers import Listing
+from resilience import CircuitBreaker, RetryPolicy, TransientFetchError
+
+
+URL = "http://127.0.0.1:9/kitapara.php?page=1"
+
+
+def test_retry_delay_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=0.5, max_delay=3.0)
+    delays = [policy.delay(attempt) for attempt in (1, 2, 3, 8) for _ in range(200)]
+    assert all(0 <= delay <= 3.0 for delay in delays)
+    assert max(policy.delay(1) for _ in range(200)) <= 1.0
+    assert len(set(delays)) > 1
+
+
+def fetch_with_errors(errors, calls):
+    """Önce errors'daki hataları, sonra bir sayfa döndüren motorla fetch_listing (3 deneme)"""
+    engine = CrawlEngine({}, retry_policy=RetryPolicy(max_attempts=3, base_delay=0))
+
+    async def fetch_and_parse(url, use_cache=True):
+        calls.append(url)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return Listing([], 1, 0)
+
+    engine._fetch_and_parse = fetch_and_parse
+    return engine.run(engine.fetch_listing(URL))
+
+
+def test_transient_errors_are_retried():
+    calls = []
+    assert fetch_with_errors([TransientFetchError(503), ConnectionError()], calls) == Listing([], 1, 0)
+    assert len(calls) == 3
+
+
+def test_retries_stop_at_max_attempts():
+    calls = []
+    with pytest.raises(TransientFetchError):
+        fetch_with_errors([TransientFetchError(429)] * 3, calls)
+    assert len(calls) == 3
+
+
+def test_other_errors_are_not_retried():
+    calls = []
+    with pytest.raises(ValueError):
+        fetch_with_errors([ValueError("bozuk sayfa")], calls)
+    assert len(calls) == 1
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    breaker.record_failure("77")
+    breaker.record_success("77")
+    breaker.record_failure("77")
+    assert not breaker.is_open("77")
+    breaker.record_failure("77")
+    assert breaker.is_open("77") and breaker.open_keys() == ["77"]
+    assert 0.1 < breaker.remaining("77") <= 0.2
+    assert breaker.remaining("1187") == 0.0
+    time.sleep(0.2)
+    assert breaker.remaining("77") == 0.0
+
+
+def test_half_open_allows_one_attempt():
+    breaker = CircuitBreaker(failure_threshold=3)
+    for _ in range(3):
+        breaker.record_failure("77")
+    breaker.half_open("77")
+    assert not breaker.is_open("77")
+    breaker.record_failure("77")
+    assert breaker.is_open("77")
+
+    breaker.half_open("77")
+    breaker.record_success("77")
+    breaker.record_failure("77")
+    assert not breaker.is_open("77")
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""
+Sahaf kaydı: ID, ad ve şehir indeksleri
+"""
+
+import json
+import subprocess
+import sys
+
+from conftest import PROJECT_DIR
+from sahaf_registry import SahafRegistry
+
+
+SAHAFLAR = [
+    {'name': "Ankara Sahaf", 'city': "Ankara", 'seller_url': "https://www.nadirkitap.com/ankara-sahaf-sahaf77.html"},
+    {'name': "Işık Sahaf", 'city': "İzmir", 'seller_url': "https://www.nadirkitap.com/isik-sahaf-sahaf1187.html"},
+    # Aynı sahafın ikinci kaydı: ilk kayıt esas alınır
+    {'name': "Ankara Sahaf (eski)", 'city': "Adana", 'seller_url': "https://www.nadirkitap.com/ankara-sahaf-sahaf77.html"},
+    {'name': "Linksiz Sahaf", 'city': "Ankara", 'seller_url': ""},
+]
+
+
+def load(tmp_path):
+    path = tmp_path / "sahaflar.json"
+    path.write_text(json.dumps(SAHAFLAR, ensure_ascii=False), encoding='utf-8')
+    return SahafRegistry(str(path))
+
+
+def test_indexes(tmp_path):
+    registry = load(tmp_path)
+    assert len(registry) == 4
+    assert registry.by_id("77")['name'] == "Ankara Sahaf"
+    assert registry.by_url("/sahaf-isik-sahaf-sahaf1187.html")['city'] == "İzmir"
+    assert registry.by_name("Linksiz Sahaf")['city'] == "Ankara"
+    assert [sahaf['name'] for sahaf in registry.by_city("Ankara")] == ["Ankara Sahaf", "Linksiz Sahaf"]
+    assert registry.cities() == ["Ankara", "İzmir"]
+
+
+def test_city_of_book(tmp_path):
+    registry = load(tmp_path)
+    assert registry.city_of({'sahaf_url': "https://www.nadirkitap.com/sahaf-ankara-sahaf-sahaf77.html"}) == "Ankara"
+    assert registry.city_of({'sahaf_url': "", 'sahaf_adi': "Işık Sahaf"}) == "İzmir"
+    assert registry.city_of({'sahaf_url': "", 'sahaf_adi': "Bilinmeyen"}) == ""
+
+
+def test_missing_file_gives_empty_registry(tmp_path):
+    registry = SahafRegistry(str(tmp_path / "yok.json"))
+    assert len(registry) == 0
+    assert registry.by_city("Ankara") == []
+
+
+def test_registry_does_not_load_crawler():
+    # Sahaf ID'si için tarama motoru (cloudscraper, requests) yüklenmemeli
+    code = "import sys, sahaf_registry; print(sorted({'crawler', 'cloudscraper', 'requests'} & set(sys.modules)))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
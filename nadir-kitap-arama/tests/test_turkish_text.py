@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Türkçe metin normalizasyonu: katlama, büyük/küçük harf, arama anahtarı ve
+SQLite'taki TURKCE sıralaması
+"""
+
+import random
+import sqlite3
+
+import pytest
+
+from turkish_text import fold, register_sqlite, search_key, sort_key, to_ascii, turkish_lower, turkish_upper
+
+
+CITIES = ["Adana", "Ceyhan", "Çanakkale", "Denizli", "Giresun", "Gümüşhane", "Iğdır", "İzmir",
+          "Ordu", "Ödemiş", "Sinop", "Şırnak", "Uşak", "Üsküdar"]
+
+
+@pytest.mark.parametrize('text, folded', (
+    ("IŞIK", "isik"),
+    ("ışık", "isik"),
+    ("İSTANBUL", "istanbul"),
+    ("Kâtip Çelebi", "katip celebi"),
+    ("Straße", "strasse"),
+    ("", ""),
+    (None, ""),
+))
+def test_fold(text, folded):
+    assert fold(text) == folded
+
+
+def test_ascii_and_case():
+    assert to_ascii("Çalıkuşu Ğİ") == "Calikusu GI"
+    assert turkish_lower("IŞIK İZMİR") == "ışık izmir"
+    assert turkish_upper("ışık izmir") == "IŞIK İZMİR"
+
+
+@pytest.mark.parametrize('text, key', (
+    ("NUTUK 1. Cilt", "nutuk 1 cilt"),
+    ("Kâtip Çelebi", "katip celebi"),
+    ("  Ömer   Seyfettin -- Hikâyeler ", "omer seyfettin hikayeler"),
+    ("Éditions Gallimard", "editions gallimard"),
+    ("Kaşağı", "kasagi"),
+))
+def test_search_key(text, key):
+    assert search_key(text) == key
+
+
+def test_sort_key_follows_turkish_alphabet():
+    shuffled = CITIES[:]
+    random.Random(7).shuffle(shuffled)
+    assert sorted(shuffled, key=sort_key) == CITIES
+    # Büyük/küçük harf yalnızca eşitlikte sırayı belirler
+    assert sorted(["ışık", "Işık", "izmir"], key=sort_key) == ["Işık", "ışık", "izmir"]
+
+
+def test_turkce_collation_in_sqlite():
+    conn = sqlite3.connect(":memory:")
+    register_sqlite(conn)
+    conn.execute("CREATE TABLE kitaplar (sehir TEXT)")
+    conn.executemany("INSERT INTO kitaplar VALUES (?)", [(city,) for city in reversed(CITIES)])
+    rows = conn.execute("SELECT sehir FROM kitaplar ORDER BY sehir COLLATE TURKCE").fetchall()
+    assert [row[0] for row in rows] == CITIES
+    assert conn.execute("SELECT search_key('Kâtip ÇELEBİ')").fetchone()[0] == "katip celebi"
+
+
+def test_builtin_like_keeps_index():
+    # LIKE yeniden tanımlansaydı SQLite önek aramasında indeksi kullanamazdı
+    conn = sqlite3.connect(":memory:")
+    register_sqlite(conn)
+    conn.execute("CREATE TABLE kitaplar (baslik TEXT COLLATE NOCASE)")
+    conn.execute("CREATE INDEX idx_baslik ON kitaplar(baslik)")
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM kitaplar WHERE baslik LIKE 'nutuk%'").fetchall()
+    assert plan[0][3].startswith("SEARCH kitaplar USING COVERING INDEX idx_baslik")
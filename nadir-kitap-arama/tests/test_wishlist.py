@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+İstek listesi: CSV/JSON okuma, aynı sorguya inen kalemlerin tek seferde
+aranması ve kalem başına en ucuz teklif
+"""
+
+import json
+
+import pytest
+
+from database import DatabaseManager
+from mock_server import NadirKitapStandIn
+from wishlist import WishlistSearch, load_wishlist, normalize_query
+
+
+INVENTORY = {5000: 120, 5001: 90}
+
+
+@pytest.fixture
+def db_manager(tmp_path):
+    manager = DatabaseManager(str(tmp_path / "kitaplar.db"))
+    yield manager
+    manager.close()
+
+
+def test_csv_with_header(tmp_path):
+    path = tmp_path / "liste.csv"
+    path.write_text("﻿Yazar,Başlık\nYaşar Kemal,İnce Memed\n,Tutunamayanlar\n,\n", encoding='utf-8')
+    assert load_wishlist(str(path)) == [
+        {'kitap_adi': "İnce Memed", 'yazar': "Yaşar Kemal"},
+        {'kitap_adi': "Tutunamayanlar", 'yazar': ""},
+    ]
+
+
+def test_csv_without_header(tmp_path):
+    path = tmp_path / "liste.csv"
+    path.write_text("Nutuk,Atatürk\nKürk Mantolu Madonna\n", encoding='utf-8')
+    assert load_wishlist(str(path)) == [
+        {'kitap_adi': "Nutuk", 'yazar': "Atatürk"},
+        {'kitap_adi': "Kürk Mantolu Madonna", 'yazar': ""},
+    ]
+
+
+def test_json_titles_and_records(tmp_path):
+    path = tmp_path / "liste.json"
+    path.write_text(json.dumps(["Nutuk", {'title': " Huzur ", 'author': "Tanpınar"}, {'yazar': ""}]),
+                    encoding='utf-8')
+    assert load_wishlist(str(path)) == [
+        {'kitap_adi': "Nutuk", 'yazar': ""},
+        {'kitap_adi': "Huzur", 'yazar': "Tanpınar"},
+    ]
+
+
+def test_normalize_query_merges_spellings():
+    assert normalize_query("  İNCE   Memed ") == normalize_query("ince memed") == normalize_query("Ince Memed")
+    assert normalize_query("Şiir") == normalize_query("siir")
+    assert normalize_query("Kitap 1") != normalize_query("Kitap 2")
+
+
+def test_same_queries_are_searched_once(db_manager):
+    items = [
+        {'kitap_adi': "Kitap 5000-1", 'yazar': ""},
+        {'kitap_adi': " kitap   5000-1", 'yazar': ""},
+        {'kitap_adi': "", 'yazar': "Yaşar Kemal"},
+        {'kitap_adi': "", 'yazar': "YASAR KEMAL"},
+        {'kitap_adi': "Olmayan Kitap", 'yazar': ""},
+    ]
+    with NadirKitapStandIn(INVENTORY, latency=0) as stand_in:
+        search = WishlistSearch(items, db_manager=db_manager, auto_save=True, base_url=stand_in.base_url)
+        books = search.run()
+        requests = stand_in.request_count
+        title_books = stand_in.search({'kitap_Adi': "Kitap 5000-1"})
+        author_books = stand_in.search({'yazar': "Yaşar Kemal"})
+    db_manager.wait_for_save_completion()
+
+    assert (len(search.queries), search.coalesced) == (3, 2)
+    # Başlık (31 ilan) ve yazar (26 ilan) aramaları 2'şer sayfa, sonuçsuz sorgu 1 sayfa
+    assert (len(title_books), len(author_books)) == (31, 26)
+    assert requests == search.request_count == 2 + 2 + 1
+    assert len(books) == len({book['url'] for book in title_books + author_books})
+
+    summary = [(item['matches'], item['cheapest_price']) for item in search.summary]
+    cheapest_title = min(book['price'] for book in title_books)
+    cheapest_author = min(book['price'] for book in author_books)
+    assert summary == [
+        (len(title_books), cheapest_title), (len(title_books), cheapest_title),
+        (len(author_books), cheapest_author), (len(author_books), cheapest_author),
+        (0, None),
+    ]
+    saved = [(item['matches'], item['cheapest_price']) for item in db_manager.get_wishlist_summary("istek_listesi")]
+    assert saved == summary
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Türkçe metin normalizasyonu: ASCII karşılıklar, büyük/küçük harf, sıralama ve arama anahtarları
+
+Dönüşümler modül yüklenirken bir kez kurulan str.translate tablolarıyla
+yapılır; str.replace zinciri veya işletim sistemi yereli (locale) gerekmez.
+register_sqlite() SQLite bağlantısına TURKCE sıralamasını (ORDER BY sehir
+COLLATE TURKCE) ve search_key fonksiyonunu ekler.
+"""
+
+import functools
+import re
+import unicodedata
+
+
+_COMBINING_MARKS = re.compile(r'[\u0300-\u036f]+')
+_NON_WORD = re.compile(r'[\W_]+')
+
+TURKISH_ALPHABET = 'abcçdefgğhıijklmnoöpqrsştuüvwxyz'
+# Tablolar U+0250'ye kadar (Latin-1, Latin Genişletilmiş-A/B) karakterleri kapsar; ötesi değişmez
+_TABLE_SIZE = 0x250
+
+
+def _translation(mapping):
+    """str.translate için sıra tablosu (tuple)
+
+    str.maketrans sözlüğüne göre ~2 kat hızlıdır. Tablo dışındaki karakterde
+    IndexError (LookupError) oluşur, str.translate o karakteri olduğu gibi bırakır.
+    """
+    return tuple(mapping.get(chr(code), chr(code)) for code in range(_TABLE_SIZE))
+
+
+# Türkçe harfler ve şapkalı ünlüler -> ASCII (büyük/küçük harf korunur)
+_ASCII_TABLE = _translation(dict(zip('çÇğĞıİöÖşŞüÜâÂîÎûÛ', 'cCgGiIoOsSuUaAiIuU')))
+# ASCII karşılık + küçük harf; kalan harfler str.casefold ile küçülür
+_FOLD_TABLE = _translation(dict(zip('çÇğĞıİöÖşŞüÜâÂîÎûÛ', 'ccggiioossuuaaiiuu')))
+# Türkçe büyük/küçük harf eşleri; str.lower/upper I -> i, i -> I yapar
+_LOWER_TABLE = _translation({'I': 'ı', 'İ': 'i'})
+_UPPER_TABLE = _translation({'i': 'İ', 'ı': 'I'})
+
+
+def _strip_marks(char):
+    return _COMBINING_MARKS.sub('', unicodedata.normalize('NFKD', char))
+
+
+def _latin_letters():
+    # Tabloların Türkçe dışındaki aksanlı harfleri (é, ä, ñ, ß...)
+    return (chr(code) for code in range(0xC0, _TABLE_SIZE) if chr(code).isalpha())
+
+
+def _build_sort_table():
+    """Harfleri Türk alfabesi sırasındaki özel kullanım alanı (U+E000...) karakterlerine eşle
+
+    Büyük ve küçük harf aynı karaktere gider (I -> ı, İ -> i); şapkalı ve
+    Türkçe dışı aksanlı harfler temel harfin yerinde sıralanır. Rakam, boşluk
+    ve noktalama değişmez, harflerden önce gelir.
+    """
+    rank = {letter: chr(0xE000 + index) for index, letter in enumerate(TURKISH_ALPHABET)}
+    table = {}
+    for letter, key in rank.items():
+        table[letter] = key
+        table[letter.translate(_UPPER_TABLE).upper()] = key
+    for char in _latin_letters():
+        base = _strip_marks(char).casefold()
+        if char not in table and base and all(letter in rank for letter in base):
+            table[char] = ''.join(rank[letter] for letter in base)
+    return _translation(table)
+
+
+def _build_key_table():
+    # search_key'in NFKD + aksan atma + casefold sonucunu Latin harfler için önceden hesapla
+    table = {}
+    for char in _latin_letters():
+        key = _strip_marks(char).replace('ı', 'i').casefold()
+        if key != char:
+            table[char] = key
+    return _translation(table)
+
+
+_SORT_TABLE = _build_sort_table()
+_KEY_TABLE = _build_key_table()
+
+
+def to_ascii(text):
+    """Türkçe karakterleri ASCII karşılıklarına çevir (URL'ler için): "Çalıkuşu" -> "Calikusu" """
+    if not text or text.isascii():
+        return text
+    return text.translate(_ASCII_TABLE)
+
+
+def fold(text):
+    """Aksan ve büyük/küçük harf duyarsız karşılaştırma biçimi: "IŞIK" ve "ışık" -> "isik" """
+    if not text:
+        return ''
+    return (text if text.isascii() else text.translate(_FOLD_TABLE)).casefold()
+
+
+def turkish_lower(text):
+    """Türkçe küçük harf: "IŞIK" -> "ışık", "İZMİR" -> "izmir" """
+    return text.translate(_LOWER_TABLE).lower() if text else text
+
+
+def turkish_upper(text):
+    """Türkçe büyük harf: "izmir" -> "İZMİR", "ışık" -> "IŞIK" """
+    return text.translate(_UPPER_TABLE).upper() if text else text
+
+
+def search_key(text):
+    """Bulanık eşleştirme anahtarı: küçük harf, aksansız, yalnızca harf/rakam ve tek boşluk
+
+    search_key("NUTUK 1. Cilt") -> "nutuk 1 cilt", search_key("Kâtip Çelebi") -> "katip celebi"
+    """
+    if not text:
+        return ''
+    if not text.isascii():
+        text = text.translate(_KEY_TABLE)
+        if not text.isascii():
+            # Tablo dışı karakterler (ayrışık yazılmış aksanlar, uyumluluk karakterleri) için genel yol
+            text = _COMBINING_MARKS.sub('', unicodedata.normalize('NFKD', text)).replace('ı', 'i')
+    return _NON_WORD.sub(' ', text.casefold()).strip()
+
+
+def sort_key(text):
+    """Türk alfabesi sırası için sorted() anahtarı: Ceyhan < Çanakkale < Denizli, Iğdır < İzmir
+
+    Büyük/küçük harf ve aksan farkı yalnızca eşitlikte (özgün metne göre) sırayı belirler.
+    Anahtar tek bir metindir (birincil anahtar + NUL + özgün metin); tuple'dan hızlı karşılaştırılır.
+    """
+    text = text or ''
+    return f"{text.translate(_SORT_TABLE)}\0{text}"
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_sort_key(text):
+    return sort_key(text)
+
+
+def compare(a, b):
+    """SQLite sıralama fonksiyonu (-1, 0, 1); aynı değerler tekrar tekrar karşılaştırıldığından anahtarlar önbelleklenir"""
+    key_a, key_b = _cached_sort_key(a), _cached_sort_key(b)
+    return (key_a > key_b) - (key_a < key_b)
+
+
+def register_sqlite(conn):
+    """TURKCE sıralamasını ve search_key fonksiyonunu bağlantıya ekle (yerleşik LIKE değişmez)"""
+    conn.create_collation('TURKCE', compare)
+    conn.create_function('search_key', 1, search_key, deterministic=True)
@@ -3,23 +3,17 @@
 Yardımcı fonksiyonlar
 """
 
+import re
+
+from turkish_text import to_ascii
+
+
 def turkish_to_english_chars(text):
-    """Türkçe karakterleri İngilizce karşılıklarına dönüştürür"""
-    if not text:
-        return text
-    
-    char_map = {
-        'ç': 'c', 'Ç': 'C',
-        'ğ': 'g', 'Ğ': 'G', 
-        'ı': 'i', 'I': 'I',
-        'İ': 'I', 'i': 'i',
-        'ö': 'o', 'Ö': 'O',
-        'ş': 's', 'Ş': 'S',
-        'ü': 'u', 'Ü': 'U'
-    }
-    
-    result = text
-    for tr_char, en_char in char_map.items():
-        result = result.replace(tr_char, en_char)
-    
-    return result
+    """Türkçe karakterleri İngilizce karşılıklarına dönüştürür (bkz. turkish_text.to_ascii)"""
+    return to_ascii(text)
+
+
+def extract_sahaf_id(seller_url):
+    """Sahaf URL'inden sahaf ID'sini çıkar"""
+    match = re.search(r'sahaf(\d+)\.html', seller_url or '')
+    return match.group(1) if match else None
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+CSV/JSON istek listesinden toplu arama
+
+Listedeki her kitap adı/yazar çifti ayrı bir genel aramadır. Aynı sorguya
+indirgenen kalemler (büyük/küçük harf, Türkçe karakter ve boşluk farkı)
+tek sefer aranır, sonuçları hepsine bağlanır. Sorgular birkaç thread'de
+paralel çalışır; oturum havuzu, sayfa önbelleği ve hız sınırlayıcı paylaşılır.
+Sonuçlar fiyata göre artan sıralı geldiği için en ucuz teklif ilk sayfadadır.
+"""
+
+import csv
+import json
+import os
+import threading
+import concurrent.futures
+
+from turkish_text import fold
+from crawler import CrawlEngine, DEFAULT_CONCURRENCY, BASE_URL
+
+
+DEFAULT_PARALLEL_QUERIES = 4
+DEFAULT_MAX_PAGES = 10  # Sorgu başına en fazla sayfa (en ucuz 250 teklif)
+
+# CSV başlıkları / JSON anahtarları için kabul edilen adlar
+TITLE_KEYS = ('kitap_adi', 'kitap', 'baslik', 'başlık', 'title')
+AUTHOR_KEYS = ('yazar', 'author')
+
+
+def _pick(record, keys):
+    for key in keys:
+        for name, value in record.items():
+            if name and name.strip().casefold() == key:
+                return (value or '').strip()
+    return ''
+
+
+def load_wishlist(path):
+    """İstek listesini oku: [{'kitap_adi': ..., 'yazar': ...}, ...]
+
+    CSV'de başlık satırı (kitap_adi/baslik/title, yazar/author) yoksa ilk
+    sütun kitap adı, ikinci sütun yazar sayılır. JSON bir sözlük listesi veya
+    yalnızca kitap adlarından oluşan bir liste olabilir.
+    """
+    if os.path.splitext(path)[1].lower() == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        items = [{'kitap_adi': record, 'yazar': ''} if isinstance(record, str)
+                 else {'kitap_adi': _pick(record, TITLE_KEYS), 'yazar': _pick(record, AUTHOR_KEYS)}
+                 for record in records]
+    else:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            rows = list(csv.reader(f))
+        header = [cell.strip().casefold() for cell in rows[0]] if rows else []
+        if any(key in header for key in TITLE_KEYS + AUTHOR_KEYS):
+            items = [{'kitap_adi': _pick(dict(zip(header, row)), TITLE_KEYS),
+                      'yazar': _pick(dict(zip(header, row)), AUTHOR_KEYS)} for row in rows[1:]]
+        else:
+            items = [{'kitap_adi': row[0].strip() if row else '',
+                      'yazar': row[1].strip() if len(row) > 1 else ''} for row in rows]
+    return [item for item in items if item['kitap_adi'] or item['yazar']]
+
+
+def normalize_query(text):
+    """Aynı aramaya giden yazımları birleştir: Türkçe karakter, büyük/küçük harf, boşluk"""
+    return " ".join(fold(text).split())
+
+
+def item_label(item):
+    return f"{item['kitap_adi']} — {item['yazar']}" if item['yazar'] and item['kitap_adi'] else (item['kitap_adi'] or item['yazar'])
+
+
+class WishlistSearch:
+    """İstek listesi kalemlerini birleştirilmiş sorgularla paralel arayan toplu arama
+
+    db_manager ve auto_save verilirse ilanlar kitaplar tablosuna, kalem
+    eşleşmeleri wishlist_match tablosuna yazılır. Bittiğinde summary her kalem
+    için ilan sayısını ve en ucuz teklifi içerir.
+    """
+
+    def __init__(self, items, search_params=None, db_manager=None, auto_save=False, wishlist_name="istek_listesi",
+                 concurrency=DEFAULT_CONCURRENCY, parallel_queries=DEFAULT_PARALLEL_QUERIES,
+                 max_pages=DEFAULT_MAX_PAGES, session_pool=None, parse_pool=None, page_cache=None,
+                 rate_limiter=None, coalescer=None, sahaf_registry=None, base_url=BASE_URL, progress_callback=None,
+                 query_callback=None):
+        self.items = items
+        self.search_params = search_params or {}
+        self.db_manager = db_manager
+        self.auto_save = auto_save
+        self.wishlist_name = wishlist_name
+        self.max_pages = max_pages
+        self.session_pool = session_pool
+        self.parse_pool = parse_pool
+        self.page_cache = page_cache
+        self.rate_limiter = rate_limiter
+        self.coalescer = coalescer
+        self.sahaf_registry = sahaf_registry
+        self.base_url = base_url
+        self.progress_callback = progress_callback
+        # query_callback(tamamlanan, toplam) her birleştirilmiş sorgu bitince
+        self.query_callback = query_callback
+
+        # Aynı sorguya indirgenen kalemler tek sorguda birleşir
+        self.queries = {}
+        for item in items:
+            key = (normalize_query(item['kitap_adi']), normalize_query(item['yazar']))
+            self.queries.setdefault(key, []).append(item)
+
+        self.parallel_queries = max(1, min(parallel_queries, len(self.queries) or 1))
+        self.query_concurrency = max(1, int(concurrency) // self.parallel_queries)
+        self.results = {}
+        self.summary = []
+        self.incomplete = []
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._engines = set()
+        self._completed = 0
+        self._stop_requested = False
+
+    @property
+    def coalesced(self):
+        """Birleştirme sayesinde yapılmayan sorgu sayısı"""
+        return len(self.items) - len(self.queries)
+
+    def _emit(self, message):
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    def request_stop(self):
+        self._stop_requested = True
+        with self._lock:
+            engines = list(self._engines)
+        for engine in engines:
+            engine.request_stop()
+
+    @property
+    def stopped(self):
+        return self._stop_requested
+
+    def _search(self, key, items):
+        if self._stop_requested:
+            return key, []
+        # Sorgu, kalemin kullanıcının yazdığı haliyle gönderilir (URL'de zaten dönüştürülür)
+        params = dict(self.search_params, kitap_adi=items[0]['kitap_adi'], yazar=items[0]['yazar'])
+        engine = CrawlEngine(
+            params,
+            concurrency=self.query_concurrency,
+            base_url=self.base_url,
+            session_pool=self.session_pool,
+            parse_pool=self.parse_pool,
+            page_cache=self.page_cache,
+            cache_max_age=self.search_params.get('cache_max_age', 0),
+            rate_limiter=self.rate_limiter,
+            coalescer=self.coalescer,
+            sahaf_registry=self.sahaf_registry
+        )
+        with self._lock:
+            self._engines.add(engine)
+            if self.session_pool is None:
+                self.session_pool = engine.session_pool
+        try:
+            books = engine.run(engine.crawl_query(item_label(items[0]), max_pages=self.max_pages))
+        finally:
+            with self._lock:
+                self._engines.discard(engine)
+                self.request_count += engine.request_count
+                self.incomplete.extend(engine.incomplete)
+                self._completed += 1
+                completed = self._completed
+
+        if self.auto_save and self.db_manager and books and all('item_id' in item for item in items):
+            self.db_manager.save_wishlist_matches_async([item['item_id'] for item in items], books)
+
+        cheapest = self._cheapest(books)
+        self._emit(
+            f"İstek {completed}/{len(self.queries)}: {item_label(items[0])} - {len(books)} ilan"
+            + (f", en ucuz {cheapest['fiyat']} ({cheapest['sahaf_adi']})" if cheapest else "")
+        )
+        if self.query_callback:
+            self.query_callback(completed, len(self.queries))
+        return key, books
+
+    @staticmethod
+    def _cheapest(books):
+        priced = [book for book in books if book.get('fiyat_numeric')]
+        return min(priced, key=lambda book: book['fiyat_numeric']) if priced else None
+
+    def run(self):
+        """Tüm sorguları çalıştır; farklı sorgulardan gelen aynı ilanlar bir kez döner"""
+        if self.auto_save and self.db_manager:
+            self.db_manager.add_wishlist_items(self.wishlist_name, self.items)
+
+        self._emit(
+            f"İstek listesi: {len(self.items)} kalem, {len(self.queries)} farklı sorgu "
+            f"({self.coalesced} birleştirildi, {self.parallel_queries} paralel)"
+        )
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.parallel_queries) as executor:
+            for key, books in executor.map(lambda query: self._search(*query), self.queries.items()):
+                self.results[key] = books
+
+        self.summary = []
+        for key, items in self.queries.items():
+            books = self.results.get(key, [])
+            cheapest = self._cheapest(books)
+            for item in items:
+                self.summary.append({
+                    'kitap_adi': item['kitap_adi'],
+                    'yazar': item['yazar'],
+                    'matches': len(books),
+                    'cheapest_price': cheapest['fiyat_numeric'] if cheapest else None,
+                    'cheapest_text': cheapest['fiyat'] if cheapest else '',
+                    'cheapest_sahaf': cheapest['sahaf_adi'] if cheapest else '',
+                    'cheapest_url': cheapest['site_url'] if cheapest else '',
+                })
+
+        all_books = []
+        seen = set()
+        for books in self.results.values():
+            for book_data in books:
+                url = book_data.get('site_url')
+                if url and url in seen:
+                    continue
+                seen.add(url)
+                all_books.append(book_data)
+        return all_books